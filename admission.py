@@ -0,0 +1,103 @@
+"""
+HireSense - Admission control for Gemini analyses.
+Per-client token buckets and a global cap on analyses waiting on Gemini.
+Requests over either limit are not rejected; the caller answers them from
+the local fallback engine and marks the result as degraded.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+ADMITTED = "admitted"
+LIMITED = "rate_limited"
+SHED = "shed"
+
+
+class TokenBucket:
+    """Allow `rate` requests per second on average, with bursts up to `burst`."""
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class AdmissionController:
+    """Decide whether an analysis may call Gemini.
+
+    rate_per_minute of 0 disables per-client limiting; max_inflight bounds
+    the analyses admitted to Gemini at once across all clients. Buckets are
+    kept for the max_clients most recently seen clients.
+    """
+
+    def __init__(self, max_inflight=32, rate_per_minute=0, burst=10, max_clients=10000):
+        self.max_inflight = max_inflight
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.admitted = 0
+        self.limited = 0
+        self.shed = 0
+
+    def acquire(self, client):
+        """Return ADMITTED, LIMITED or SHED. Call release() after an admitted call."""
+        now = time.monotonic()
+        with self._lock:
+            if self.rate > 0 and client is not None and not self._bucket(client, now).take(now):
+                self.limited += 1
+                return LIMITED
+            if self.in_flight >= self.max_inflight:
+                self.shed += 1
+                return SHED
+            self.in_flight += 1
+            self.admitted += 1
+            return ADMITTED
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_inflight": self.max_inflight,
+                "in_flight": self.in_flight,
+                "rate_per_minute": round(self.rate * 60, 2),
+                "clients": len(self._buckets),
+                "admitted": self.admitted,
+                "limited": self.limited,
+                "shed": self.shed,
+            }
+
+    def _bucket(self, client, now):
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = TokenBucket(self.rate, self.burst, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+        return bucket
+
+
+def admission_from_env():
+    """Build the controller from ADMISSION_* environment variables."""
+    return AdmissionController(
+        max_inflight=int(os.getenv('ADMISSION_MAX_INFLIGHT', '32')),
+        rate_per_minute=float(os.getenv('ADMISSION_RATE_PER_MINUTE', '0')),
+        burst=int(os.getenv('ADMISSION_BURST', '10')),
+    )
@@ -3,297 +3,711 @@ HireSense - AI-Powered Personalized Learning Path & Skill Gap Analyzer
 Main application module with Flask routes and Gemini AI integration.
 """
 
+import gzip
+import hashlib
 import os
 import json
-import re
+import threading
 import time
-import uuid
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify, session
-from werkzeug.utils import secure_filename
+from io import BytesIO
+from flask import Flask, Request, Response, g, has_app_context, render_template, request, jsonify, session, stream_with_context, url_for
 from dotenv import load_dotenv
 
-import PyPDF2
-from docx import Document
-
-import google.generativeai as genai
+from admission import ADMITTED, admission_from_env
+from batch import BatchError, CohortReport, read_batch, result_source, run_batch
+from cache import LRUMemo, cache_from_env, make_cache_key
+from cohort import CohortBuilder, load_cohort, valid_cohort_name
+from extraction import extract_text, load_parsers
+from fallback_templates import (DEFAULT_CATEGORIES, SOFT_SKILLS, FallbackTemplates, freeze, memo_from_env,
+                                render_projects, render_recommendations, render_roadmap, requirements_key, thaw)
+from fake_gemini import FakeGenerativeModel, parse_spec
+from gemini_client import CircuitBreaker, CircuitOpenError, DeadlineExceeded, GeminiClient
+from jobs import QueueFull, queue_from_env
+from llm_json import SectionStreamParser, conform, parse_analysis
+from metrics import SamplingProfiler, record_stage, registry, server_timing_header, timed_stage
+from near_duplicates import index_from_env, patch_profile
+from parser_pool import pool_from_env
+from progress import (diff_profiles, learner_token, progress_delta, prune_roadmap, store_from_env, update_skills,
+                      valid_learner_token)
+from prompting import ANALYSIS_SCHEMA, ROADMAP_SCHEMA, SYSTEM_INSTRUCTION, build_prompt, build_roadmap_prompt
+from role_resolver import RoleResolver
+from taxonomy import taxonomy_from_env
 
 load_dotenv()
 
+
+class InMemoryRequest(Request):
+    """Keep uploads in memory instead of spooling large ones to a temp file.
+
+    MAX_CONTENT_LENGTH bounds the buffer, and resumes are parsed straight
+    from it, so nothing is ever written to disk.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return BytesIO()
+
+
 app = Flask(__name__)
+app.request_class = InMemoryRequest
 app.secret_key = os.getenv('SECRET_KEY', 'hiresense-secret-key-2026')
 
-UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max
+app.config['EXTRACT_MAX_CHARS'] = int(os.getenv('EXTRACT_MAX_CHARS', '20000'))
+# Cohort uploads to /analyze/batch
+app.config['BATCH_MAX_CONTENT_LENGTH'] = int(os.getenv('BATCH_MAX_MB', '200')) * 1024 * 1024
+app.config['BATCH_MAX_ITEMS'] = int(os.getenv('BATCH_MAX_ITEMS', '1000'))
+app.config['BATCH_CONCURRENCY'] = int(os.getenv('BATCH_CONCURRENCY', '4'))
+app.config['BATCH_PROCESSES'] = int(os.getenv('BATCH_PROCESSES', str(os.cpu_count() or 1)))
+# Where named cohort matrices are saved (see cohort.py); unset disables them
+app.config['COHORT_DIR'] = os.getenv('COHORT_DIR', '')
 
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'txt'}
 
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
+_genai = None
+_genai_lock = threading.Lock()
+
+
+def load_genai():
+    """Import and configure the Gemini SDK on first use.
+
+    The SDK pulls in grpc and protobuf, so it is only imported once a model
+    is needed and fallback-only deployments never load it.
+    """
+    global _genai
+    with _genai_lock:
+        if _genai is None:
+            import google.generativeai as genai
+            if GEMINI_API_KEY:
+                genai.configure(api_key=GEMINI_API_KEY)
+            _genai = genai
+        return _genai
+
+GEMINI_MODEL = 'gemini-2.0-flash'
+# Top-level sections of an analysis. Gemini may generate them in any order
+# (structured output does not keep the schema's), so clients place each
+# section by name as it arrives.
+ANALYSIS_SECTIONS = tuple(ANALYSIS_SCHEMA['properties'])
+# Bump whenever the prompt or expected JSON shape changes so cached results
+# produced by the old prompt are no longer served.
+PROMPT_VERSION = '3'
+# Token budget for the compacted resume in each prompt
+PROMPT_RESUME_TOKENS = int(os.getenv('PROMPT_RESUME_TOKENS', '900'))
+
+analysis_cache = cache_from_env()
+near_duplicates = index_from_env()
+parser_pool = pool_from_env()
+
+
+def preload_backends():
+    """Import the document parsers and, when an API key is set, the Gemini SDK now."""
+    load_parsers()
+    if GEMINI_API_KEY:
+        load_genai()
+
+
+# Run with `gunicorn --preload` so the master imports the backends once and
+# every worker shares them copy-on-write instead of importing its own.
+if os.getenv('PRELOAD_BACKENDS') == '1':
+    preload_backends()
 
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
-def extract_text_from_pdf(filepath):
-    """Extract text from PDF file."""
-    text = ""
-    try:
-        with open(filepath, 'rb') as f:
-            reader = PyPDF2.PdfReader(f)
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-    except Exception as e:
-        print(f"PDF extraction error: {e}")
-    return text.strip()
+def extract_upload(file):
+    """Extract resume text from an uploaded file. Returns (text, error)."""
+    return extract_document(file.stream.read(), file.filename)
 
 
-def extract_text_from_docx(filepath):
-    """Extract text from DOCX file."""
-    text = ""
-    try:
-        doc = Document(filepath)
-        for para in doc.paragraphs:
-            text += para.text + "\n"
-    except Exception as e:
-        print(f"DOCX extraction error: {e}")
-    return text.strip()
+def extract_document(data, filename):
+    """Extract resume text from document bytes.
 
+    Returns (text, error). Parsing runs in the sandboxed parser pool when it
+    is enabled; a parse that times out keeps whatever text it produced.
+    """
+    max_chars = app.config['EXTRACT_MAX_CHARS']
+    file_type = filename.rsplit('.', 1)[1].lower()
+    if parser_pool is None:
+        with timed_stage("extract", file_type):
+            return extract_text(BytesIO(data), filename, max_chars), None
+    
+    with timed_stage("extract", file_type):
+        text, status = parser_pool.extract(data, filename, max_chars)
+    if status == "partial":
+        print(f"Parser timed out on {filename}, using partial text")
+    elif status == "busy":
+        return "", "The server is busy processing other files. Please try again shortly or paste your resume text instead."
+    elif status == "timeout":
+        return "", "Your file took too long to process. Please upload a smaller file or paste your resume text instead."
+    return text, None
 
-def extract_text_from_txt(filepath):
-    """Extract text from plain text file."""
-    try:
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            return f.read().strip()
-    except Exception as e:
-        print(f"TXT extraction error: {e}")
-        return ""
+
+# Skills, aliases and role requirements come from data/taxonomy.json (or
+# TAXONOMY_PATH), compiled once into a cached snapshot shared by all requests.
+TAXONOMY = taxonomy_from_env()
+SKILL_DB = TAXONOMY.skill_db
+ROLE_REQUIREMENTS = TAXONOMY.role_requirements
+
+
+def match_skills(text):
+    """Find every known skill, or an alias of one, in text in a single scan.
+
+    Returns {skill: (count, category)} keyed by canonical skill name, in
+    order of first appearance.
+    """
+    return {TAXONOMY.skills[i]: (count, TAXONOMY.category_of(i)) for i, count in TAXONOMY.match(text).items()}
+
+
+def build_analysis_prompt(resume_text, career_goal, skills_text=""):
+    """Build the per-request Gemini prompt for one learner profile.
+
+    Skills found by the local matcher are always listed, so they reach the
+    model even when the resume itself has to be cut to the token budget.
+    """
+    with timed_stage("prompt"):
+        detected = list(match_skills(resume_text + " " + skills_text))
+        return build_prompt(resume_text, career_goal, skills_text, detected, PROMPT_RESUME_TOKENS)
+
+
+# Goals are matched to the closest role title by character n-gram TF-IDF;
+# runner-up roles scoring within ROLE_BLEND_RATIO of the best are blended.
+ROLE_BLEND_RATIO = float(os.getenv('ROLE_BLEND_RATIO', '0.9'))
+role_resolver = RoleResolver.from_taxonomy(
+    TAXONOMY,
+    top_k=int(os.getenv('ROLE_TOP_K', '3')),
+    min_score=float(os.getenv('ROLE_MIN_SCORE', '0.3')),
+)
+
+
+def match_role(career_goal):
+    """Return the ROLE_REQUIREMENTS key closest to a career goal, or "default"."""
+    matches = role_resolver.resolve(career_goal)
+    return matches[0][0] if matches else "default"
+
+
+def role_requirements(career_goal):
+    """Return (matched_role, requirements) for a career goal.
+
+    When other roles score close to the best match ("Full Stack Developer"),
+    their requirements are blended in.
+    """
+    matches = role_resolver.resolve(career_goal)
+    if not matches:
+        return "default", ROLE_REQUIREMENTS["default"]
+    best_role, best_score = matches[0]
+    close = [(role, score) for role, score in matches if score >= best_score * ROLE_BLEND_RATIO]
+    if len(close) == 1:
+        return best_role, ROLE_REQUIREMENTS[best_role]
+    return best_role, TAXONOMY.blend_requirements(close)
+
+
+# Role-dependent parts of fallback analyses are built once per role, and
+# rendered analyses are memoised (FALLBACK_MEMO_SIZE entries per process).
+fallback_templates = FallbackTemplates(ROLE_REQUIREMENTS)
+fallback_memo = memo_from_env()
+
+
+def gemini_configured():
+    """True when analyses should go to Gemini rather than the fallback engine."""
+    return bool(GEMINI_API_KEY or app.config.get('GEMINI_MODEL_FACTORY'))
+
+
+def create_gemini_model():
+    """Build the model used for analyses.
+
+    Setting app.config['GEMINI_MODEL_FACTORY'] swaps in another model, such as
+    fake_gemini.FakeGenerativeModel, for local runs. The model is built once
+    and shared through gemini_client; call gemini_client.reset() after
+    changing the factory.
+    """
+    factory = app.config.get('GEMINI_MODEL_FACTORY')
+    if factory:
+        return factory()
+    genai = load_genai()
+    # Instructions and schema are configured once on the model and answered
+    # in JSON mode, instead of being resent as prose with every request.
+    return genai.GenerativeModel(
+        GEMINI_MODEL,
+        system_instruction=SYSTEM_INSTRUCTION,
+        generation_config=genai.GenerationConfig(
+            response_mime_type='application/json',
+            response_schema=ANALYSIS_SCHEMA,
+        ),
+    )
+
+
+def fake_model_factory(spec):
+    """Return a GEMINI_MODEL_FACTORY building the local stand-in described by spec.
+
+    Every call is answered with the fallback engine's analysis of a sample
+    resume, after the latency and failures fake_gemini.parse_spec describes.
+    """
+    options = parse_spec(spec)
+
+    def factory():
+        sample = "Built REST services in Python and SQL, deployed with Docker on AWS and tested with pytest."
+        canned = json.dumps(generate_fallback_analysis(sample, "Software Engineer")["data"])
+        return FakeGenerativeModel(canned, **options)
+    return factory
+
+
+# FAKE_GEMINI answers analyses from the local stand-in instead of the API, so
+# a real server can be load-tested offline (see benchmarks/loadtest.py).
+if os.getenv('FAKE_GEMINI'):
+    app.config['GEMINI_MODEL_FACTORY'] = fake_model_factory(os.getenv('FAKE_GEMINI'))
+
+
+def _hedge_setting(value):
+    if value == 'auto':
+        return value
+    return float(value) if value else None
 
 
-def extract_text(filepath):
-    """Extract text from any supported file format."""
-    ext = filepath.rsplit('.', 1)[1].lower()
-    if ext == 'pdf':
-        return extract_text_from_pdf(filepath)
-    elif ext == 'docx':
-        return extract_text_from_docx(filepath)
-    elif ext == 'txt':
-        return extract_text_from_txt(filepath)
-    return ""
+# Seconds an analysis may wait on Gemini before failing over to the fallback
+# engine, less FALLBACK_RESERVE so the fallback itself still fits the budget.
+GEMINI_DEADLINE = float(os.getenv('GEMINI_DEADLINE', '25'))
+FALLBACK_RESERVE = 0.5
 
+gemini_client = GeminiClient(
+    create_gemini_model,
+    max_concurrency=int(os.getenv('GEMINI_MAX_CONCURRENCY', '8')),
+    hedge_after=_hedge_setting(os.getenv('GEMINI_HEDGE_AFTER', '')),
+    call_timeout=GEMINI_DEADLINE,
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.getenv('GEMINI_BREAKER_FAILURES', '5')),
+        cooldown=float(os.getenv('GEMINI_BREAKER_COOLDOWN', '30')),
+    ),
+)
 
-def analyze_with_gemini(resume_text, career_goal, skills_text=""):
-    """Use Gemini AI to analyze skills and generate learning path."""
+admission = admission_from_env()
+
+# Outcome metrics, exported on /metrics and summarised on /health:
+#   analyses  - how each analysis was answered (path): gemini, cache, partial,
+#               fallback, or degraded when admission control turned Gemini away
+#   llm_parse - what became of each Gemini response: ok, repaired, partial, discarded
+analyses_total = registry.counter(
+    'hiresense_analyses', 'Analyses by answering path, matched role and upload type.', ['path', 'role', 'file_type']
+)
+analysis_seconds = registry.histogram(
+    'hiresense_analysis_seconds', 'End-to-end analysis request latency.', ['path', 'role', 'file_type']
+)
+llm_parse_total = registry.counter('hiresense_llm_parse', 'Gemini responses by parse outcome.', ['outcome'])
+registry.gauges('hiresense_cache', 'Analysis cache statistics.', lambda: analysis_cache.stats())
+registry.gauges('hiresense_parser_pool', 'Parser pool statistics.', lambda: parser_pool.stats() if parser_pool else None)
+registry.gauges('hiresense_gemini', 'Gemini client statistics.', lambda: gemini_client.stats())
+registry.gauges('hiresense_admission', 'Admission control statistics.', admission.stats)
+registry.gauges('hiresense_near_duplicates', 'Near-duplicate index statistics.',
+                lambda: near_duplicates.stats() if near_duplicates else None)
+registry.gauges('hiresense_learners', 'Learner store statistics.', lambda: learner_store.stats() if learner_store else None)
+registry.gauges('hiresense_fallback_memo', 'Memoised fallback analysis statistics.', fallback_memo.stats)
+
+
+def record_analysis(path, career_goal):
+    """Count an answered analysis and, inside a request or job, its latency."""
+    role = match_role(career_goal)
+    file_type = g.get('file_type', 'text') if has_app_context() else 'text'
+    analyses_total.inc(path=path, role=role, file_type=file_type)
+    if has_app_context() and 'started' in g:
+        analysis_seconds.observe(time.perf_counter() - g.started, path=path, role=role, file_type=file_type)
+
+
+def record_parse(outcome):
+    llm_parse_total.inc(outcome=outcome)
+
+
+def new_deadline():
+    """Deadline (time.monotonic()) for the Gemini part of a request starting now."""
+    return time.monotonic() + GEMINI_DEADLINE - FALLBACK_RESERVE
+
+
+def fill_from_fallback(sections, resume_text, career_goal, skills_text=""):
+    """Complete a partial Gemini result with sections from the fallback engine.
+
+    Returns (data, provenance) where provenance maps each section to the
+    engine that produced it.
+    """
+    fallback = generate_fallback_analysis(resume_text, career_goal, skills_text)["data"]
+    data = {}
+    provenance = {}
+    for name in ANALYSIS_SECTIONS:
+        if name in sections:
+            data[name] = sections[name]
+            provenance[name] = "gemini"
+        else:
+            data[name] = fallback[name]
+            provenance[name] = "fallback"
+    return data, provenance
+
+
+def _similarity_role(career_goal):
+    # Goals that match no known role only share results with the same goal
+    role = match_role(career_goal)
+    return career_goal.strip().lower() if role == "default" else role
+
+
+def find_similar_analysis(resume_text, career_goal, skills_text=""):
+    """Look up a stored analysis of a near-identical resume for the same role.
+
+    Returns (signature, data) where data is the stored analysis with this
+    learner's profile fields patched in, or None on a miss. The signature is
+    passed on to store_analysis().
+    """
+    if near_duplicates is None:
+        return None, None
+    with timed_stage("similar"):
+        signature = near_duplicates.signature(resume_text + "\n" + skills_text)
+        key = near_duplicates.find(signature, _similarity_role(career_goal))
+        data = analysis_cache.get(key) if key else None
+    if data is None:
+        if key:
+            near_duplicates.discard(key)
+        return signature, None
+    return signature, patch_profile(data, resume_text)
+
+
+def store_analysis(cache_key, signature, career_goal, data):
+    """Cache a complete Gemini analysis and index it for near-duplicate hits."""
+    analysis_cache.set(cache_key, data)
+    if near_duplicates is not None:
+        near_duplicates.add(cache_key, signature, _similarity_role(career_goal))
+
+
+def degraded_analysis(resume_text, career_goal, skills_text, reason):
+    """Answer from the fallback engine because admission control turned Gemini away."""
+    record_analysis("degraded", career_goal)
+    result = generate_fallback_analysis(resume_text, career_goal, skills_text)
+    result.update(degraded=True, degraded_reason=reason)
+    return result
+
+
+def analyze_with_gemini(resume_text, career_goal, skills_text="", deadline=None, client=None):
+    """Use Gemini AI to analyze skills and generate learning path.
+
+    Falls back to the local engine if Gemini has not answered by deadline
+    (a time.monotonic() timestamp) or the circuit breaker is open. A
+    malformed response is repaired where possible and only the sections
+    that remain unusable come from the fallback engine. When client is over
+    its rate limit or Gemini is saturated, the fallback answer is returned
+    straight away and marked degraded.
+    """
     
-    if not GEMINI_API_KEY:
+    if not gemini_configured():
+        record_analysis("fallback", career_goal)
         return generate_fallback_analysis(resume_text, career_goal, skills_text)
     
+    cache_key = make_cache_key(resume_text, skills_text, career_goal, GEMINI_MODEL, PROMPT_VERSION)
+    with timed_stage("cache"):
+        cached = analysis_cache.get(cache_key)
+    if cached is not None:
+        record_analysis("cache", career_goal)
+        return {"success": True, "data": cached, "cached": True}
+    
+    signature, similar = find_similar_analysis(resume_text, career_goal, skills_text)
+    if similar is not None:
+        record_analysis("similar", career_goal)
+        return {"success": True, "data": similar, "cached": True, "similar": True}
+    
+    if deadline is None:
+        deadline = new_deadline()
+    
+    verdict = admission.acquire(client)
+    if verdict != ADMITTED:
+        return degraded_analysis(resume_text, career_goal, skills_text, verdict)
+    
     try:
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        
-        prompt = f"""You are an expert career counselor and educational AI mentor. Analyze the following learner profile and provide a comprehensive skill gap analysis with a personalized learning roadmap.
-
-LEARNER PROFILE:
-Resume/Academic Details:
-{resume_text[:3000]}
-
-Additional Skills Listed:
-{skills_text if skills_text else 'Not provided'}
-
-Target Career Goal/Role:
-{career_goal}
-
-Provide your analysis in the following JSON format ONLY (no markdown, no code blocks, just pure JSON):
-{{
-    "profile_summary": {{
-        "name": "extracted name or 'Learner'",
-        "current_level": "Beginner/Intermediate/Advanced",
-        "education": "brief education summary",
-        "experience_years": 0,
-        "domain": "current domain/field"
-    }},
-    "skill_analysis": {{
-        "strong_skills": [
-            {{"name": "skill name", "level": 85, "category": "category like Programming/Design/Data/etc"}},
-        ],
-        "moderate_skills": [
-            {{"name": "skill name", "level": 55, "category": "category"}},
-        ],
-        "weak_skills": [
-            {{"name": "skill name", "level": 25, "category": "category"}},
-        ],
-        "missing_skills": [
-            {{"name": "skill name", "importance": "Critical/High/Medium", "category": "category"}},
-        ]
-    }},
-    "skill_categories": [
-        {{
-            "name": "Category Name (e.g., Programming, Data Science, Cloud, etc.)",
-            "current_score": 65,
-            "required_score": 90,
-            "gap": 25
-        }}
-    ],
-    "learning_roadmap": {{
-        "phases": [
-            {{
-                "phase_number": 1,
-                "title": "Foundation Building",
-                "duration": "4-6 weeks",
-                "description": "Brief description",
-                "skills_to_learn": ["skill1", "skill2"],
-                "resources": [
-                    {{"type": "Course", "name": "Course Name", "platform": "Platform", "url": ""}},
-                    {{"type": "Project", "name": "Project Name", "description": "Brief desc"}}
-                ],
-                "milestones": ["milestone1", "milestone2"]
-            }}
-        ]
-    }},
-    "priority_recommendations": [
-        {{
-            "rank": 1,
-            "skill": "Skill Name",
-            "reason": "Why this is priority",
-            "time_estimate": "2-3 weeks",
-            "difficulty": "Easy/Medium/Hard"
-        }}
-    ],
-    "career_readiness": {{
-        "overall_score": 55,
-        "strengths": ["strength1", "strength2"],
-        "areas_to_improve": ["area1", "area2"],
-        "estimated_time_to_ready": "3-6 months",
-        "market_demand": "High/Medium/Low"
-    }},
-    "recommended_projects": [
-        {{
-            "name": "Project Name",
-            "description": "What to build",
-            "skills_practiced": ["skill1", "skill2"],
-            "difficulty": "Beginner/Intermediate/Advanced",
-            "estimated_time": "2 weeks"
-        }}
-    ]
-}}
-
-IMPORTANT:
-- Be specific and actionable in recommendations
-- Provide at least 4-6 strong skills, 3-5 moderate skills, 3-5 weak skills, and 4-8 missing skills
-- Create at least 3-4 learning phases in the roadmap
-- Include at least 5 priority recommendations
-- Provide at least 3-4 recommended projects
-- Include at least 5-6 skill categories
-- Make all scores realistic based on the profile
-- Ensure JSON is valid and parseable
-"""
-        
-        response = model.generate_content(prompt)
-        response_text = response.text.strip()
+        prompt = build_analysis_prompt(resume_text, career_goal, skills_text)
         
-        if response_text.startswith('```'):
-            response_text = re.sub(r'^```(?:json)?\s*\n?', '', response_text)
-            response_text = re.sub(r'\n?```\s*$', '', response_text)
-        
-        result = json.loads(response_text)
-        return {"success": True, "data": result}
-        
-    except json.JSONDecodeError as e:
-        print(f"JSON parse error: {e}")
-        print(f"Response was: {response_text[:500]}")
-        return generate_fallback_analysis(resume_text, career_goal, skills_text)
+        # Identical requests already in flight share a single upstream call
+        with timed_stage("gemini"):
+            response_text = gemini_client.generate(prompt, key=cache_key, deadline=deadline)
+    except (DeadlineExceeded, CircuitOpenError) as e:
+        print(f"Gemini skipped: {e}")
+        response_text = ""
     except Exception as e:
         print(f"Gemini API error: {e}")
+        response_text = ""
+    finally:
+        admission.release()
+    
+    sections = {}
+    if response_text:
+        with timed_stage("json"):
+            sections, parse_outcome = parse_analysis(response_text, ANALYSIS_SCHEMA)
+        record_parse(parse_outcome)
+        if parse_outcome in ("ok", "repaired"):
+            store_analysis(cache_key, signature, career_goal, sections)
+            record_analysis("gemini", career_goal)
+            return {"success": True, "data": sections, "provenance": {name: "gemini" for name in sections}}
+        print(f"Gemini response {parse_outcome}: {response_text[:500]}")
+    
+    if not sections:
+        record_analysis("fallback", career_goal)
         return generate_fallback_analysis(resume_text, career_goal, skills_text)
+    
+    data, provenance = fill_from_fallback(sections, resume_text, career_goal, skills_text)
+    record_analysis("partial", career_goal)
+    return {"success": True, "data": data, "provenance": provenance}
+
+
+# Returning learners (requests with a learner_id) are re-analysed
+# incrementally against their stored analysis unless more than this share
+# of their profile's lines changed.
+INCREMENTAL_MAX_CHANGE = float(os.getenv('INCREMENTAL_MAX_CHANGE', '0.5'))
+learner_store = store_from_env()
+# Learner tokens are signed with the secret key, so the public default
+# would let anyone mint a token for any learner_id
+if learner_store and not os.getenv('SECRET_KEY'):
+    raise RuntimeError("Learner tracking needs SECRET_KEY set to a private value, as learner tokens are signed with it")
+
+
+def check_learner_access(learner_id, token):
+    """Return an error unless the caller may use learner_id's history.
+
+    The first submission of an id claims it and is answered with a
+    learner_token; later submissions must send that token back, so nobody
+    can read or extend another learner's history by guessing their id.
+    """
+    if valid_learner_token(app.secret_key, learner_id, token) or not learner_store.exists(learner_id):
+        return None
+    return "This learner_id is already in use. Send the learner_token returned with its first analysis."
+
+
+def update_roadmap(data, career_goal, gained, deadline, client):
+    """Regenerate the roadmap and priorities of an updated analysis with a narrow Gemini call.
+
+    Returns the provenance of the two sections; when Gemini is unavailable
+    or its answer unusable, skills the learner now has are pruned from the
+    old roadmap instead.
+    """
+    sections = {}
+    if gemini_configured() and admission.acquire(client) == ADMITTED:
+        analysis = data["skill_analysis"]
+        prompt = build_roadmap_prompt(
+            career_goal,
+            [s["name"] for s in analysis["strong_skills"] + analysis["moderate_skills"]],
+            gained,
+            [s["name"] for s in analysis["missing_skills"]],
+            data.get("learning_roadmap", {}),
+        )
+        try:
+            with timed_stage("gemini"):
+                response_text = gemini_client.generate(prompt, deadline=deadline, generation_config={
+                    "response_mime_type": "application/json",
+                    "response_schema": ROADMAP_SCHEMA,
+                })
+            with timed_stage("json"):
+                sections, parse_outcome = parse_analysis(response_text, ROADMAP_SCHEMA)
+            record_parse(parse_outcome)
+        except Exception as e:
+            print(f"Gemini roadmap update skipped: {e}")
+        finally:
+            admission.release()
+    data.update(sections)
+    if len(sections) < len(ROADMAP_SCHEMA['properties']):
+        prune_roadmap(data)
+    return {name: "gemini" if name in sections else "previous" for name in ROADMAP_SCHEMA['properties']}
+
+
+def analyze_learner(learner_id, resume_text, career_goal, skills_text="", deadline=None, client=None):
+    """Analyse a learner's profile against their previous submission.
+
+    Callers must have passed check_learner_access() first. A first
+    submission, a new target role, a large rewrite, or a previous
+    answer that did not come from Gemini gets a full analyze_with_gemini()
+    run. Otherwise only what changed is recomputed: skill levels,
+    categories and readiness locally, and the roadmap with a narrow Gemini
+    call. Successful results are stored as the learner's next version and
+    carry a "progress" delta against the previous one.
+    """
+    previous = learner_store.get(learner_id)
+    result = None
+    diff = None
+    if previous is not None and gemini_configured() and previous.get("source") in ("gemini", "cache", "similar") \
+            and match_role(previous["career_goal"]) == match_role(career_goal):
+        with timed_stage("diff"):
+            diff = diff_profiles(previous["resume_text"], previous["skills_text"], resume_text, skills_text, match_skills)
+        if not diff["sections"] and not diff["skills_added"] and not diff["skills_removed"]:
+            record_analysis("unchanged", career_goal)
+            return {"success": True, "data": previous["data"], "unchanged": True,
+                    "version": previous["version"], "learner_token": learner_token(app.secret_key, learner_id),
+                    "progress": progress_delta(previous["data"], previous["data"])}
+        if diff["change_ratio"] <= INCREMENTAL_MAX_CHANGE:
+            if deadline is None:
+                deadline = new_deadline()
+            with timed_stage("incremental"):
+                counts = {name: count for name, (count, _) in match_skills(resume_text + " " + skills_text).items()}
+                data = update_skills(previous["data"], diff, counts, role_requirements(career_goal)[1], match_skills)
+            provenance = {name: "previous" for name in ANALYSIS_SECTIONS}
+            provenance.update(skill_analysis="local", skill_categories="local", career_readiness="local")
+            # Edits that add or drop no skill leave the roadmap as it was
+            if diff["skills_added"] or diff["skills_removed"]:
+                provenance.update(update_roadmap(data, career_goal, [name.title() for name in diff["skills_added"]],
+                                                 deadline, client))
+            record_analysis("incremental", career_goal)
+            result = {"success": True, "data": data, "provenance": provenance, "incremental": True}
+    
+    if result is None:
+        result = analyze_with_gemini(resume_text, career_goal, skills_text, deadline, client)
+    if not result.get("success"):
+        return result
+    
+    # A failed save loses only this version, never the finished analysis
+    version = learner_store.put(learner_id, {
+        "career_goal": career_goal,
+        "resume_text": resume_text,
+        "skills_text": skills_text,
+        "source": "gemini" if result.get("incremental") else result_source(result),
+        "data": result["data"],
+    })
+    if version is not None:
+        result["version"] = version
+    result["learner_token"] = learner_token(app.secret_key, learner_id)
+    if previous is not None:
+        result["progress"] = progress_delta(previous["data"], result["data"])
+        if diff is not None:
+            result["progress"]["changed_sections"] = list(diff["sections"])
+    return result
+
 
+def stream_analysis(resume_text, career_goal, skills_text="", deadline=None, client=None):
+    """Yield analysis events, one per top-level section, as Gemini produces them.
 
+    Each section event names its source engine. Sections Gemini fails to
+    deliver (error, truncated or malformed output, or not finished by
+    deadline) are salvaged by repairing the partial response where possible
+    and otherwise filled in from the fallback engine before the final
+    "done" event.
+    """
+    if not gemini_configured():
+        fallback = generate_fallback_analysis(resume_text, career_goal, skills_text)["data"]
+        for name, value in fallback.items():
+            yield {"event": "section", "name": name, "data": value, "source": "fallback"}
+        record_analysis("fallback", career_goal)
+        yield {"event": "done", "success": True, "source": "fallback"}
+        return
+    
+    cache_key = make_cache_key(resume_text, skills_text, career_goal, GEMINI_MODEL, PROMPT_VERSION)
+    with timed_stage("cache"):
+        cached = analysis_cache.get(cache_key)
+    if cached is not None:
+        for name, value in cached.items():
+            yield {"event": "section", "name": name, "data": value, "source": "cache"}
+        record_analysis("cache", career_goal)
+        yield {"event": "done", "success": True, "source": "cache"}
+        return
+    
+    signature, similar = find_similar_analysis(resume_text, career_goal, skills_text)
+    if similar is not None:
+        for name, value in similar.items():
+            yield {"event": "section", "name": name, "data": value, "source": "cache"}
+        record_analysis("similar", career_goal)
+        yield {"event": "done", "success": True, "source": "cache", "similar": True}
+        return
+    
+    if deadline is None:
+        deadline = new_deadline()
+    
+    verdict = admission.acquire(client)
+    if verdict != ADMITTED:
+        result = degraded_analysis(resume_text, career_goal, skills_text, verdict)
+        for name, value in result["data"].items():
+            yield {"event": "section", "name": name, "data": value, "source": "fallback"}
+        yield {"event": "done", "success": True, "source": "fallback", "degraded": True, "degraded_reason": verdict}
+        return
+    
+    parser = SectionStreamParser()
+    sections = {}
+    try:
+        prompt = build_analysis_prompt(resume_text, career_goal, skills_text)
+        gemini_started = time.perf_counter()
+        for text in gemini_client.stream(prompt, deadline=deadline):
+            for name, value in parser.feed(text):
+                value = conform(value, ANALYSIS_SCHEMA["properties"][name]) if name in ANALYSIS_SECTIONS else None
+                if value is None or name in sections:
+                    continue
+                sections[name] = value
+                yield {"event": "section", "name": name, "data": value, "source": "gemini"}
+    except (DeadlineExceeded, CircuitOpenError) as e:
+        print(f"Gemini skipped: {e}")
+    except Exception as e:
+        print(f"Gemini streaming error: {e}")
+    else:
+        record_stage("gemini", time.perf_counter() - gemini_started)
+    finally:
+        admission.release()
+    
+    for key, error in parser.errors:
+        print(f"JSON parse error in section {key}: {error}")
+    
+    if parser.text:
+        if parser.complete and len(sections) == len(ANALYSIS_SECTIONS) and not parser.errors:
+            record_parse("ok")
+        else:
+            with timed_stage("json"):
+                salvaged, parse_outcome = parse_analysis(parser.text, ANALYSIS_SCHEMA)
+            for name, value in salvaged.items():
+                if name not in sections:
+                    sections[name] = value
+                    yield {"event": "section", "name": name, "data": value, "source": "gemini"}
+            if len(sections) == len(ANALYSIS_SECTIONS):
+                parse_outcome = "repaired"
+            elif sections:
+                parse_outcome = "partial"
+            record_parse(parse_outcome)
+    
+    if len(sections) == len(ANALYSIS_SECTIONS):
+        store_analysis(cache_key, signature, career_goal, {name: sections[name] for name in ANALYSIS_SECTIONS})
+        record_analysis("gemini", career_goal)
+        yield {"event": "done", "success": True, "source": "gemini"}
+        return
+    
+    data, provenance = fill_from_fallback(sections, resume_text, career_goal, skills_text)
+    for name, source in provenance.items():
+        if source == "fallback":
+            yield {"event": "section", "name": name, "data": data[name], "source": "fallback"}
+    source = "partial" if sections else "fallback"
+    record_analysis(source, career_goal)
+    yield {"event": "done", "success": True, "source": source}
+
+
+@timed_stage("fallback")
 def generate_fallback_analysis(resume_text, career_goal, skills_text=""):
-    """Generate a comprehensive analysis without API when Gemini is unavailable."""
-    
-    all_text = (resume_text + " " + skills_text + " " + career_goal).lower()
-    
-    skill_db = {
-        "Programming Languages": ["python", "java", "javascript", "typescript", "c++", "c#", "ruby", "go", "rust", "php", "swift", "kotlin", "r", "scala", "perl", "matlab", "dart", "lua"],
-        "Web Development": ["html", "css", "react", "angular", "vue", "node.js", "express", "django", "flask", "spring boot", "next.js", "tailwind", "bootstrap", "sass", "webpack", "graphql", "rest api"],
-        "Data Science & ML": ["machine learning", "deep learning", "tensorflow", "pytorch", "scikit-learn", "pandas", "numpy", "data analysis", "nlp", "computer vision", "neural networks", "statistics", "data visualization", "tableau", "power bi", "jupyter"],
-        "Cloud & DevOps": ["aws", "azure", "gcp", "docker", "kubernetes", "ci/cd", "jenkins", "terraform", "ansible", "linux", "git", "github actions", "microservices", "serverless"],
-        "Database": ["sql", "mysql", "postgresql", "mongodb", "redis", "firebase", "elasticsearch", "cassandra", "oracle", "dynamodb", "neo4j"],
-        "Mobile Development": ["android", "ios", "react native", "flutter", "swift", "kotlin", "xamarin"],
-        "Soft Skills": ["leadership", "communication", "teamwork", "problem solving", "critical thinking", "project management", "agile", "scrum", "presentation"]
-    }
+    """Generate a comprehensive analysis without API when Gemini is unavailable.
+
+    Results are memoised per exact input and per career goal, role
+    requirements and skill set (see fallback_templates); each call gets
+    its own copy of the data.
+    """
     
-    role_requirements = {
-        "software engineer": {
-            "required": ["python", "java", "javascript", "git", "sql", "data structures", "algorithms", "rest api", "docker", "ci/cd", "linux", "testing"],
-            "nice_to_have": ["kubernetes", "aws", "microservices", "system design", "graphql"]
-        },
-        "data scientist": {
-            "required": ["python", "machine learning", "statistics", "sql", "pandas", "numpy", "data visualization", "deep learning", "nlp", "tensorflow"],
-            "nice_to_have": ["pytorch", "spark", "aws", "docker", "mlops"]
-        },
-        "web developer": {
-            "required": ["html", "css", "javascript", "react", "node.js", "git", "rest api", "sql", "responsive design", "typescript"],
-            "nice_to_have": ["next.js", "graphql", "docker", "aws", "testing"]
-        },
-        "frontend developer": {
-            "required": ["html", "css", "javascript", "react", "typescript", "responsive design", "git", "webpack", "testing", "ui/ux"],
-            "nice_to_have": ["next.js", "vue", "tailwind", "graphql", "accessibility"]
-        },
-        "backend developer": {
-            "required": ["python", "java", "sql", "rest api", "git", "docker", "linux", "databases", "microservices", "testing"],
-            "nice_to_have": ["kubernetes", "aws", "message queues", "caching", "system design"]
-        },
-        "machine learning engineer": {
-            "required": ["python", "machine learning", "deep learning", "tensorflow", "pytorch", "statistics", "sql", "docker", "git", "mlops"],
-            "nice_to_have": ["kubernetes", "aws", "spark", "nlp", "computer vision"]
-        },
-        "devops engineer": {
-            "required": ["docker", "kubernetes", "ci/cd", "linux", "aws", "terraform", "git", "python", "monitoring", "networking"],
-            "nice_to_have": ["ansible", "jenkins", "prometheus", "grafana", "security"]
-        },
-        "default": {
-            "required": ["python", "javascript", "sql", "git", "problem solving", "communication", "data structures", "algorithms"],
-            "nice_to_have": ["docker", "aws", "react", "machine learning", "agile"]
-        }
-    }
+    # A repeated submission skips skill matching altogether
+    input_key = hashlib.sha1("\0".join((resume_text, skills_text, career_goal)).encode()).digest()
+    frozen = fallback_memo.get(input_key)
+    if frozen is not None:
+        return {"success": True, "data": thaw(frozen)}
     
-    career_lower = career_goal.lower()
-    matched_role = "default"
-    for role_key in role_requirements:
-        if role_key in career_lower:
-            matched_role = role_key
-            break
+    all_text = resume_text + " " + skills_text + " " + career_goal
     
-    requirements = role_requirements[matched_role]
+    _, requirements = role_requirements(career_goal)
     
     
-    found_skills = set()
-    for category, skills in skill_db.items():
-        for skill in skills:
-            if skill.lower() in all_text:
-                found_skills.add(skill)
+    found_skills = match_skills(all_text)
     
+    # Levels only distinguish skill counts up to 4
+    memo_key = (career_goal, requirements_key(requirements),
+                tuple((skill, min(count, 4)) for skill, (count, _) in found_skills.items()))
+    frozen = fallback_memo.get(memo_key)
+    if frozen is not None:
+        fallback_memo.set(input_key, frozen)
+        return {"success": True, "data": thaw(frozen)}
     
     strong_skills = []
     moderate_skills = []
     weak_skills = []
-    missing_skills = []
-    
-    for skill in found_skills:
     
-        count = all_text.count(skill.lower())
-        category = "General"
-        for cat, skills_list in skill_db.items():
-            if skill in skills_list:
-                category = cat
-                break
-        
+    for skill, (count, category) in found_skills.items():
         if count >= 3:
             strong_skills.append({"name": skill.title(), "level": min(90, 70 + count * 5), "category": category})
         elif count >= 2:
@@ -303,70 +717,39 @@ def generate_fallback_analysis(resume_text, career_goal, skills_text=""):
     
     
     if len(strong_skills) < 2:
-        strong_skills.extend([
-            {"name": "Communication", "level": 75, "category": "Soft Skills"},
-            {"name": "Problem Solving", "level": 70, "category": "Soft Skills"},
-        ])
+        strong_skills.extend(SOFT_SKILLS)
     
     
-    for skill in requirements["required"]:
-        if skill.lower() not in found_skills and skill.lower() not in [s["name"].lower() for s in strong_skills + moderate_skills + weak_skills]:
-            missing_skills.append({"name": skill.title(), "importance": "Critical", "category": "Core"})
-    
-    for skill in requirements["nice_to_have"]:
-        if skill.lower() not in found_skills and skill.lower() not in [s["name"].lower() for s in strong_skills + moderate_skills + weak_skills]:
-            missing_skills.append({"name": skill.title(), "importance": "High", "category": "Advanced"})
+    known = set(found_skills) | {s["name"].lower() for s in strong_skills + moderate_skills + weak_skills}
+    missing_skills = fallback_templates.for_requirements(requirements).missing(known)
     
     
     categories = {}
-    for skill in strong_skills:
-        cat = skill["category"]
-        if cat not in categories:
-            categories[cat] = {"scores": [], "required": 85}
-        categories[cat]["scores"].append(skill["level"])
-    
-    for skill in moderate_skills:
-        cat = skill["category"]
-        if cat not in categories:
-            categories[cat] = {"scores": [], "required": 85}
-        categories[cat]["scores"].append(skill["level"])
-    
-    for skill in weak_skills:
-        cat = skill["category"]
-        if cat not in categories:
-            categories[cat] = {"scores": [], "required": 85}
-        categories[cat]["scores"].append(skill["level"])
-    
+    for skill in strong_skills + moderate_skills + weak_skills:
+        categories.setdefault(skill["category"], []).append(skill["level"])
     
     for skill in missing_skills:
-        cat = skill["category"]
-        if cat not in categories:
-            categories[cat] = {"scores": [10], "required": 85}
+        categories.setdefault(skill["category"], [10])
     
     skill_categories = []
-    for cat_name, cat_data in categories.items():
-        avg_score = int(sum(cat_data["scores"]) / len(cat_data["scores"])) if cat_data["scores"] else 15
+    for cat_name, scores in categories.items():
+        avg_score = int(sum(scores) / len(scores))
         skill_categories.append({
             "name": cat_name,
             "current_score": avg_score,
-            "required_score": cat_data["required"],
-            "gap": max(0, cat_data["required"] - avg_score)
+            "required_score": 85,
+            "gap": max(0, 85 - avg_score)
         })
     
     if not skill_categories:
-        skill_categories = [
-            {"name": "Programming", "current_score": 40, "required_score": 85, "gap": 45},
-            {"name": "Frameworks", "current_score": 30, "required_score": 80, "gap": 50},
-            {"name": "Tools & DevOps", "current_score": 25, "required_score": 75, "gap": 50},
-            {"name": "Soft Skills", "current_score": 60, "required_score": 80, "gap": 20},
-            {"name": "Domain Knowledge", "current_score": 35, "required_score": 85, "gap": 50},
-        ]
+        skill_categories = DEFAULT_CATEGORIES
     
     
     all_scores = [s["level"] for s in strong_skills + moderate_skills + weak_skills]
     overall = int(sum(all_scores) / len(all_scores)) if all_scores else 35
+    missing_names = [s["name"] for s in missing_skills]
     
-    result = {
+    data = {
         "profile_summary": {
             "name": "Learner",
             "current_level": "Beginner" if overall < 40 else "Intermediate" if overall < 70 else "Advanced",
@@ -381,109 +764,156 @@ def generate_fallback_analysis(resume_text, career_goal, skills_text=""):
             "missing_skills": missing_skills[:8]
         },
         "skill_categories": skill_categories,
-        "learning_roadmap": {
-            "phases": [
-                {
-                    "phase_number": 1,
-                    "title": "Foundation Building",
-                    "duration": "4-6 weeks",
-                    "description": f"Build core foundations required for {career_goal}",
-                    "skills_to_learn": [s["name"] for s in missing_skills[:3]] if missing_skills else ["Core Concepts"],
-                    "resources": [
-                        {"type": "Course", "name": f"Introduction to {career_goal}", "platform": "Coursera", "url": ""},
-                        {"type": "Course", "name": f"{missing_skills[0]['name'] if missing_skills else 'Core'} Fundamentals", "platform": "Udemy", "url": ""},
-                        {"type": "Project", "name": "Portfolio Starter Project", "description": "Build a basic project to demonstrate fundamentals"}
-                    ],
-                    "milestones": ["Complete core concepts", "Build first mini-project", "Pass fundamentals assessment"]
-                },
-                {
-                    "phase_number": 2,
-                    "title": "Skill Development",
-                    "duration": "6-8 weeks",
-                    "description": "Develop intermediate skills and start building real projects",
-                    "skills_to_learn": [s["name"] for s in missing_skills[2:5]] if len(missing_skills) > 2 else ["Advanced Concepts"],
-                    "resources": [
-                        {"type": "Course", "name": f"Advanced {career_goal} Skills", "platform": "Udacity", "url": ""},
-                        {"type": "Project", "name": "Full-Stack Project", "description": "Build a comprehensive project using learned skills"},
-                        {"type": "Course", "name": "Industry Best Practices", "platform": "LinkedIn Learning", "url": ""}
-                    ],
-                    "milestones": ["Complete intermediate modules", "Build 2 portfolio projects", "Contribute to open source"]
-                },
-                {
-                    "phase_number": 3,
-                    "title": "Advanced Specialization",
-                    "duration": "4-6 weeks",
-                    "description": "Deep dive into specialized topics and industry tools",
-                    "skills_to_learn": [s["name"] for s in missing_skills[4:7]] if len(missing_skills) > 4 else ["Specialization"],
-                    "resources": [
-                        {"type": "Course", "name": f"Mastering {career_goal}", "platform": "Pluralsight", "url": ""},
-                        {"type": "Project", "name": "Capstone Project", "description": "Industry-grade project showcasing all skills"},
-                        {"type": "Course", "name": "System Design & Architecture", "platform": "educative.io", "url": ""}
-                    ],
-                    "milestones": ["Complete specialization", "Build capstone project", "Get peer review"]
-                },
-                {
-                    "phase_number": 4,
-                    "title": "Industry Readiness",
-                    "duration": "3-4 weeks",
-                    "description": "Prepare for industry with mock interviews, networking, and final polish",
-                    "skills_to_learn": ["Interview Preparation", "Portfolio Building", "Networking"],
-                    "resources": [
-                        {"type": "Course", "name": "Technical Interview Prep", "platform": "LeetCode", "url": ""},
-                        {"type": "Project", "name": "Portfolio Website", "description": "Build a professional portfolio showcasing all projects"},
-                        {"type": "Course", "name": "Career Development", "platform": "LinkedIn", "url": ""}
-                    ],
-                    "milestones": ["Complete mock interviews", "Finalize portfolio", "Apply to positions"]
-                }
-            ]
-        },
-        "priority_recommendations": [
-            {"rank": i + 1, "skill": s["name"], "reason": f"Essential for {career_goal} role", "time_estimate": "2-4 weeks", "difficulty": "Medium"}
-            for i, s in enumerate(missing_skills[:5])
-        ] if missing_skills else [
-            {"rank": 1, "skill": "Core Programming", "reason": "Foundation skill", "time_estimate": "4 weeks", "difficulty": "Medium"}
-        ],
+        "learning_roadmap": render_roadmap(career_goal, missing_names),
+        "priority_recommendations": render_recommendations(career_goal, missing_names),
         "career_readiness": {
             "overall_score": overall,
             "strengths": [s["name"] for s in strong_skills[:3]],
-            "areas_to_improve": [s["name"] for s in missing_skills[:3]] if missing_skills else ["General Skills"],
+            "areas_to_improve": missing_names[:3] if missing_names else ["General Skills"],
             "estimated_time_to_ready": "3-6 months",
             "market_demand": "High"
         },
-        "recommended_projects": [
-            {
-                "name": f"Personal {career_goal} Dashboard",
-                "description": f"Build an interactive dashboard related to {career_goal}",
-                "skills_practiced": [s["name"] for s in (strong_skills + moderate_skills)[:3]] or ["Programming"],
-                "difficulty": "Intermediate",
-                "estimated_time": "2-3 weeks"
-            },
-            {
-                "name": "API-Driven Application",
-                "description": "Create a full-stack application consuming external APIs",
-                "skills_practiced": ["REST API", "Frontend", "Backend"],
-                "difficulty": "Intermediate",
-                "estimated_time": "2 weeks"
-            },
-            {
-                "name": "Open Source Contribution",
-                "description": "Find and contribute to an open source project in your domain",
-                "skills_practiced": ["Git", "Collaboration", "Code Review"],
-                "difficulty": "Intermediate",
-                "estimated_time": "Ongoing"
-            },
-            {
-                "name": f"{career_goal} Capstone Project",
-                "description": f"End-to-end project demonstrating readiness for {career_goal}",
-                "skills_practiced": [s["name"] for s in missing_skills[:3]] if missing_skills else ["All Skills"],
-                "difficulty": "Advanced",
-                "estimated_time": "4-6 weeks"
-            }
-        ]
+        "recommended_projects": render_projects(career_goal, [s["name"] for s in (strong_skills + moderate_skills)[:3]],
+                                                missing_names)
     }
+    # data still shares the template fragments, so callers get a thawed copy
+    frozen = freeze(data)
+    fallback_memo.set(memo_key, frozen)
+    fallback_memo.set(input_key, frozen)
     
-    return {"success": True, "data": result}
+    return {"success": True, "data": thaw(frozen)}
+
+
+
+# Sampling profiler for single requests: when PROFILE_DIR is set, a request
+# sent with ?profile=1 or an "X-Profile: 1" header has its stack sampled and
+# written there as folded stacks, for flamegraph.pl or speedscope.
+PROFILE_DIR = os.getenv('PROFILE_DIR', '')
+PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL', '0.005'))
+
+
+def run_analysis_job(payload):
+    """Run one queued analysis; the deadline starts when a worker picks it up."""
+    with app.app_context():
+        g.file_type = payload["file_type"]
+        g.started = time.perf_counter()
+        if payload.get("learner_id") and learner_store:
+            return analyze_learner(payload["learner_id"], payload["resume_text"], payload["career_goal"],
+                                   payload["skills_text"], new_deadline(), payload["client"])
+        return analyze_with_gemini(payload["resume_text"], payload["career_goal"], payload["skills_text"],
+                                   new_deadline(), payload["client"])
+
+
+job_queue = queue_from_env(run_analysis_job)
+if job_queue:
+    registry.gauges('hiresense_jobs', 'Analysis job queue statistics.', job_queue.stats)
+
+
+def run_batch_analysis(items):
+    """Analyse batch items (see batch.read_batch), yielding result records as they finish.
+
+    With Gemini configured, at most BATCH_CONCURRENCY analyses of the batch
+    wait on Gemini at once so interactive requests keep their share;
+    otherwise the fallback engine runs in a pool of BATCH_PROCESSES worker
+    processes. Batches are not subject to per-client rate limits.
+    """
+    workers = parser_pool.size if parser_pool else 1
+    use_gemini = gemini_configured()
+    if use_gemini:
+        def analyze(resume_text, career_goal, skills_text):
+            return analyze_with_gemini(resume_text, career_goal, skills_text, new_deadline())
+        results = run_batch(items, extract_document, analyze=analyze, extract_workers=workers,
+                            concurrency=app.config['BATCH_CONCURRENCY'])
+    else:
+        results = run_batch(items, extract_document, fallback=generate_fallback_analysis, extract_workers=workers,
+                            concurrency=app.config['BATCH_CONCURRENCY'], processes=app.config['BATCH_PROCESSES'])
+    for record in results:
+        if record["success"]:
+            record["role"] = match_role(record["career_goal"])
+            if not use_gemini:
+                # Analyses in worker processes cannot count themselves
+                file_type = record["filename"].rsplit('.', 1)[1].lower() if "filename" in record else 'text'
+                analyses_total.inc(path="fallback", role=record["role"], file_type=file_type)
+        yield record
+
+
+def wants_async():
+    """True when the client asked for a job id instead of waiting for the result."""
+    return (request.args.get('async') == '1' or request.form.get('async') == '1'
+            or 'respond-async' in request.headers.get('Prefer', ''))
+
+
+@app.before_request
+def start_request_instrumentation():
+    g.started = time.perf_counter()
+    if PROFILE_DIR and (request.args.get('profile') == '1' or request.headers.get('X-Profile') == '1'):
+        name = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{request.endpoint or 'unknown'}.folded"
+        g.profile_path = os.path.join(PROFILE_DIR, name)
+        g.profiler = SamplingProfiler(threading.get_ident(), PROFILE_INTERVAL).start()
+
+
+@app.after_request
+def finish_request_instrumentation(response):
+    timings = g.get('stage_timings')
+    if timings:
+        if not response.is_streamed:
+            timings = timings + [("total", time.perf_counter() - g.started)]
+        response.headers['Server-Timing'] = server_timing_header(timings)
+    profiler = g.get('profiler')
+    if profiler is not None:
+        path = g.profile_path
+        response.headers['X-Profile-File'] = os.path.basename(path)
+        
+        # Streamed bodies are produced after this hook, so sample until the
+        # response is closed
+        def write_profile():
+            profiler.stop()
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            profiler.write_folded(path)
+        response.call_on_close(write_profile)
+    return response
+
+
+# JSON answers to GET and HEAD carry an ETag, so a repeat with If-None-Match
+# is answered with a bodyless 304. Bodies of GZIP_MIN_BYTES or more are
+# gzip-compressed for clients that accept it (0 disables), and recent
+# compressed bodies are kept by encoding, level and ETag (or body digest) so
+# identical answers, such as memoised fallback analyses, are compressed once.
+GZIP_MIN_BYTES = int(os.getenv('GZIP_MIN_BYTES', '512'))
+GZIP_LEVEL = int(os.getenv('GZIP_LEVEL', '6'))
+COMPRESSIBLE_TYPES = {'application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript'}
+compressed_bodies = LRUMemo(256)
+
 
+@app.after_request
+def compress_response(response):
+    if response.is_streamed or response.direct_passthrough or response.status_code != 200:
+        return response
+    if request.method in ('GET', 'HEAD') and response.mimetype == 'application/json' and 'ETag' not in response.headers:
+        response.add_etag()
+        response.make_conditional(request)
+        if response.status_code == 304:
+            return response
+    if not GZIP_MIN_BYTES or response.mimetype not in COMPRESSIBLE_TYPES or 'Content-Encoding' in response.headers:
+        return response
+    response.vary.add('Accept-Encoding')
+    if not request.accept_encodings['gzip']:
+        return response
+    body = response.get_data()
+    if len(body) < GZIP_MIN_BYTES:
+        return response
+    etag, _ = response.get_etag()
+    memo_key = ('gzip', GZIP_LEVEL, etag or hashlib.sha1(body).hexdigest())
+    compressed = compressed_bodies.get(memo_key)
+    if compressed is None:
+        compressed = gzip.compress(body, GZIP_LEVEL)
+        compressed_bodies.set(memo_key, compressed)
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = 'gzip'
+    if etag:
+        # Weak, as the compressed body differs byte for byte from the original
+        response.set_etag(etag, weak=True)
+    return response
 
 
 @app.route('/')
@@ -492,40 +922,67 @@ def index():
     return render_template('index.html')
 
 
+def read_analysis_request():
+    """Read the analysis form fields and any uploaded resume.
+
+    Returns (career_goal, resume_text, skills_text, error).
+    """
+    with timed_stage("upload"):
+        career_goal = request.form.get('career_goal', '').strip()
+        skills_text = request.form.get('skills_text', '').strip()
+        resume_text = request.form.get('resume_text', '').strip()
+        file = request.files.get('resume_file')
+    
+    if not career_goal:
+        return career_goal, resume_text, skills_text, "Please provide a career goal or target role."
+    
+
+    if file and file.filename and allowed_file(file.filename):
+        g.file_type = file.filename.rsplit('.', 1)[1].lower()
+        extracted, error = extract_upload(file)
+        if error:
+            return career_goal, resume_text, skills_text, error
+        if extracted:
+            resume_text = extracted
+    
+    if not resume_text and not skills_text:
+        return career_goal, resume_text, skills_text, "Please provide a resume, academic details, or skills list."
+    
+    return career_goal, resume_text, skills_text, None
+
+
 @app.route('/analyze', methods=['POST'])
 def analyze():
     """Analyze resume/skills and generate learning path."""
+    deadline = new_deadline()
     try:
-        career_goal = request.form.get('career_goal', '').strip()
-        skills_text = request.form.get('skills_text', '').strip()
-        resume_text = request.form.get('resume_text', '').strip()
-        
-        if not career_goal:
-            return jsonify({"success": False, "error": "Please provide a career goal or target role."})
+        career_goal, resume_text, skills_text, error = read_analysis_request()
+        if error:
+            return jsonify({"success": False, "error": error})
         
 
-        file = request.files.get('resume_file')
-        if file and file.filename and allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            unique_name = f"{uuid.uuid4().hex}_{filename}"
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_name)
-            file.save(filepath)
-            
-            extracted = extract_text(filepath)
-            if extracted:
-                resume_text = extracted
-            
-
+        learner_id = request.form.get('learner_id', '').strip()[:128]
+        if learner_id and learner_store:
+            error = check_learner_access(learner_id, request.form.get('learner_token', '').strip())
+            if error:
+                return jsonify({"success": False, "error": error}), 403
+        if job_queue and wants_async():
+            payload = {"resume_text": resume_text, "career_goal": career_goal, "skills_text": skills_text,
+                       "learner_id": learner_id, "file_type": g.get('file_type', 'text'), "client": request.remote_addr}
             try:
-                os.remove(filepath)
-            except:
-                pass
-        
-        if not resume_text and not skills_text:
-            return jsonify({"success": False, "error": "Please provide a resume, academic details, or skills list."})
+                job_id = job_queue.submit(payload)
+            except QueueFull as e:
+                print(f"Job rejected: {e}")
+                return jsonify({"success": False, "error": "The server is busy. Please try again shortly."}), 503
+            status_url = url_for('job_status', job_id=job_id)
+            response = jsonify({"success": True, "job_id": job_id, "status": "queued", "status_url": status_url})
+            response.headers['Location'] = status_url
+            return response, 202
         
-
-        result = analyze_with_gemini(resume_text, career_goal, skills_text)
+        if learner_id and learner_store:
+            result = analyze_learner(learner_id, resume_text, career_goal, skills_text, deadline, request.remote_addr)
+        else:
+            result = analyze_with_gemini(resume_text, career_goal, skills_text, deadline, request.remote_addr)
         
         return jsonify(result)
         
@@ -534,21 +991,189 @@ def analyze():
         return jsonify({"success": False, "error": f"An error occurred during analysis: {str(e)}"})
 
 
+@app.route('/analyze/stream', methods=['POST'])
+def analyze_stream():
+    """Stream the analysis as NDJSON, one event per completed section."""
+    deadline = new_deadline()
+    try:
+        career_goal, resume_text, skills_text, error = read_analysis_request()
+    except Exception as e:
+        print(f"Analysis error: {e}")
+        error = f"An error occurred during analysis: {str(e)}"
+    if error:
+        return jsonify({"success": False, "error": error})
+    
+    def generate():
+        try:
+            for event in stream_analysis(resume_text, career_goal, skills_text, deadline, request.remote_addr):
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            print(f"Analysis error: {e}")
+            yield json.dumps({"event": "error", "success": False, "error": f"An error occurred during analysis: {str(e)}"}) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
+
+@app.route('/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """Analyse a cohort from a zip or CSV upload, streaming NDJSON results and a cohort report."""
+    # Cohort uploads may be far larger than a single resume
+    request.max_content_length = app.config['BATCH_MAX_CONTENT_LENGTH']
+    try:
+        with timed_stage("upload"):
+            file = request.files.get('batch_file')
+            default_goal = request.form.get('career_goal', '').strip()
+            cohort_name = request.form.get('cohort', '').strip()
+        if not file or not file.filename:
+            return jsonify({"success": False, "error": "Please upload a .zip of resumes or a .csv file."})
+        if cohort_name and not (app.config['COHORT_DIR'] and valid_cohort_name(cohort_name)):
+            return jsonify({"success": False, "error": "Cohorts are not enabled, or the cohort name is invalid."})
+        items = read_batch(file.stream.read(), file.filename, default_goal,
+                           max_items=app.config['BATCH_MAX_ITEMS'], max_file_bytes=app.config['MAX_CONTENT_LENGTH'])
+    except BatchError as e:
+        return jsonify({"success": False, "error": str(e)})
+    
+    def generate():
+        report = CohortReport()
+        builder = CohortBuilder(TAXONOMY) if cohort_name else None
+        try:
+            yield json.dumps({"event": "accepted", "learners": len(items)}) + "\n"
+            for record in run_batch_analysis(items):
+                report.add(record)
+                if builder:
+                    builder.add_record(record)
+                yield json.dumps(record) + "\n"
+            summary = report.summary()
+            if builder:
+                builder.build().save(os.path.join(app.config['COHORT_DIR'], cohort_name))
+                summary["cohort_url"] = url_for('cohort_report', name=cohort_name)
+            yield json.dumps({"event": "report", "report": summary}) + "\n"
+            yield json.dumps({"event": "done", "success": True}) + "\n"
+        except Exception as e:
+            print(f"Batch analysis error: {e}")
+            yield json.dumps({"event": "error", "success": False, "error": f"An error occurred during analysis: {str(e)}"}) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
+
+_cohorts = {}
+_cohorts_lock = threading.Lock()
+
+
+def get_cohort(name):
+    """Return the saved cohort called name, memory-mapped once per version, or None."""
+    path = os.path.join(app.config['COHORT_DIR'], name)
+    try:
+        version = os.stat(os.path.join(path, 'meta.json')).st_mtime_ns
+    except OSError:
+        return None
+    with _cohorts_lock:
+        loaded = _cohorts.get(name)
+        if loaded is None or loaded[0] != version:
+            loaded = _cohorts[name] = (version, load_cohort(path))
+        return loaded[1]
+
+
+def _float_arg(name):
+    value = request.args.get(name)
+    return float(value) if value not in (None, '') else None
+
+
+@app.route('/cohorts/<name>')
+def cohort_report(name):
+    """Skill gap analytics for a saved cohort, optionally filtered by role, department and readiness."""
+    if not app.config['COHORT_DIR'] or not valid_cohort_name(name):
+        return jsonify({"success": False, "error": "Cohort not found."}), 404
+    cohort = get_cohort(name)
+    if cohort is None:
+        return jsonify({"success": False, "error": "Cohort not found."}), 404
+    try:
+        mask = cohort.select(
+            role=request.args.get('role') or None,
+            department=request.args.get('department') or None,
+            min_readiness=_float_arg('min_readiness'),
+            max_readiness=_float_arg('max_readiness'),
+        )
+        top_n = max(0, int(request.args.get('top', '10')))
+        bins = min(100, max(1, int(request.args.get('bins', '10'))))
+    except ValueError:
+        return jsonify({"success": False, "error": "Invalid filter value."}), 400
+    with timed_stage("cohort"):
+        report = cohort.report(mask, top_n=top_n, bins=bins)
+    return jsonify({"success": True, "cohort": name, **report})
+
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Status and, once finished, the result of a queued analysis."""
+    job = job_queue.get(job_id) if job_queue else None
+    if job is None:
+        return jsonify({"success": False, "error": "Job not found or expired."}), 404
+    
+    body = {"success": job["status"] != "failed", "job_id": job_id, "status": job["status"]}
+    if job["started"]:
+        body["wait_seconds"] = round(job["started"] - job["created"], 3)
+    if job["finished"]:
+        body["run_seconds"] = round(job["finished"] - job["started"], 3)
+    if job["status"] == "done":
+        body["result"] = job["result"]
+    elif job["status"] == "failed":
+        body["error"] = f"An error occurred during analysis: {job['error']}"
+    
+    # Pollers send If-None-Match and get a bodyless 304 until the job changes
+    response = jsonify(body)
+    response.add_etag()
+    response.headers['Cache-Control'] = 'no-cache'
+    if job["status"] in ("queued", "running"):
+        response.headers['Retry-After'] = '1'
+    return response.make_conditional(request)
+
+
 @app.route('/health')
 def health():
     """Health check endpoint."""
+    outcomes = {}
+    for (path, _, _), count in analyses_total.values().items():
+        outcomes[path] = outcomes.get(path, 0) + count
+    parse_outcomes = {outcome: count for (outcome,), count in llm_parse_total.values().items()}
+    total = sum(outcomes.values())
     return jsonify({
         "status": "healthy",
-        "gemini_configured": bool(GEMINI_API_KEY),
+        "pid": os.getpid(),
+        "gemini_configured": gemini_configured(),
+        "cache": analysis_cache.stats(),
+        "parser_pool": parser_pool.stats() if parser_pool else None,
+        "gemini": gemini_client.stats(),
+        "jobs": job_queue.stats() if job_queue else None,
+        "admission": admission.stats(),
+        "near_duplicates": near_duplicates.stats() if near_duplicates else None,
+        "roles": role_resolver.stats(),
+        "learners": learner_store.stats() if learner_store else None,
+        "fallback_memo": fallback_memo.stats(),
+        "analyses": outcomes,
+        "llm_parse": parse_outcomes,
+        "fallback_rate": round(sum(outcomes.get(k, 0) for k in ("fallback", "partial", "degraded")) / total, 4) if total else 0.0,
         "timestamp": datetime.now().isoformat()
     })
 
 
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics for this worker process."""
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+
 if __name__ == '__main__':
     print("\n" + "=" * 60)
     print("   HireSense - AI Learning Path & Skill Gap Analyzer")
     print("=" * 60)
-    print(f"   Gemini API: {'[OK] Configured' if GEMINI_API_KEY else '[--] Not set (using fallback)'}")
+    print(f"   Gemini API: {'[OK] Configured' if gemini_configured() else '[--] Not set (using fallback)'}")
     print(f"   Server: http://localhost:5000")
     print("=" * 60 + "\n")
     app.run(debug=True, port=5000)
@@ -0,0 +1,392 @@
+"""
+HireSense - Batch analysis for cohorts.
+Reads a zip of resumes (with an optional manifest.csv) or a CSV of resume
+texts, extracts documents in parallel, runs analyses with bounded
+concurrency and yields per-learner results as they finish, while a
+CohortReport aggregates them into an institution-level skill gap summary.
+
+    python -m batch cohort.zip --goal "Data Scientist" --out results.ndjson
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import threading
+import time
+import zipfile
+from collections import Counter
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from parser_pool import forkserver_context
+
+DOCUMENT_EXTENSIONS = {'pdf', 'docx', 'txt'}
+MANIFEST_NAME = 'manifest.csv'
+
+
+class BatchError(ValueError):
+    """The batch upload cannot be read."""
+
+
+def _columns(row):
+    return {(key or '').strip().lower(): (value or '').strip() for key, value in row.items()}
+
+
+def _read_csv(data):
+    try:
+        text = data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        text = data.decode('latin-1')
+    return [_columns(row) for row in csv.DictReader(io.StringIO(text))]
+
+
+def _read_member(archive, info, max_file_bytes):
+    # Trust what is actually inflated, not the sizes claimed in the header
+    with archive.open(info) as f:
+        data = f.read(max_file_bytes + 1)
+    if len(data) > max_file_bytes:
+        raise BatchError(f"{info.filename} is larger than {max_file_bytes // (1024 * 1024)}MB.")
+    return data
+
+
+def read_batch(data, filename, default_goal="", max_items=500, max_file_bytes=16 * 1024 * 1024):
+    """Parse a batch upload into a list of learner items.
+
+    A .zip holds PDF/DOCX/TXT resumes and optionally a manifest.csv with
+    filename, learner_id, career_goal, skills_text and department columns.
+    A .csv has one learner per row with learner_id, career_goal,
+    resume_text, skills_text and department columns. Items carry either
+    "data" (document bytes) or "resume_text"; items that cannot be analysed
+    carry an "error" instead.
+    Raises BatchError when the upload itself is unusable.
+    """
+    ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if ext == 'zip':
+        items = _read_zip(data, default_goal, max_items, max_file_bytes)
+    elif ext == 'csv':
+        items = _read_rows(data, default_goal, max_items)
+    else:
+        raise BatchError("Please upload a .zip of resumes or a .csv file.")
+    if not items:
+        raise BatchError("The batch contains no resumes.")
+    for item in items:
+        if not item.get("error") and not item["career_goal"]:
+            item["error"] = "No career goal given for this learner."
+    return items
+
+
+def _read_zip(data, default_goal, max_items, max_file_bytes):
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+    except zipfile.BadZipFile:
+        raise BatchError("The uploaded file is not a valid zip archive.")
+    with archive:
+        members = [
+            info for info in archive.infolist()
+            if not info.is_dir() and not info.filename.startswith('__MACOSX/')
+            and not os.path.basename(info.filename).startswith('.')
+        ]
+        manifest = {}
+        for info in members:
+            if os.path.basename(info.filename).lower() == MANIFEST_NAME:
+                for row in _read_csv(_read_member(archive, info, max_file_bytes)):
+                    if row.get('filename'):
+                        manifest[os.path.basename(row['filename'])] = row
+        documents = [info for info in members if os.path.basename(info.filename).lower() != MANIFEST_NAME]
+        if len(documents) > max_items:
+            raise BatchError(f"A batch may contain at most {max_items} resumes.")
+
+        items = []
+        for info in documents:
+            name = os.path.basename(info.filename)
+            row = manifest.get(name, {})
+            item = {
+                "learner_id": row.get('learner_id') or name.rsplit('.', 1)[0],
+                "career_goal": row.get('career_goal') or default_goal,
+                "skills_text": row.get('skills_text', ''),
+                "department": row.get('department', ''),
+                "filename": name,
+            }
+            if name.rsplit('.', 1)[-1].lower() not in DOCUMENT_EXTENSIONS:
+                item["error"] = "Unsupported file type. Use PDF, DOCX or TXT."
+            else:
+                item["data"] = _read_member(archive, info, max_file_bytes)
+            items.append(item)
+    return items
+
+
+def _read_rows(data, default_goal, max_items):
+    rows = _read_csv(data)
+    if rows and 'resume_text' not in rows[0] and 'skills_text' not in rows[0]:
+        raise BatchError("The CSV needs a resume_text or skills_text column.")
+    if len(rows) > max_items:
+        raise BatchError(f"A batch may contain at most {max_items} resumes.")
+    items = []
+    for number, row in enumerate(rows, 1):
+        item = {
+            "learner_id": row.get('learner_id') or str(number),
+            "career_goal": row.get('career_goal') or default_goal,
+            "skills_text": row.get('skills_text', ''),
+            "department": row.get('department', ''),
+            "resume_text": row.get('resume_text', ''),
+        }
+        if not item["resume_text"] and not item["skills_text"]:
+            item["error"] = "No resume text or skills given for this learner."
+        items.append(item)
+    return items
+
+
+def result_source(result):
+    """Name the engine that answered an analysis result."""
+    if result.get("degraded"):
+        return "degraded"
+    if result.get("similar"):
+        return "similar"
+    if result.get("cached"):
+        return "cache"
+    provenance = result.get("provenance")
+    if not provenance:
+        return "fallback"
+    return "gemini" if all(source == "gemini" for source in provenance.values()) else "partial"
+
+
+_process_pools = {}
+_process_pools_lock = threading.Lock()
+
+
+def process_pool(processes, preload=()):
+    """Return the long-lived pool of `processes` worker processes, starting it on first use.
+
+    Workers come from the process's forkserver (see
+    parser_pool.forkserver_context), so they start with the preload modules
+    such as the taxonomy and role index loaded but never inherit locks
+    held by this process's threads.
+    The pool is shared by later batches; one broken by a dying worker is
+    replaced.
+    """
+    with _process_pools_lock:
+        pool = _process_pools.get(processes)
+        # ProcessPoolExecutor offers no public way to ask whether it is broken
+        if pool is None or pool._broken:
+            pool = _process_pools[processes] = ProcessPoolExecutor(processes, mp_context=forkserver_context(preload))
+        return pool
+
+
+def run_batch(items, extract, analyze=None, fallback=None, extract_workers=2, concurrency=4, processes=None):
+    """Analyse items, yielding one result record per item as it finishes.
+
+    extract(data, filename) returns (text, error) and runs on
+    extract_workers threads. Analyses go to analyze(resume_text,
+    career_goal, skills_text) on at most `concurrency` threads when it is
+    given, and otherwise to fallback() (a picklable module-level function)
+    in the long-lived pool of `processes` worker processes (None: one per
+    CPU, 0: run on threads instead).
+    """
+    if analyze is not None:
+        analysis_pool = ThreadPoolExecutor(concurrency, thread_name_prefix='batch-analyze')
+        engine = analyze
+    elif processes == 0:
+        analysis_pool = ThreadPoolExecutor(concurrency, thread_name_prefix='batch-fallback')
+        engine = fallback
+    else:
+        analysis_pool = process_pool(processes, preload=[fallback.__module__])
+        engine = fallback
+    owns_pool = isinstance(analysis_pool, ThreadPoolExecutor)
+
+    def record(index, **fields):
+        item = items[index]
+        out = {"event": "result", "index": index, "learner_id": item["learner_id"],
+               "career_goal": item["career_goal"]}
+        for key in ("filename", "department"):
+            if item.get(key):
+                out[key] = item[key]
+        out.update(fields)
+        return out
+
+    pending = {}
+    started = {}
+    with ThreadPoolExecutor(extract_workers, thread_name_prefix='batch-extract') as extract_pool, \
+            (analysis_pool if owns_pool else nullcontext()):
+        def submit_analysis(index, resume_text):
+            item = items[index]
+            future = analysis_pool.submit(engine, resume_text, item["career_goal"], item["skills_text"])
+            pending[future] = ("analyze", index)
+
+        try:
+            for index, item in enumerate(items):
+                started[index] = time.perf_counter()
+                if item.get("error"):
+                    yield record(index, success=False, error=item["error"])
+                elif "data" in item:
+                    pending[extract_pool.submit(extract, item["data"], item["filename"])] = ("extract", index)
+                else:
+                    submit_analysis(index, item["resume_text"])
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, index = pending.pop(future)
+                    try:
+                        value = future.result()
+                    except Exception as e:
+                        print(f"Batch item {items[index]['learner_id']} failed: {e}")
+                        yield record(index, success=False, error=f"An error occurred during analysis: {str(e)}")
+                        continue
+                    if stage == "extract":
+                        text, error = value
+                        if not error and not text and not items[index]["skills_text"]:
+                            error = "No text could be read from this file."
+                        if error:
+                            yield record(index, success=False, error=error)
+                        else:
+                            submit_analysis(index, text)
+                        continue
+                    seconds = round(time.perf_counter() - started[index], 3)
+                    if not value.get("success"):
+                        yield record(index, success=False, error=value.get("error", "Analysis failed."), seconds=seconds)
+                        continue
+                    yield record(index, success=True, source=result_source(value), seconds=seconds, data=value["data"])
+        finally:
+            # Analyses of an abandoned batch must not keep the shared pool busy
+            for future in pending:
+                future.cancel()
+
+
+def _percentile(ordered, p):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+class CohortReport:
+    """Aggregate per-learner results into a cohort skill gap report.
+
+    Only the figures the report needs are kept per learner, so a stream of
+    any length can be summarised without holding the analyses.
+    """
+
+    def __init__(self, top_n=10):
+        self.top_n = top_n
+        self.learners = 0
+        self.failed = 0
+        self.sources = Counter()
+        self.roles = Counter()
+        self.readiness = []
+        self.missing = Counter()
+        self.critical = Counter()
+        self.gap_totals = Counter()
+        self.gap_counts = Counter()
+        self.started = time.perf_counter()
+
+    def add(self, record):
+        self.learners += 1
+        if not record.get("success"):
+            self.failed += 1
+            return
+        self.sources[record.get("source", "unknown")] += 1
+        if record.get("role"):
+            self.roles[record["role"]] += 1
+        data = record["data"]
+        score = data.get("career_readiness", {}).get("overall_score")
+        if isinstance(score, (int, float)):
+            self.readiness.append(score)
+        seen = set()
+        for skill in data.get("skill_analysis", {}).get("missing_skills", []):
+            name = skill.get("name", "").strip().title()
+            if name and name not in seen:
+                seen.add(name)
+                self.missing[name] += 1
+                if skill.get("importance") == "Critical":
+                    self.critical[name] += 1
+        for category in data.get("skill_categories", []):
+            gap = category.get("gap")
+            if category.get("name") and isinstance(gap, (int, float)):
+                self.gap_totals[category["name"]] += gap
+                self.gap_counts[category["name"]] += 1
+
+    def summary(self):
+        analysed = self.learners - self.failed
+        elapsed = time.perf_counter() - self.started
+        readiness = None
+        if self.readiness:
+            ordered = sorted(self.readiness)
+            readiness = {
+                "mean": round(sum(ordered) / len(ordered), 1),
+                "p25": _percentile(ordered, 25),
+                "p50": _percentile(ordered, 50),
+                "p75": _percentile(ordered, 75),
+                "min": ordered[0],
+                "max": ordered[-1],
+            }
+        return {
+            "learners": self.learners,
+            "analysed": analysed,
+            "failed": self.failed,
+            "sources": dict(self.sources),
+            "roles": dict(self.roles.most_common()),
+            "readiness": readiness,
+            "top_missing_skills": [
+                {"skill": name, "learners": count, "share": round(count / analysed, 3),
+                 "critical_for": self.critical[name]}
+                for name, count in self.missing.most_common(self.top_n)
+            ],
+            "category_gaps": sorted(
+                ({"category": name, "mean_gap": round(self.gap_totals[name] / count, 1), "learners": count}
+                 for name, count in self.gap_counts.items()),
+                key=lambda entry: -entry["mean_gap"],
+            ),
+            "elapsed_seconds": round(elapsed, 2),
+            "learners_per_minute": round(self.learners / elapsed * 60, 1) if elapsed else None,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse a cohort of resumes from a zip or CSV file.")
+    parser.add_argument('path', help="Zip of PDF/DOCX/TXT resumes (optional manifest.csv) or CSV of resume texts")
+    parser.add_argument('--goal', default='', help="Career goal for learners without one in the manifest")
+    parser.add_argument('--out', metavar='PATH', help="Write NDJSON results here instead of stdout")
+    parser.add_argument('--report', metavar='PATH', help="Write the cohort report as JSON here")
+    parser.add_argument('--cohort', metavar='DIR', help="Save the learner x skill matrix here for cohort queries")
+    args = parser.parse_args(argv)
+
+    # The app is imported here so that it can import this module
+    import app as hiresense
+    from cohort import CohortBuilder
+
+    with open(args.path, 'rb') as f:
+        data = f.read()
+    try:
+        items = read_batch(data, os.path.basename(args.path), args.goal,
+                           max_items=hiresense.app.config['BATCH_MAX_ITEMS'])
+    except BatchError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    report = CohortReport()
+    builder = CohortBuilder(hiresense.TAXONOMY) if args.cohort else None
+    out = open(args.out, 'w') if args.out else sys.stdout
+    try:
+        for record in hiresense.run_batch_analysis(items):
+            report.add(record)
+            if builder:
+                builder.add_record(record)
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+    finally:
+        if args.out:
+            out.close()
+
+    summary = report.summary()
+    if builder:
+        builder.build().save(args.cohort)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(summary, f, indent=2)
+    print(f"Analysed {summary['analysed']} of {summary['learners']} learners in {summary['elapsed_seconds']}s "
+          f"({summary['learners_per_minute']}/min)", file=sys.stderr)
+    return 0 if summary['analysed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
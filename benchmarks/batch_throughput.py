@@ -0,0 +1,104 @@
+"""
+HireSense - Batch throughput benchmark.
+Posts a zip of synthetic PDF/DOCX/TXT resumes to /analyze/batch in-process
+and reports learners per minute and time to first result, once with the
+fallback engine and once with a stubbed Gemini model of fixed latency.
+
+    python -m benchmarks.batch_throughput --size 500 --latency 1.0
+"""
+
+import argparse
+import io
+import json
+import os
+import time
+import zipfile
+
+# Keep uploads parsed inline unless the caller asks for the pool
+os.environ.setdefault('PARSER_POOL_SIZE', '0')
+
+import app as hiresense
+from benchmarks.corpus import career_goals, make_docx, make_pdf, make_resume
+from fake_gemini import FakeGenerativeModel
+
+
+def make_batch(size, seed=0):
+    """Return a zip of `size` distinct resumes in rotating TXT/PDF/DOCX form, with a manifest."""
+    goals = career_goals()
+    buf = io.BytesIO()
+    manifest = ["filename,learner_id,career_goal"]
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for i in range(size):
+            text = make_resume(60, 0.4, seed=seed + i)
+            ext = ("txt", "pdf", "docx")[i % 3]
+            data = {"txt": text.encode(), "pdf": make_pdf(text), "docx": make_docx(text)}[ext]
+            name = f"learner-{i:04d}.{ext}"
+            archive.writestr(name, data)
+            manifest.append(f"{name},S{i:04d},{goals[i % len(goals)]}")
+        archive.writestr('manifest.csv', "\n".join(manifest) + "\n")
+    return buf.getvalue()
+
+
+def run(payload):
+    """Post the batch and consume the stream; returns throughput figures."""
+    client = hiresense.app.test_client()
+    hiresense.analysis_cache.clear()
+    started = time.perf_counter()
+    first = None
+    sources = {}
+    report = None
+    response = client.post('/analyze/batch', data={"batch_file": (io.BytesIO(payload), "cohort.zip")},
+                           content_type='multipart/form-data', buffered=False)
+    for line in response.response:
+        for event in filter(None, line.decode().splitlines()):
+            event = json.loads(event)
+            if event["event"] == "result":
+                if first is None:
+                    first = time.perf_counter() - started
+                key = event.get("source", "error")
+                sources[key] = sources.get(key, 0) + 1
+            elif event["event"] == "report":
+                report = event["report"]
+    response.close()
+    elapsed = time.perf_counter() - started
+    return {
+        "learners": report["learners"],
+        "analysed": report["analysed"],
+        "seconds": round(elapsed, 2),
+        "learners_per_minute": round(report["learners"] / elapsed * 60, 1),
+        "first_result_s": round(first, 3),
+        "sources": sources,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure /analyze/batch throughput.")
+    parser.add_argument('--size', type=int, default=500, help="Resumes in the batch")
+    parser.add_argument('--latency', type=float, default=1.0, help="Seconds the stubbed Gemini model takes per call")
+    parser.add_argument('--concurrency', type=int, help="Override BATCH_CONCURRENCY for the Gemini run")
+    parser.add_argument('--skip-gemini', action='store_true', help="Only measure the fallback engine")
+    args = parser.parse_args(argv)
+
+    payload = make_batch(args.size)
+    print(f"Batch: {args.size} resumes, {len(payload) / 1024:.0f} KB zipped, {os.cpu_count()} CPU(s)")
+
+    hiresense.app.config.pop('GEMINI_MODEL_FACTORY', None)
+    hiresense.gemini_client.reset()
+    if not hiresense.GEMINI_API_KEY:
+        print("fallback:", json.dumps(run(payload)))
+
+    if not args.skip_gemini:
+        if args.concurrency:
+            hiresense.app.config['BATCH_CONCURRENCY'] = args.concurrency
+        canned = json.dumps(hiresense.generate_fallback_analysis(make_resume(60, 0.4), "Software Engineer")["data"])
+        hiresense.app.config['GEMINI_MODEL_FACTORY'] = lambda: FakeGenerativeModel(canned, latency=args.latency)
+        hiresense.gemini_client.reset()
+        label = f"gemini-stub ({args.latency}s, concurrency {hiresense.app.config['BATCH_CONCURRENCY']})"
+        print(f"{label}:", json.dumps(run(payload)))
+        hiresense.app.config.pop('GEMINI_MODEL_FACTORY', None)
+        hiresense.gemini_client.reset()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,166 @@
+"""
+HireSense - Synthetic benchmark corpus.
+Generates resumes of different lengths and skill densities as plain text,
+PDF and DOCX, plus a career goal for every known role.
+"""
+
+import random
+import zipfile
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from docx import Document
+
+from app import ROLE_REQUIREMENTS, SKILL_DB
+
+FILLER = [
+    "Collaborated with cross-functional teams to deliver features on schedule",
+    "Improved reporting accuracy by reworking the monthly review process",
+    "Mentored junior colleagues and documented onboarding material",
+    "Presented quarterly results to department leadership",
+    "Coordinated with vendors to resolve delivery issues",
+    "Maintained internal documentation and wiki pages",
+    "Participated in campus outreach and hiring events",
+    "Organised weekly knowledge sharing sessions",
+]
+
+LENGTHS = {"short": 15, "medium": 80, "long": 400}
+DENSITIES = {"low": 0.1, "medium": 0.4, "high": 0.8}
+
+ALL_SKILLS = sorted({skill for skills in SKILL_DB.values() for skill in skills})
+
+
+def make_resume(lines, density, seed=0):
+    """Return resume text with about `lines` lines, `density` of them naming skills."""
+    rng = random.Random(seed)
+    out = ["Alex Learner", "Software Engineer", "", "Experience"]
+    for i in range(lines):
+        if rng.random() < density:
+            skills = rng.sample(ALL_SKILLS, 3)
+            out.append(f"- Built a service using {skills[0]}, {skills[1]} and {skills[2]}")
+        else:
+            out.append(f"- {rng.choice(FILLER)}")
+        if i == lines // 2:
+            out += ["", "Skills", ", ".join(rng.sample(ALL_SKILLS, 8)), "", "Projects"]
+    out += ["", "Education", "B.Tech in Computer Science, 2020"]
+    return "\n".join(out)
+
+
+def resumes():
+    """Yield (name, text) for every length/density combination."""
+    for length, lines in LENGTHS.items():
+        for density, ratio in DENSITIES.items():
+            yield f"{length}-{density}", make_resume(lines, ratio, seed=lines)
+
+
+def career_goals():
+    """Return one career goal per role, including the default role."""
+    return [role.title() if role != "default" else "Museum Curator" for role in ROLE_REQUIREMENTS]
+
+
+ROLE_DOMAINS = [
+    "data", "cloud", "security", "network", "mobile", "web", "game", "embedded", "database", "platform",
+    "payments", "search", "ads", "growth", "quantitative", "research", "robotics", "firmware", "compiler",
+    "storage", "identity", "analytics", "marketing", "finance", "healthcare", "logistics", "retail",
+    "education", "media", "telecom", "energy", "automotive", "aerospace", "biotech", "legal", "hr",
+    "supply chain", "customer", "sales", "devops", "ml", "ai", "vision", "speech", "language", "graphics",
+    "audio", "video", "infrastructure", "reliability", "observability", "billing", "crm", "erp",
+]
+ROLE_FUNCTIONS = [
+    "engineer", "developer", "analyst", "scientist", "architect", "administrator", "designer", "consultant",
+    "specialist", "manager", "lead", "researcher", "technician", "operator", "strategist", "tester",
+    "product manager", "program manager", "support engineer", "solutions engineer",
+]
+
+
+def role_catalog(size, seed=0):
+    """Return (titles, title_roles) for a synthetic catalog of `size` roles."""
+    rng = random.Random(seed)
+    names = [f"{domain} {function}" for domain in ROLE_DOMAINS for function in ROLE_FUNCTIONS]
+    rng.shuffle(names)
+    while len(names) < size:
+        names.append(f"{rng.choice(['senior', 'staff', 'junior', 'principal'])} {rng.choice(names)} {len(names)}")
+    titles, title_roles = [], []
+    for name in names[:size]:
+        for title in (name, f"{name} ii", name.replace("engineer", "developer")):
+            titles.append(title)
+            title_roles.append(name)
+    return titles, title_roles
+
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(text, lines_per_page=50):
+    """Return a minimal multi-page PDF (bytes) containing text."""
+    lines = text.splitlines() or [""]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)]
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once page ids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for page in pages:
+        body = "BT /F1 10 Tf 12 TL 50 780 Td " + " ".join(f"({_pdf_escape(line)}) Tj T*" for line in page) + " ET"
+        stream = body.encode("latin-1", errors="replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % i for i in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_ids)
+
+    out = BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + obj + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def make_docx(text):
+    """Return a DOCX file (bytes) with one paragraph per line of text."""
+    doc = Document()
+    for line in text.splitlines():
+        doc.add_paragraph(line)
+    out = BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+class DocxTemplate:
+    """Render DOCX files like make_docx by patching the XML of one saved document.
+
+    Much cheaper than building each file with python-docx, for load tests
+    that need a fresh document per request.
+    """
+
+    PLACEHOLDER = "HIRESENSE-BODY"
+
+    def __init__(self):
+        with zipfile.ZipFile(BytesIO(make_docx(self.PLACEHOLDER))) as archive:
+            self._members = [(name, archive.read(name)) for name in archive.namelist()]
+
+    def render(self, text):
+        paragraphs = "</w:t></w:r></w:p><w:p><w:r><w:t xml:space=\"preserve\">".join(
+            escape(line) for line in text.splitlines()
+        )
+        out = BytesIO()
+        with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for name, data in self._members:
+                if name == 'word/document.xml':
+                    data = data.replace(f"<w:t>{self.PLACEHOLDER}</w:t>".encode(),
+                                        f"<w:t xml:space=\"preserve\">{paragraphs}</w:t>".encode())
+                archive.writestr(name, data)
+        return out.getvalue()
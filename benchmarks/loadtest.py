@@ -0,0 +1,375 @@
+"""
+HireSense - End-to-end load test.
+Replays a mix of text, PDF and DOCX submissions against /analyze over HTTP at
+fixed concurrency levels and reports throughput, p50/p95/p99 latency, how
+analyses were answered (fallback rate) and how saturated the workers were,
+sampled from /health. Without --url the app is served in-process with the
+FAKE_GEMINI stand-in; to measure a real gunicorn configuration offline,
+start it with FAKE_GEMINI set and pass its address.
+
+    python -m benchmarks.loadtest --concurrency 4,16,32 --duration 20
+    python -m benchmarks.loadtest --fake "latency=1.5,sigma=0.5,error_rate=0.05,malformed_rate=0.02"
+
+    FAKE_GEMINI="latency=1.0,sigma=0.4" gunicorn -k gthread --threads 32 -w 2 app:app
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000 --concurrency 16,64 --save load.json
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000 --concurrency 16,64 --compare load.json
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import deque
+from datetime import datetime
+
+from batch import result_source
+
+FALLBACK_SOURCES = ("fallback", "partial", "degraded")
+
+
+def parse_mix(spec):
+    """Parse "text=0.5,pdf=0.3,docx=0.2" into normalised weights per upload type."""
+    weights = {}
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        kind, _, weight = part.partition('=')
+        if kind not in ("text", "pdf", "docx"):
+            raise ValueError(f"Unknown submission type {kind!r}; use text, pdf or docx")
+        weights[kind] = float(weight or 1)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("The submission mix needs at least one positive weight")
+    return {kind: weight / total for kind, weight in weights.items()}
+
+
+class Submissions:
+    """Generate fresh text, PDF and DOCX submissions in the proportions of mix.
+
+    Every submission is a newly generated resume, so requests miss the
+    analysis cache and near-duplicate index unless repeat_share of them are
+    set to resend a recent submission, as returning users would.
+    """
+
+    def __init__(self, mix, repeat_share=0.0, seed=0):
+        # The corpus imports the app, which must see FAKE_GEMINI first
+        from benchmarks.corpus import DocxTemplate, career_goals
+
+        self.kinds, self.weights = zip(*mix.items())
+        self.repeat_share = repeat_share
+        self.seed = seed
+        self._goals = career_goals()
+        self._docx = DocxTemplate()
+        self._counter = itertools.count()
+        self._recent = deque(maxlen=200)
+
+    def next(self, rng):
+        """Return a (kind, fields, files) submission."""
+        from benchmarks.corpus import make_pdf, make_resume
+
+        if self._recent and rng.random() < self.repeat_share:
+            return rng.choice(self._recent)
+        i = next(self._counter)
+        kind = rng.choices(self.kinds, self.weights)[0]
+        text = make_resume(rng.choice((15, 40, 80, 160)), rng.choice((0.1, 0.4, 0.8)), seed=self.seed * 1_000_000 + i)
+        fields = {"career_goal": self._goals[i % len(self._goals)]}
+        files = {}
+        if kind == "text":
+            fields["resume_text"] = text
+        elif kind == "pdf":
+            files["resume_file"] = (f"resume-{i}.pdf", make_pdf(text))
+        else:
+            files["resume_file"] = (f"resume-{i}.docx", self._docx.render(text))
+        submission = (kind, fields, files)
+        self._recent.append(submission)
+        return submission
+
+
+def encode_multipart(fields, files):
+    """Return (body, content type) of a multipart/form-data request."""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'.encode())
+        parts.append(value.encode() + b"\r\n")
+    for name, (filename, data) in files.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                     f'Content-Type: application/octet-stream\r\n\r\n'.encode())
+        parts.append(data + b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def submit(base_url, submission, stream=False, timeout=60):
+    """Post one submission; returns a record of its outcome and timings."""
+    kind, fields, files = submission
+    body, content_type = encode_multipart(fields, files)
+    url = base_url + ('/analyze/stream' if stream else '/analyze')
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": content_type}, method='POST')
+    record = {"kind": kind, "stream": stream, "status": None, "source": "error", "first_byte": None}
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            record["status"] = response.status
+            if stream:
+                for line in response:
+                    if record["first_byte"] is None:
+                        record["first_byte"] = time.perf_counter() - started
+                    event = json.loads(line)
+                    if event.get("success") is False:
+                        record["error"] = event.get("error", "failed")
+                    elif event.get("event") == "done":
+                        record["source"] = event.get("source", "error")
+            else:
+                payload = response.read()
+                record["first_byte"] = time.perf_counter() - started
+                result = json.loads(payload)
+                if result.get("success"):
+                    record["source"] = result_source(result)
+                else:
+                    record["error"] = result.get("error", "failed")
+    except urllib.error.HTTPError as e:
+        record["status"] = e.code
+        record["error"] = f"HTTP {e.code}"
+    except (OSError, ValueError) as e:
+        record["error"] = type(e).__name__
+    record["seconds"] = time.perf_counter() - started
+    return record
+
+
+class HealthSampler:
+    """Poll /health in the background and keep per-worker saturation samples."""
+
+    def __init__(self, base_url, interval=0.5):
+        self.url = base_url + '/health'
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                with urllib.request.urlopen(self.url, timeout=5) as response:
+                    self.samples.append(json.loads(response.read()))
+            except (OSError, ValueError):
+                pass
+            self._stop.wait(self.interval)
+
+    def summary(self):
+        """Mean and peak utilisation of each worker resource across the samples."""
+        series = {"gemini_slots": [], "gemini_queued": [], "admission": [], "parsers": [], "parser_queue": []}
+        shed = {}
+        for health in self.samples:
+            gemini = health.get("gemini") or {}
+            if gemini.get("max_concurrency"):
+                series["gemini_slots"].append(gemini["active"] / gemini["max_concurrency"])
+                series["gemini_queued"].append(gemini["queued"])
+            admission = health.get("admission") or {}
+            if admission.get("max_inflight"):
+                series["admission"].append(admission["in_flight"] / admission["max_inflight"])
+                first, _ = shed.setdefault(health.get("pid"), (admission["shed"], admission["shed"]))
+                shed[health.get("pid")] = (first, admission["shed"])
+            pool = health.get("parser_pool") or {}
+            if pool.get("size"):
+                series["parsers"].append(pool["busy"] / pool["size"])
+                series["parser_queue"].append(pool["queue_depth"])
+        summary = {
+            "samples": len(self.samples),
+            "workers_seen": len({health.get("pid") for health in self.samples}),
+            "admission_shed": sum(last - first for first, last in shed.values()),
+        }
+        for name, values in series.items():
+            if values:
+                summary[name] = {"mean": round(sum(values) / len(values), 3), "max": round(max(values), 3)}
+        return summary
+
+
+def percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else None
+
+
+def run_level(base_url, submissions, concurrency, duration, stream_share=0.0, timeout=60, seed=0):
+    """Keep `concurrency` requests in flight for `duration` seconds and summarise them."""
+    records = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(worker_id):
+        rng = random.Random(seed * 1000 + worker_id)
+        while time.perf_counter() < deadline:
+            submission = submissions.next(rng)
+            record = submit(base_url, submission, stream=rng.random() < stream_share, timeout=timeout)
+            with lock:
+                records.append(record)
+
+    started = time.perf_counter()
+    with HealthSampler(base_url) as sampler:
+        threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - started
+    return summarise(records, elapsed, concurrency, sampler.summary())
+
+
+def summarise(records, elapsed, concurrency, saturation):
+    ok = [r for r in records if r["source"] != "error"]
+    latencies = sorted(r["seconds"] * 1000 for r in ok)
+    first_bytes = sorted(r["first_byte"] * 1000 for r in ok if r["stream"] and r["first_byte"] is not None)
+    sources, kinds, errors = {}, {}, {}
+    for record in records:
+        sources[record["source"]] = sources.get(record["source"], 0) + 1
+        kinds[record["kind"]] = kinds.get(record["kind"], 0) + 1
+        if "error" in record:
+            errors[record["error"]] = errors.get(record["error"], 0) + 1
+    fallbacks = sum(sources.get(source, 0) for source in FALLBACK_SOURCES)
+    return {
+        "concurrency": concurrency,
+        "requests": len(records),
+        "errors": len(records) - len(ok),
+        "seconds": round(elapsed, 2),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 1) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95), 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99), 1) if latencies else None,
+        "stream_first_byte_p50_ms": round(percentile(first_bytes, 50), 1) if first_bytes else None,
+        "fallback_rate": round(fallbacks / len(ok), 4) if ok else 0.0,
+        "sources": sources,
+        "kinds": kinds,
+        "error_kinds": errors,
+        "saturation": saturation,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Return [(level, metric, baseline, current, change)] for levels worse than threshold."""
+    regressions = []
+    for level, stats in current.items():
+        before = baseline.get(level)
+        if not before:
+            continue
+        if before.get("throughput_rps"):
+            change = (before["throughput_rps"] - stats["throughput_rps"]) / before["throughput_rps"]
+            if change > threshold:
+                regressions.append((level, "throughput_rps", before["throughput_rps"], stats["throughput_rps"], change))
+        if before.get("p95_ms") and stats.get("p95_ms"):
+            change = (stats["p95_ms"] - before["p95_ms"]) / before["p95_ms"]
+            if change > threshold:
+                regressions.append((level, "p95_ms", before["p95_ms"], stats["p95_ms"], change))
+    return regressions
+
+
+def serve_in_process(fake):
+    """Serve the app on a local port from a background thread; returns its base URL."""
+    from werkzeug.serving import make_server
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    # Offline by construction: never fall through to the real API
+    os.environ['GEMINI_API_KEY'] = ''
+    if fake != 'none':
+        os.environ['FAKE_GEMINI'] = fake
+    else:
+        os.environ.pop('FAKE_GEMINI', None)
+    import app as hiresense
+
+    server = make_server('127.0.0.1', 0, hiresense.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def format_ratio(saturation, name):
+    stats = saturation.get(name)
+    return f"{stats['mean']:.0%}/{stats['max']:.0%}" if stats else "-"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test /analyze end to end against a fake Gemini model.")
+    parser.add_argument('--url', help="Base URL of a running server (default: serve the app in-process)")
+    parser.add_argument('--fake', default=os.getenv('FAKE_GEMINI') or '1',
+                        help="FAKE_GEMINI spec for the in-process server, or 'none' for the fallback engine only")
+    parser.add_argument('--concurrency', default='4,16', help="Comma-separated concurrency levels")
+    parser.add_argument('--duration', type=float, default=15, help="Seconds per concurrency level")
+    parser.add_argument('--warmup', type=float, default=2, help="Unrecorded seconds before the first level")
+    parser.add_argument('--mix', default='text=0.5,pdf=0.3,docx=0.2', help="Share of each submission type")
+    parser.add_argument('--stream-share', type=float, default=0.0, help="Share of requests sent to /analyze/stream")
+    parser.add_argument('--repeat-share', type=float, default=0.0,
+                        help="Share of requests resending a recent submission (cache and near-duplicate hits)")
+    parser.add_argument('--timeout', type=float, default=60, help="Client timeout per request in seconds")
+    parser.add_argument('--seed', type=int, help="Seed for the generated resumes (default: new resumes every run)")
+    parser.add_argument('--save', metavar='PATH', help="Write results as a JSON baseline")
+    parser.add_argument('--compare', metavar='PATH', help="Compare against a JSON baseline")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Allowed throughput drop or p95 rise (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    if args.seed is None:
+        # A server kept running between runs would answer repeated resumes from its cache
+        args.seed = int(time.time())
+    levels = [int(level) for level in args.concurrency.split(',') if level.strip()]
+    base_url = (args.url or serve_in_process(args.fake)).rstrip('/')
+    target = args.url or f"in-process, FAKE_GEMINI={args.fake}"
+    submissions = Submissions(parse_mix(args.mix), args.repeat_share, seed=args.seed)
+    print(f"Target: {target}; submissions {args.mix}, {args.repeat_share:.0%} repeated, {os.cpu_count()} CPU(s)")
+
+    if args.warmup:
+        run_level(base_url, submissions, levels[0], args.warmup, args.stream_share, args.timeout, args.seed)
+
+    results = {}
+    print(f"\n{'conc':>5} {'req':>6} {'err':>5} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'fallback':>9} {'gemini slots':>13} {'admission':>10} {'parsers':>9} {'shed':>5}")
+    for level in levels:
+        stats = run_level(base_url, submissions, level, args.duration, args.stream_share, args.timeout, args.seed + level)
+        results[str(level)] = stats
+        saturation = stats["saturation"]
+        print(f"{level:>5} {stats['requests']:>6} {stats['errors']:>5} {stats['throughput_rps']:>8} "
+              f"{stats['p50_ms']!s:>9} {stats['p95_ms']!s:>9} {stats['p99_ms']!s:>9} {stats['fallback_rate']:>9.1%} "
+              f"{format_ratio(saturation, 'gemini_slots'):>13} {format_ratio(saturation, 'admission'):>10} "
+              f"{format_ratio(saturation, 'parsers'):>9} {saturation['admission_shed']:>5}")
+    print("\nSaturation columns are mean/peak utilisation sampled from /health; sources per level:")
+    for level, stats in results.items():
+        print(f"  {level:>5}: {json.dumps(stats['sources'])}")
+        if stats["error_kinds"]:
+            print(f"         errors: {json.dumps(stats['error_kinds'])}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                "created": datetime.now().isoformat(),
+                "python": platform.python_version(),
+                "target": target,
+                "mix": args.mix,
+                "results": results,
+            }, f, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressions beyond {args.threshold:.0%}:")
+            for level, metric, before, after, change in regressions:
+                print(f"  concurrency {level:>4} {metric:15} {before:>9} -> {after:>9}  ({change:+.0%})")
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,239 @@
+"""
+HireSense - Micro-benchmarks.
+Measures skill matching, fallback analysis, text extraction, career goal to
+role resolution over growing catalogs, cohort analytics queries and the
+/analyze route (in-process, with a stubbed Gemini model) on a synthetic
+corpus.
+
+    python -m benchmarks.run                        # print results
+    python -m benchmarks.run --save baseline.json   # record a baseline
+    python -m benchmarks.run --compare baseline.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from io import BytesIO
+
+# Keep uploads parsed inline unless the caller asks for the pool
+os.environ.setdefault('PARSER_POOL_SIZE', '0')
+
+import app as hiresense
+from benchmarks.corpus import career_goals, make_docx, make_pdf, make_resume, resumes, role_catalog
+from cohort import CohortBuilder, load_cohort
+from extraction import extract_text
+from fake_gemini import FakeGenerativeModel
+from role_resolver import RoleResolver
+
+
+def measure(fn, min_time=0.5, min_iterations=5, max_iterations=2000, warmup=2):
+    """Time repeated calls to fn and report throughput, latency and peak memory."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < max_iterations and (
+        len(samples) < min_iterations or time.perf_counter() - started < min_time
+    ):
+        t0 = time.perf_counter_ns()
+        fn()
+        samples.append((time.perf_counter_ns() - t0) / 1e6)
+    elapsed = sum(samples) / 1000
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ordered = sorted(samples)
+
+    def pct(p):
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))], 4)
+
+    return {
+        "iterations": len(samples),
+        "ops_per_sec": round(len(samples) / elapsed, 2) if elapsed else None,
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def bench_matching(results, min_time):
+    for name, text in resumes():
+        results[f"match_skills/{name}"] = measure(lambda: hiresense.match_skills(text), min_time)
+
+
+def bench_fallback(results, min_time):
+    # Repeated inputs would only measure the memo, so render every call
+    memo_size = hiresense.fallback_memo.max_entries
+    hiresense.fallback_memo.max_entries = 0
+    hiresense.fallback_memo.clear()
+    text = make_resume(80, 0.4)
+    try:
+        for goal in career_goals():
+            results[f"fallback/{goal.lower().replace(' ', '_')}"] = measure(
+                lambda: hiresense.generate_fallback_analysis(text, goal, "python, sql"), min_time
+            )
+        for name, resume in resumes():
+            results[f"fallback/resume-{name}"] = measure(
+                lambda: hiresense.generate_fallback_analysis(resume, "Software Engineer"), min_time
+            )
+    finally:
+        hiresense.fallback_memo.max_entries = memo_size
+    results["fallback/memo-hit"] = measure(
+        lambda: hiresense.generate_fallback_analysis(text, "Data Scientist", "python, sql"), min_time
+    )
+
+
+def bench_extraction(results, min_time):
+    max_chars = hiresense.app.config['EXTRACT_MAX_CHARS']
+    for length in ("short", "long"):
+        text = make_resume(15 if length == "short" else 400, 0.4)
+        files = {"txt": text.encode(), "pdf": make_pdf(text), "docx": make_docx(text)}
+        for ext, data in files.items():
+            results[f"extract/{ext}-{length}"] = measure(
+                lambda: extract_text(BytesIO(data), f"resume.{ext}", max_chars), min_time
+            )
+
+
+def bench_route(results, min_time):
+    client = hiresense.app.test_client()
+    resume = make_resume(80, 0.4)
+    pdf = make_pdf(resume)
+    canned = json.dumps(hiresense.generate_fallback_analysis(resume, "Software Engineer")["data"])
+
+    def post(**files):
+        data = {"career_goal": "Software Engineer", "resume_text": resume, "skills_text": "python"}
+        data.update({key: (BytesIO(value), name) for key, (value, name) in files.items()})
+        response = client.post('/analyze', data=data, content_type='multipart/form-data')
+        assert response.status_code == 200
+
+    hiresense.app.config.pop('GEMINI_MODEL_FACTORY', None)
+    hiresense.gemini_client.reset()
+    if not hiresense.GEMINI_API_KEY:
+        results["analyze/fallback"] = measure(post, min_time)
+        results["analyze/fallback-pdf-upload"] = measure(lambda: post(resume_file=(pdf, "cv.pdf")), min_time)
+
+    hiresense.app.config['GEMINI_MODEL_FACTORY'] = lambda: FakeGenerativeModel(canned)
+    hiresense.gemini_client.reset()
+
+    def uncached():
+        hiresense.analysis_cache.clear()
+        post()
+
+    results["analyze/gemini-stub"] = measure(uncached, min_time)
+    results["analyze/gemini-stub-cached"] = measure(post, min_time)
+    hiresense.app.config.pop('GEMINI_MODEL_FACTORY', None)
+    hiresense.gemini_client.reset()
+
+
+def bench_roles(results, min_time):
+    goals = ["Senior Data Engineer", "ml engineer at a startup", "Cloud Security Architect", "Game Developer"]
+    for size in (10, 100, 1000, 5000):
+        resolver = RoleResolver(*role_catalog(size))
+        # Uncached resolution of one goal, then a batch of 64
+        results[f"roles/resolve-{size}"] = measure(
+            lambda: [resolver.resolve_many([goal]) for goal in goals], min_time
+        )
+        results[f"roles/batch64-{size}"] = measure(lambda: resolver.resolve_many(goals * 16), min_time)
+    results["roles/memoized"] = measure(lambda: [hiresense.role_resolver.resolve(goal) for goal in goals], min_time)
+
+
+def bench_cohort(results, min_time):
+    goals = career_goals()
+    analyses = [(goal, hiresense.generate_fallback_analysis(make_resume(40, 0.4, seed=i), goal)["data"])
+                for i, goal in enumerate(goals * 20)]
+    departments = ["CSE", "ECE", "IT", "MECH"]
+    for size in (1000, 50000):
+        builder = CohortBuilder(hiresense.TAXONOMY)
+        for i in range(size):
+            goal, data = analyses[i % len(analyses)]
+            builder.add(f"S{i}", data, hiresense.match_role(goal), departments[i % len(departments)])
+        with tempfile.TemporaryDirectory() as tmp:
+            builder.build().save(os.path.join(tmp, 'cohort'))
+            cohort = load_cohort(os.path.join(tmp, 'cohort'))
+            results[f"cohort/report-{size}"] = measure(lambda: cohort.report(), min_time)
+            results[f"cohort/report-filtered-{size}"] = measure(
+                lambda: cohort.report(cohort.select(role="data scientist", min_readiness=40)), min_time
+            )
+            results[f"cohort/top-missing-{size}"] = measure(lambda: cohort.top_missing(10), min_time)
+            del cohort
+
+
+STAGES = {
+    "matching": bench_matching,
+    "fallback": bench_fallback,
+    "extraction": bench_extraction,
+    "route": bench_route,
+    "roles": bench_roles,
+    "cohort": bench_cohort,
+}
+
+
+def compare(current, baseline, threshold, metric="p50_ms"):
+    """Return [(stage, baseline, current, change)] for stages slower than threshold."""
+    regressions = []
+    for stage, stats in current.items():
+        before = baseline.get(stage)
+        if not before or not before.get(metric):
+            continue
+        change = (stats[metric] - before[metric]) / before[metric]
+        if change > threshold:
+            regressions.append((stage, before[metric], stats[metric], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run HireSense micro-benchmarks.")
+    parser.add_argument('--stage', action='append', choices=sorted(STAGES), help="Only run these stages")
+    parser.add_argument('--min-time', type=float, default=0.5, help="Seconds to spend per benchmark")
+    parser.add_argument('--save', metavar='PATH', help="Write results as a JSON baseline")
+    parser.add_argument('--compare', metavar='PATH', help="Compare against a JSON baseline")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Allowed slowdown before flagging (0.2 = 20%%)")
+    parser.add_argument('--metric', default='p50_ms', choices=['mean_ms', 'p50_ms', 'p95_ms', 'p99_ms'])
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.stage or STAGES:
+        STAGES[name](results, args.min_time)
+
+    print(f"{'benchmark':42} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak KB':>9}")
+    for stage, stats in results.items():
+        print(f"{stage:42} {stats['ops_per_sec']:>10} {stats['p50_ms']:>9} {stats['p95_ms']:>9} "
+              f"{stats['p99_ms']:>9} {stats['peak_kb']:>9}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                "created": datetime.now().isoformat(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results,
+            }, f, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold, args.metric)
+        if regressions:
+            print(f"\nRegressions beyond {args.threshold:.0%} ({args.metric}):")
+            for stage, before, after, change in regressions:
+                print(f"  {stage:40} {before:>9} -> {after:>9} ms  (+{change:.0%})")
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:.0%} ({args.metric}).")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+HireSense - Startup profile.
+Imports the heavy dependencies one at a time in a fresh interpreter and
+reports the time and resident memory each adds, then imports the app and
+lists which optional backends it loaded on the way.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --fallback-only   # as deployed without GEMINI_API_KEY
+    python -m benchmarks.startup --preload         # with PRELOAD_BACKENDS=1
+"""
+
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+MODULES = ["flask", "numpy", "PyPDF2", "docx", "google.generativeai", "app"]
+BACKENDS = ["google.generativeai", "PyPDF2", "docx"]
+
+
+def rss_mb():
+    """Resident set size of this process in MB."""
+    with open('/proc/self/statm') as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+
+
+def profile(modules):
+    """Import modules in order; returns per-module seconds and RSS growth in MB."""
+    rows = []
+    for name in modules:
+        before = rss_mb()
+        started = time.perf_counter()
+        importlib.import_module(name)
+        rows.append({
+            "module": name,
+            "import_ms": round((time.perf_counter() - started) * 1000, 1),
+            "rss_mb": round(rss_mb() - before, 1),
+        })
+    return {
+        "modules": rows,
+        "total_rss_mb": round(rss_mb(), 1),
+        "loaded": [name for name in BACKENDS if name in sys.modules],
+    }
+
+
+def run_child(modules, env):
+    """Profile modules in a fresh interpreter, so nothing is already imported."""
+    out = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.startup', '--child', *modules],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.splitlines()[-1])
+
+
+def print_profile(label, result):
+    print(f"\n{label}")
+    print(f"  {'module':<22}{'import ms':>10}{'RSS MB':>9}")
+    for row in result["modules"]:
+        print(f"  {row['module']:<22}{row['import_ms']:>10.1f}{row['rss_mb']:>9.1f}")
+    print(f"  total RSS {result['total_rss_mb']} MB; backends loaded: {', '.join(result['loaded']) or 'none'}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report import time and memory of each dependency.")
+    parser.add_argument('--fallback-only', action='store_true', help="Profile without GEMINI_API_KEY")
+    parser.add_argument('--preload', action='store_true', help="Profile with PRELOAD_BACKENDS=1")
+    parser.add_argument('--child', nargs='*', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child is not None:
+        print(json.dumps(profile(args.child)))
+        return 0
+
+    env = dict(os.environ, PARSER_POOL_SIZE='0')
+    if args.fallback_only:
+        env.pop('GEMINI_API_KEY', None)
+    if args.preload:
+        env['PRELOAD_BACKENDS'] = '1'
+    mode = "fallback-only" if not env.get('GEMINI_API_KEY') else "with GEMINI_API_KEY"
+
+    print_profile("Each dependency on its own (cumulative, in order)", run_child(MODULES, env))
+    print_profile(f"App start, {mode}{', preloaded' if args.preload else ''}", run_child(["app"], env))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,214 @@
+"""
+HireSense - Analysis result cache.
+Content-addressed cache for Gemini analyses: an in-process LRU tier with TTL
+and an optional SQLite tier that every gunicorn worker on the host can share.
+LRUMemo is a plain in-process LRU for values derived locally.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def _normalize(text):
+    """Collapse whitespace and case so cosmetic edits hash to the same key."""
+    return re.sub(r'\s+', ' ', text or '').strip().lower()
+
+
+def make_cache_key(resume_text, skills_text, career_goal, model_name, prompt_version):
+    """Return a stable hash for one analysis request."""
+    payload = json.dumps([
+        _normalize(resume_text),
+        _normalize(skills_text),
+        _normalize(career_goal),
+        model_name,
+        prompt_version,
+    ])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LRUMemo:
+    """Bounded in-process LRU without expiry; max_entries=0 stores nothing."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the value stored under key, or None on a miss."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class AnalysisCache:
+    """Two-tier (memory + optional SQLite) cache of analysis results."""
+
+    def __init__(self, max_entries=256, ttl=86400, db_path='', max_disk_entries=10000):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        if self.db_path:
+            self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def _init_db(self):
+        try:
+            with self._connect() as conn:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS analysis_cache '
+                    '(key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)'
+                )
+                conn.execute('CREATE INDEX IF NOT EXISTS analysis_cache_created ON analysis_cache (created)')
+        except sqlite3.Error as e:
+            print(f"Cache DB disabled: {e}")
+            self.db_path = ''
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created, value = entry
+                if now - created < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+
+        value = self._disk_get(key, now)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._memory_set(key, value, now)
+        return value
+
+    def set(self, key, value):
+        """Store value under key in every enabled tier."""
+        now = time.time()
+        self._memory_set(key, value, now)
+        self._disk_set(key, value, now)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.db_path:
+            try:
+                with self._connect() as conn:
+                    conn.execute('DELETE FROM analysis_cache')
+            except sqlite3.Error as e:
+                print(f"Cache DB error: {e}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "disk_enabled": bool(self.db_path),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _memory_set(self, key, value, now):
+        with self._lock:
+            self._entries[key] = (now, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _disk_get(self, key, now):
+        if not self.db_path:
+            return None
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    'SELECT value FROM analysis_cache WHERE key = ? AND created > ?',
+                    (key, now - self.ttl),
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Cache DB error: {e}")
+            return None
+        return json.loads(row[0]) if row else None
+
+    def _disk_set(self, key, value, now):
+        if not self.db_path:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO analysis_cache (key, value, created) VALUES (?, ?, ?)',
+                    (key, json.dumps(value), now),
+                )
+                conn.execute('DELETE FROM analysis_cache WHERE created <= ?', (now - self.ttl,))
+                conn.execute(
+                    'DELETE FROM analysis_cache WHERE key IN ('
+                    'SELECT key FROM analysis_cache ORDER BY created DESC LIMIT -1 OFFSET ?)',
+                    (self.max_disk_entries,),
+                )
+        except sqlite3.Error as e:
+            print(f"Cache DB error: {e}")
+
+
+def cache_from_env():
+    """Build the cache from ANALYSIS_CACHE_* environment variables."""
+    return AnalysisCache(
+        max_entries=int(os.getenv('ANALYSIS_CACHE_SIZE', '256')),
+        ttl=int(os.getenv('ANALYSIS_CACHE_TTL', '86400')),
+        db_path=os.getenv('ANALYSIS_CACHE_DB', ''),
+        max_disk_entries=int(os.getenv('ANALYSIS_CACHE_DISK_SIZE', '10000')),
+    )
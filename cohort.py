@@ -0,0 +1,295 @@
+"""
+HireSense - Cohort analytics.
+Per-learner analyses are projected into a learner x skill matrix (uint8
+skill levels and missing-skill importance) with float32 category gaps and
+readiness, and integer role and department index arrays. Saved as a
+directory of .npy files, a cohort is memory-mapped on load, so dashboard
+queries over tens of thousands of learners are a few vectorised NumPy
+operations instead of a walk over JSON.
+"""
+
+import json
+import os
+import re
+import shutil
+import tempfile
+
+import numpy as np
+
+# Missing-skill importance codes in the `missing` matrix (0: not missing)
+IMPORTANCE = {"Medium": 1, "High": 2, "Critical": 3}
+SKILL_LISTS = ("strong_skills", "moderate_skills", "weak_skills")
+META_FILE = 'meta.json'
+ARRAYS = ('levels', 'missing', 'category_gaps', 'readiness', 'roles', 'departments', 'skill_category')
+
+_VALID_NAME = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+def valid_cohort_name(name):
+    return bool(_VALID_NAME.match(name or ''))
+
+
+class _Vocabulary:
+    """Intern names to consecutive ids, seeded with a known list."""
+
+    def __init__(self, names=()):
+        self.names = list(names)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+
+    def add(self, name):
+        if name not in self.ids:
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+        return self.ids[name]
+
+
+class CohortBuilder:
+    """Collect analyses one learner at a time, then build() a Cohort.
+
+    Skill columns start with the taxonomy's skills, so cohorts built from
+    the same taxonomy share column ids; skill names the taxonomy does not
+    know (from Gemini) get extra columns.
+    """
+
+    def __init__(self, taxonomy):
+        self.taxonomy = taxonomy
+        self.skills = _Vocabulary(taxonomy.skills)
+        self.categories = _Vocabulary(taxonomy.categories)
+        self.roles = _Vocabulary(taxonomy.roles)
+        self.departments = _Vocabulary()
+        self.learner_ids = []
+        self._cells = []  # (row, skill id, level, importance)
+        self._gaps = []  # (row, category id, gap)
+        self._readiness = []
+        self._roles = []
+        self._departments = []
+
+    def skill_id(self, name):
+        key = ' '.join(name.lower().split())
+        skill_id = self.taxonomy.skill_ids.get(key, self.taxonomy.phrases.get(key))
+        return skill_id if skill_id is not None else self.skills.add(key)
+
+    def add(self, learner_id, data, role="default", department=None):
+        """Add one learner's analysis (the "data" of an analysis result)."""
+        row = len(self.learner_ids)
+        self.learner_ids.append(str(learner_id))
+        analysis = data.get("skill_analysis", {})
+        for group in SKILL_LISTS:
+            for skill in analysis.get(group, []):
+                level = skill.get("level")
+                if skill.get("name") and isinstance(level, (int, float)):
+                    self._cells.append((row, self.skill_id(skill["name"]), min(100, max(1, int(level))), 0))
+        for skill in analysis.get("missing_skills", []):
+            if skill.get("name"):
+                self._cells.append((row, self.skill_id(skill["name"]), 0, IMPORTANCE.get(skill.get("importance"), 1)))
+        for category in data.get("skill_categories", []):
+            gap = category.get("gap")
+            if category.get("name") and isinstance(gap, (int, float)):
+                self._gaps.append((row, self.categories.add(category["name"]), gap))
+        score = data.get("career_readiness", {}).get("overall_score")
+        self._readiness.append(score if isinstance(score, (int, float)) else np.nan)
+        self._roles.append(self.roles.add(role or "default"))
+        self._departments.append(self.departments.add(department) if department else -1)
+
+    def add_record(self, record):
+        """Add a successful batch result record (see batch.run_batch)."""
+        if record.get("success"):
+            self.add(record["learner_id"], record["data"], record.get("role"), record.get("department"))
+
+    def build(self):
+        n, n_skills, n_categories = len(self.learner_ids), len(self.skills.names), len(self.categories.names)
+        levels = np.zeros((n, n_skills), dtype=np.uint8)
+        missing = np.zeros((n, n_skills), dtype=np.uint8)
+        if self._cells:
+            cells = np.array(self._cells, dtype=np.int64)
+            rows, cols = cells[:, 0], cells[:, 1]
+            # A skill listed as both known and missing counts as known
+            np.maximum.at(levels, (rows, cols), cells[:, 2].astype(np.uint8))
+            np.maximum.at(missing, (rows, cols), cells[:, 3].astype(np.uint8))
+            missing[levels > 0] = 0
+        gaps = np.full((n, n_categories), np.nan, dtype=np.float32)
+        if self._gaps:
+            entries = np.array(self._gaps, dtype=np.float64)
+            gaps[entries[:, 0].astype(np.int64), entries[:, 1].astype(np.int64)] = entries[:, 2]
+
+        skill_category = np.full(n_skills, -1, dtype=np.int16)
+        skill_category[:len(self.taxonomy.skills)] = self.taxonomy.skill_category
+        return Cohort({
+            'levels': levels,
+            'missing': missing,
+            'category_gaps': gaps,
+            'readiness': np.array(self._readiness, dtype=np.float32),
+            'roles': np.array(self._roles, dtype=np.int16),
+            'departments': np.array(self._departments, dtype=np.int16),
+            'skill_category': skill_category,
+        }, {
+            'learner_ids': self.learner_ids,
+            'skills': self.skills.names,
+            'categories': self.categories.names,
+            'roles': self.roles.names,
+            'departments': self.departments.names,
+        })
+
+
+class Cohort:
+    """A learner x skill matrix and its index arrays, with vectorised queries.
+
+    Every query takes an optional boolean learner mask from select().
+    Category gaps are NaN where a learner's analysis has no such category,
+    and readiness is NaN where it has no score.
+    """
+
+    def __init__(self, arrays, meta):
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+        self.learner_ids = meta['learner_ids']
+        self.skills = meta['skills']
+        self.categories = meta['categories']
+        self.role_names = meta['roles']
+        self.department_names = meta['departments']
+
+    def __len__(self):
+        return len(self.learner_ids)
+
+    def select(self, role=None, department=None, min_readiness=None, max_readiness=None):
+        """Boolean mask of learners matching every given filter, or None for the whole cohort."""
+        if role is None and department is None and min_readiness is None and max_readiness is None:
+            return None
+        mask = np.ones(len(self), dtype=bool)
+        if role is not None:
+            mask &= self.roles == (self.role_names.index(role) if role in self.role_names else -2)
+        if department is not None:
+            ids = {name: i for i, name in enumerate(self.department_names)}
+            mask &= self.departments == ids.get(department, -2)
+        if min_readiness is not None:
+            mask &= self.readiness >= min_readiness
+        if max_readiness is not None:
+            mask &= self.readiness <= max_readiness
+        return mask
+
+    def _rows(self, array, mask):
+        return array if mask is None else array[mask]
+
+    def top_missing(self, n=10, mask=None):
+        """Skills missing for the most learners, with how many need them critically."""
+        missing = self._rows(self.missing, mask)
+        learners = len(missing)
+        # Summing bool-as-uint8 into int32 is about twice as fast as count_nonzero
+        counts = (missing != 0).view(np.uint8).sum(axis=0, dtype=np.int32)
+        critical = (missing == IMPORTANCE["Critical"]).view(np.uint8).sum(axis=0, dtype=np.int32)
+        top = np.argsort(-counts, kind='stable')[:n]
+        return [
+            {"skill": self.skills[i].title(), "learners": int(counts[i]),
+             "share": round(int(counts[i]) / learners, 3), "critical_for": int(critical[i])}
+            for i in top if counts[i]
+        ]
+
+    def readiness_percentiles(self, percentiles=(10, 25, 50, 75, 90), mask=None):
+        scores = self._rows(self.readiness, mask)
+        scores = scores[~np.isnan(scores)]
+        if not len(scores):
+            return None
+        values = np.percentile(scores, percentiles)
+        summary = {f"p{p}": round(float(v), 1) for p, v in zip(percentiles, values)}
+        summary["mean"] = round(float(scores.mean()), 1)
+        return summary
+
+    def mean_category_gaps(self, mask=None):
+        """Mean gap and learner count per category, largest gap first."""
+        gaps = self._rows(self.category_gaps, mask)
+        counts = np.count_nonzero(~np.isnan(gaps), axis=0)
+        sums = np.nansum(gaps, axis=0, dtype=np.float64)
+        out = [
+            {"category": self.categories[i], "mean_gap": round(float(sums[i] / counts[i]), 1), "learners": int(counts[i])}
+            for i in np.flatnonzero(counts)
+        ]
+        return sorted(out, key=lambda entry: -entry["mean_gap"])
+
+    def mean_category_gaps_by(self, by='department', mask=None):
+        """Mean gap per category within each department (or role): {group: {category: gap}}."""
+        groups = self.departments if by == 'department' else self.roles
+        names = self.department_names if by == 'department' else self.role_names
+        gaps = self.category_gaps
+        if mask is not None:
+            groups, gaps = groups[mask], gaps[mask]
+        known = groups >= 0
+        groups, gaps = groups[known], gaps[known]
+        present = ~np.isnan(gaps)
+        # Group sums as a (groups x learners) one-hot product
+        onehot = np.zeros((len(names), len(groups)), dtype=np.float32)
+        onehot[groups, np.arange(len(groups))] = 1
+        sums = onehot @ np.where(present, gaps, 0)
+        counts = onehot @ present.astype(np.float32)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / counts
+        return {
+            names[g]: {self.categories[c]: round(float(means[g, c]), 1) for c in np.flatnonzero(counts[g])}
+            for g in np.flatnonzero(counts.sum(axis=1))
+        }
+
+    def gap_histograms(self, bins=10, mask=None):
+        """Per-category histogram of learner gaps over [0, 100] in `bins` equal bins."""
+        gaps = self._rows(self.category_gaps, mask)
+        edges = np.linspace(0, 100, bins + 1)
+        out = {}
+        for c in np.flatnonzero(np.count_nonzero(~np.isnan(gaps), axis=0)):
+            column = gaps[:, c]
+            # Uniform edges let np.histogram compute bins directly
+            counts, _ = np.histogram(np.clip(column[~np.isnan(column)], 0, 100), bins=edges)
+            out[self.categories[c]] = counts.tolist()
+        return {"edges": edges.tolist(), "categories": out}
+
+    def roles_count(self, mask=None):
+        counts = np.bincount(self._rows(self.roles, mask), minlength=len(self.role_names))
+        return {self.role_names[i]: int(counts[i]) for i in np.flatnonzero(counts)}
+
+    def report(self, mask=None, top_n=10, bins=10):
+        """Dashboard summary of the (masked) cohort."""
+        return {
+            "learners": int(len(self) if mask is None else np.count_nonzero(mask)),
+            "roles": self.roles_count(mask),
+            "readiness": self.readiness_percentiles(mask=mask),
+            "top_missing_skills": self.top_missing(top_n, mask),
+            "category_gaps": self.mean_category_gaps(mask),
+            "category_gaps_by_department": self.mean_category_gaps_by("department", mask),
+            "gap_histograms": self.gap_histograms(bins, mask),
+        }
+
+    def save(self, path):
+        """Write the cohort to directory path (one .npy per array), replacing it atomically."""
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(dir=parent, prefix='.cohort-')
+        try:
+            for name in ARRAYS:
+                np.save(os.path.join(tmp_path, name + '.npy'), np.ascontiguousarray(getattr(self, name)))
+            with open(os.path.join(tmp_path, META_FILE), 'w') as f:
+                json.dump({
+                    'learner_ids': self.learner_ids,
+                    'skills': self.skills,
+                    'categories': self.categories,
+                    'roles': self.role_names,
+                    'departments': self.department_names,
+                }, f)
+            old_path = None
+            if os.path.exists(path):
+                # Readers that already mapped the old files keep them
+                old_path = tempfile.mkdtemp(dir=parent, prefix='.cohort-old-')
+                os.replace(path, os.path.join(old_path, 'cohort'))
+            os.replace(tmp_path, path)
+            if old_path:
+                shutil.rmtree(old_path, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+
+def load_cohort(path, mmap=True):
+    """Load a saved cohort, memory-mapping its arrays unless mmap is False."""
+    with open(os.path.join(path, META_FILE)) as f:
+        meta = json.load(f)
+    arrays = {
+        name: np.load(os.path.join(path, name + '.npy'), mmap_mode='r' if mmap else None, allow_pickle=False)
+        for name in ARRAYS
+    }
+    return Cohort(arrays, meta)
@@ -0,0 +1,104 @@
+"""
+HireSense - Resume text extraction.
+Reads PDF, DOCX and TXT uploads straight from their in-memory streams and
+stops as soon as a character budget is filled. The PDF and DOCX libraries
+are imported on first use, so processes that never parse one skip them.
+"""
+
+# Text beyond this many characters is never used downstream, so parsing stops
+# once it has been collected.
+DEFAULT_MAX_CHARS = 20000
+
+
+def collect_text(pieces, max_chars):
+    """Join text pieces, stopping once max_chars have been gathered."""
+    chunks = []
+    total = 0
+    for piece in pieces:
+        if not piece:
+            continue
+        chunks.append(piece)
+        total += len(piece) + 1
+        if total >= max_chars:
+            break
+    return "\n".join(chunks)[:max_chars].strip()
+
+
+def iter_pdf_text(stream):
+    """Yield the text of each PDF page in order."""
+    import PyPDF2
+    reader = PyPDF2.PdfReader(stream)
+    for page in reader.pages:
+        yield page.extract_text()
+
+
+def iter_docx_text(stream):
+    """Yield the text of each DOCX paragraph in order."""
+    from docx import Document
+    doc = Document(stream)
+    for para in doc.paragraphs:
+        yield para.text
+
+
+def load_parsers():
+    """Import the PDF and DOCX libraries now, e.g. before forking workers that share them."""
+    import docx  # noqa: F401
+    import PyPDF2  # noqa: F401
+
+
+def iter_txt_text(stream, max_chars=DEFAULT_MAX_CHARS):
+    """Yield the decoded text of a plain text stream."""
+    # UTF-8 needs at most 4 bytes per character
+    data = stream.read(max_chars * 4)
+    yield data.decode('utf-8', errors='ignore')
+
+
+def iter_text(stream, filename, max_chars=DEFAULT_MAX_CHARS):
+    """Yield text pieces from any supported file format."""
+    ext = filename.rsplit('.', 1)[1].lower()
+    if ext == 'pdf':
+        return iter_pdf_text(stream)
+    elif ext == 'docx':
+        return iter_docx_text(stream)
+    elif ext == 'txt':
+        return iter_txt_text(stream, max_chars)
+    return iter(())
+
+
+def extract_text_from_pdf(stream, max_chars=DEFAULT_MAX_CHARS):
+    """Extract text from a PDF stream."""
+    try:
+        return collect_text(iter_pdf_text(stream), max_chars)
+    except Exception as e:
+        print(f"PDF extraction error: {e}")
+        return ""
+
+
+def extract_text_from_docx(stream, max_chars=DEFAULT_MAX_CHARS):
+    """Extract text from a DOCX stream."""
+    try:
+        return collect_text(iter_docx_text(stream), max_chars)
+    except Exception as e:
+        print(f"DOCX extraction error: {e}")
+        return ""
+
+
+def extract_text_from_txt(stream, max_chars=DEFAULT_MAX_CHARS):
+    """Extract text from a plain text stream."""
+    try:
+        return collect_text(iter_txt_text(stream, max_chars), max_chars)
+    except Exception as e:
+        print(f"TXT extraction error: {e}")
+        return ""
+
+
+def extract_text(stream, filename, max_chars=DEFAULT_MAX_CHARS):
+    """Extract text from any supported file format."""
+    ext = filename.rsplit('.', 1)[1].lower()
+    if ext == 'pdf':
+        return extract_text_from_pdf(stream, max_chars)
+    elif ext == 'docx':
+        return extract_text_from_docx(stream, max_chars)
+    elif ext == 'txt':
+        return extract_text_from_txt(stream, max_chars)
+    return ""
@@ -0,0 +1,104 @@
+"""
+HireSense - Local stand-in for the Gemini model.
+Mimics the parts of google.generativeai.GenerativeModel the app uses, so the
+analysis and streaming paths can be exercised offline. Latency can follow a
+log-normal distribution, and a share of calls can fail or answer with
+malformed JSON, so load tests see the same mix of outcomes as production.
+"""
+
+import math
+import random
+import time
+
+
+class FakeGeminiError(Exception):
+    """Raised by the fake model in place of an upstream API error."""
+
+
+class FakeResponse:
+    """A response or stream chunk exposing the SDK's .text attribute."""
+
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """Return a canned response, optionally streamed in delayed chunks.
+
+    latency is the median seconds before a response (or the first stream
+    chunk); latency_sigma > 0 draws each call's latency from a log-normal
+    distribution around it, so p95 is about latency * exp(1.645 * sigma).
+    error_rate and malformed_rate are the shares of calls that raise
+    FakeGeminiError or answer with truncated JSON.
+    """
+
+    def __init__(self, response_text, chunk_size=256, chunk_delay=0.0, latency=0.0,
+                 latency_sigma=0.0, error_rate=0.0, malformed_rate=0.0, seed=None):
+        self.response_text = response_text
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.latency = latency
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self._random = random.Random(seed)
+        self.calls = 0
+        self.errors = 0
+        self.malformed = 0
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.calls += 1
+        delay = self._latency()
+        roll = self._random.random()
+        if roll < self.error_rate:
+            self.errors += 1
+            time.sleep(delay)
+            raise FakeGeminiError("503 The model is overloaded. Please try again later.")
+        text = self.response_text
+        if roll < self.error_rate + self.malformed_rate:
+            self.malformed += 1
+            text = text[:len(text) // 2]
+        if stream:
+            return self._stream(text, delay)
+        time.sleep(delay)
+        return FakeResponse(text)
+
+    def _latency(self):
+        if self.latency_sigma and self.latency:
+            return self._random.lognormvariate(math.log(self.latency), self.latency_sigma)
+        return self.latency
+
+    def _stream(self, text, delay):
+        time.sleep(delay)
+        for start in range(0, len(text), self.chunk_size):
+            time.sleep(self.chunk_delay)
+            yield FakeResponse(text[start:start + self.chunk_size])
+
+
+SPEC_KEYS = {
+    "latency": float,
+    "sigma": float,
+    "error_rate": float,
+    "malformed_rate": float,
+    "chunk_size": int,
+    "chunk_delay": float,
+    "seed": int,
+}
+
+
+def parse_spec(spec):
+    """Parse "latency=1.0,sigma=0.4,error_rate=0.02" into FakeGenerativeModel arguments.
+
+    "1" or an empty spec gives the defaults: 1 s median latency with sigma
+    0.3 and no errors.
+    """
+    options = {"latency": 1.0, "latency_sigma": 0.3}
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        if part == '1':
+            continue
+        key, sep, value = part.partition('=')
+        key = key.strip()
+        if not sep or key not in SPEC_KEYS:
+            raise ValueError(f"Unknown fake Gemini setting {part!r}; use {', '.join(SPEC_KEYS)}")
+        options["latency_sigma" if key == "sigma" else key] = SPEC_KEYS[key](value)
+    return options
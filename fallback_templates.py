@@ -0,0 +1,223 @@
+"""
+HireSense - Fallback engine templates.
+Most of a fallback analysis is the same for every learner: the four roadmap
+phases, their resources and milestones, and the standing project ideas.
+Those parts are built once here as shared fragments, role requirements are
+turned into ready-made missing-skill entries once per role, and only the
+career goal and the learner's skill names are filled in per analysis.
+Rendered analyses are memoised per (career goal, role requirements, skill
+set) in pickled form, so a repeated fallback answer is a lookup and an
+unpickle, and every caller gets its own copy to edit.
+"""
+
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+from cache import LRUMemo
+
+SOFT_SKILLS = (
+    {"name": "Communication", "level": 75, "category": "Soft Skills"},
+    {"name": "Problem Solving", "level": 70, "category": "Soft Skills"},
+)
+
+DEFAULT_CATEGORIES = [
+    {"name": "Programming", "current_score": 40, "required_score": 85, "gap": 45},
+    {"name": "Frameworks", "current_score": 30, "required_score": 80, "gap": 50},
+    {"name": "Tools & DevOps", "current_score": 25, "required_score": 75, "gap": 50},
+    {"name": "Soft Skills", "current_score": 60, "required_score": 80, "gap": 20},
+    {"name": "Domain Knowledge", "current_score": 35, "required_score": 85, "gap": 50},
+]
+
+DEFAULT_RECOMMENDATIONS = [
+    {"rank": 1, "skill": "Core Programming", "reason": "Foundation skill", "time_estimate": "4 weeks", "difficulty": "Medium"}
+]
+
+# Roadmap resources and milestones that never change between learners
+_PORTFOLIO_STARTER = {"type": "Project", "name": "Portfolio Starter Project", "description": "Build a basic project to demonstrate fundamentals"}
+_FULL_STACK = {"type": "Project", "name": "Full-Stack Project", "description": "Build a comprehensive project using learned skills"}
+_BEST_PRACTICES = {"type": "Course", "name": "Industry Best Practices", "platform": "LinkedIn Learning", "url": ""}
+_CAPSTONE = {"type": "Project", "name": "Capstone Project", "description": "Industry-grade project showcasing all skills"}
+_SYSTEM_DESIGN = {"type": "Course", "name": "System Design & Architecture", "platform": "educative.io", "url": ""}
+
+PHASE_4 = {
+    "phase_number": 4,
+    "title": "Industry Readiness",
+    "duration": "3-4 weeks",
+    "description": "Prepare for industry with mock interviews, networking, and final polish",
+    "skills_to_learn": ["Interview Preparation", "Portfolio Building", "Networking"],
+    "resources": [
+        {"type": "Course", "name": "Technical Interview Prep", "platform": "LeetCode", "url": ""},
+        {"type": "Project", "name": "Portfolio Website", "description": "Build a professional portfolio showcasing all projects"},
+        {"type": "Course", "name": "Career Development", "platform": "LinkedIn", "url": ""}
+    ],
+    "milestones": ["Complete mock interviews", "Finalize portfolio", "Apply to positions"]
+}
+
+_MILESTONES = (
+    ["Complete core concepts", "Build first mini-project", "Pass fundamentals assessment"],
+    ["Complete intermediate modules", "Build 2 portfolio projects", "Contribute to open source"],
+    ["Complete specialization", "Build capstone project", "Get peer review"],
+)
+
+_API_PROJECT = {
+    "name": "API-Driven Application",
+    "description": "Create a full-stack application consuming external APIs",
+    "skills_practiced": ["REST API", "Frontend", "Backend"],
+    "difficulty": "Intermediate",
+    "estimated_time": "2 weeks"
+}
+_OPEN_SOURCE_PROJECT = {
+    "name": "Open Source Contribution",
+    "description": "Find and contribute to an open source project in your domain",
+    "skills_practiced": ["Git", "Collaboration", "Code Review"],
+    "difficulty": "Intermediate",
+    "estimated_time": "Ongoing"
+}
+
+
+class RoleFragments:
+    """Missing-skill entries of one set of role requirements, built once.
+
+    missing() then only filters them against the skills a learner has.
+    """
+
+    def __init__(self, requirements):
+        self.candidates = [
+            (skill, {"name": skill.title(), "importance": "Critical", "category": "Core"})
+            for skill in requirements["required"]
+        ] + [
+            (skill, {"name": skill.title(), "importance": "High", "category": "Advanced"})
+            for skill in requirements["nice_to_have"]
+        ]
+
+    def missing(self, known):
+        return [entry for skill, entry in self.candidates if skill not in known]
+
+
+def requirements_key(requirements):
+    return tuple(requirements["required"]), tuple(requirements["nice_to_have"])
+
+
+class FallbackTemplates:
+    """Role fragments for every catalogued role, plus blended requirements as they are seen."""
+
+    def __init__(self, role_requirements, max_blended=1024):
+        self.max_blended = max_blended
+        self._roles = {requirements_key(req): RoleFragments(req) for req in role_requirements.values()}
+        self._blended = OrderedDict()
+        self._lock = threading.Lock()
+
+    def for_requirements(self, requirements):
+        key = requirements_key(requirements)
+        fragments = self._roles.get(key)
+        if fragments is not None:
+            return fragments
+        with self._lock:
+            fragments = self._blended.get(key)
+            if fragments is None:
+                fragments = self._blended[key] = RoleFragments(requirements)
+                if len(self._blended) > self.max_blended:
+                    self._blended.popitem(last=False)
+            else:
+                self._blended.move_to_end(key)
+            return fragments
+
+
+def render_roadmap(career_goal, missing_names):
+    """Fill the four roadmap phases with the career goal and missing skills."""
+    return {
+        "phases": [
+            {
+                "phase_number": 1,
+                "title": "Foundation Building",
+                "duration": "4-6 weeks",
+                "description": f"Build core foundations required for {career_goal}",
+                "skills_to_learn": missing_names[:3] if missing_names else ["Core Concepts"],
+                "resources": [
+                    {"type": "Course", "name": f"Introduction to {career_goal}", "platform": "Coursera", "url": ""},
+                    {"type": "Course", "name": f"{missing_names[0] if missing_names else 'Core'} Fundamentals", "platform": "Udemy", "url": ""},
+                    _PORTFOLIO_STARTER
+                ],
+                "milestones": _MILESTONES[0]
+            },
+            {
+                "phase_number": 2,
+                "title": "Skill Development",
+                "duration": "6-8 weeks",
+                "description": "Develop intermediate skills and start building real projects",
+                "skills_to_learn": missing_names[2:5] if len(missing_names) > 2 else ["Advanced Concepts"],
+                "resources": [
+                    {"type": "Course", "name": f"Advanced {career_goal} Skills", "platform": "Udacity", "url": ""},
+                    _FULL_STACK,
+                    _BEST_PRACTICES
+                ],
+                "milestones": _MILESTONES[1]
+            },
+            {
+                "phase_number": 3,
+                "title": "Advanced Specialization",
+                "duration": "4-6 weeks",
+                "description": "Deep dive into specialized topics and industry tools",
+                "skills_to_learn": missing_names[4:7] if len(missing_names) > 4 else ["Specialization"],
+                "resources": [
+                    {"type": "Course", "name": f"Mastering {career_goal}", "platform": "Pluralsight", "url": ""},
+                    _CAPSTONE,
+                    _SYSTEM_DESIGN
+                ],
+                "milestones": _MILESTONES[2]
+            },
+            PHASE_4
+        ]
+    }
+
+
+def render_recommendations(career_goal, missing_names):
+    if not missing_names:
+        return DEFAULT_RECOMMENDATIONS
+    reason = f"Essential for {career_goal} role"
+    return [
+        {"rank": i + 1, "skill": name, "reason": reason, "time_estimate": "2-4 weeks", "difficulty": "Medium"}
+        for i, name in enumerate(missing_names[:5])
+    ]
+
+
+def render_projects(career_goal, practiced_names, missing_names):
+    return [
+        {
+            "name": f"Personal {career_goal} Dashboard",
+            "description": f"Build an interactive dashboard related to {career_goal}",
+            "skills_practiced": practiced_names[:3] or ["Programming"],
+            "difficulty": "Intermediate",
+            "estimated_time": "2-3 weeks"
+        },
+        _API_PROJECT,
+        _OPEN_SOURCE_PROJECT,
+        {
+            "name": f"{career_goal} Capstone Project",
+            "description": f"End-to-end project demonstrating readiness for {career_goal}",
+            "skills_practiced": missing_names[:3] if missing_names else ["All Skills"],
+            "difficulty": "Advanced",
+            "estimated_time": "4-6 weeks"
+        }
+    ]
+
+
+def freeze(data):
+    """Pickle a rendered analysis for the memo, detaching it from the shared fragments."""
+    return pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+
+
+def thaw(frozen):
+    """A fresh copy of a memoised analysis that the caller may edit."""
+    return pickle.loads(frozen)
+
+
+def memo_from_env():
+    """Build the memo of rendered analyses from FALLBACK_MEMO_SIZE (0 disables it).
+
+    A frozen analysis takes about 4 KB, held under two keys: its exact
+    input and (career goal, role requirements, skill set).
+    """
+    return LRUMemo(int(os.getenv('FALLBACK_MEMO_SIZE', '2048')))
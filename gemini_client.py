@@ -0,0 +1,341 @@
+"""
+HireSense - Shared Gemini client.
+One long-lived model per process, calls run on a thread pool behind a global
+concurrency limit, and identical in-flight requests share one upstream call.
+Each request carries a deadline, slow calls can be hedged with a second
+request, and a circuit breaker stops calling Gemini during outages.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class DeadlineExceeded(Exception):
+    """Gemini did not answer within the request's deadline."""
+
+
+class CircuitOpenError(Exception):
+    """The circuit breaker is open, so Gemini is not being called."""
+
+
+class CircuitBreaker:
+    """Open after repeated failures, then allow one trial call per cool-down."""
+
+    def __init__(self, failure_threshold=5, cooldown=30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Return True if a call may go upstream now."""
+        with self._lock:
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = 'half_open'
+                self._trial_running = False
+            if self.state == 'closed':
+                return True
+            if self.state == 'half_open' and not self._trial_running:
+                self._trial_running = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            # Only the half-open trial may close an open breaker; a call
+            # that started before it opened proves nothing
+            if self.state == 'open':
+                return
+            self.state = 'closed'
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.times_opened += 1
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+                self._trial_running = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+            }
+
+
+class LatencyTracker:
+    """Rolling window of recent call latencies."""
+
+    def __init__(self, size=200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct, min_samples=20):
+        """Return the pct-th percentile, or None until enough samples exist."""
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class SharedCall:
+    """One upstream request, its hedge, and every caller coalesced onto it.
+
+    The hedge and the breaker failure for a missed deadline belong to the
+    call, so they happen once however many callers are waiting on it. Once
+    timed out, a late answer is neither a success nor a latency sample.
+    """
+
+    def __init__(self):
+        self.primary = None
+        self.hedge = None
+        self.started = time.monotonic()
+        self.timed_out = False
+
+    def futures(self):
+        return [self.primary] if self.hedge is None else [self.primary, self.hedge]
+
+
+class GeminiClient:
+    """Thread-pooled, concurrency-limited, single-flight access to one model.
+
+    hedge_after is the delay in seconds before a hedged second request is
+    sent, 'auto' to use the observed p95 latency, or None to never hedge.
+    call_timeout is passed to the SDK so abandoned calls release their slot.
+    """
+
+    def __init__(self, model_factory, max_concurrency=8, hedge_after=None, call_timeout=None, breaker=None):
+        self._model_factory = model_factory
+        self._model = None
+        self.max_concurrency = max_concurrency
+        self.hedge_after = hedge_after
+        self.call_timeout = call_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyTracker()
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='gemini')
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+        self.active = 0
+        self.queued = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.deadline_exceeded = 0
+
+    @property
+    def model(self):
+        """The shared model, created on first use."""
+        with self._lock:
+            if self._model is None:
+                self._model = self._model_factory()
+            return self._model
+
+    def reset(self):
+        """Drop the shared model so the next call builds a new one."""
+        with self._lock:
+            self._model = None
+
+    def generate(self, prompt, key=None, deadline=None, generation_config=None):
+        """Return the response text, waiting at most until deadline.
+
+        deadline is a time.monotonic() timestamp. Raises CircuitOpenError when
+        the breaker is open and DeadlineExceeded when time runs out; slow
+        calls are hedged with a second request after the hedge delay.
+        Calls made with the same key while one is in flight share it, and
+        generation_config, when given, overrides the model's for this call.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError("Gemini circuit breaker is open")
+
+        call = self._join(prompt, key, generation_config)
+        hedge_delay = self._hedge_delay()
+        if hedge_delay is not None and (deadline is None or call.started + hedge_delay < deadline):
+            done, _ = wait([call.primary], timeout=max(0.0, call.started + hedge_delay - time.monotonic()))
+            if not done:
+                self._hedge(call, prompt, generation_config)
+
+        error = None
+        pending = set(call.futures())
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+
+        if pending:
+            with self._lock:
+                self.deadline_exceeded += 1
+                first_timeout = not call.timed_out
+                call.timed_out = True
+            if first_timeout:
+                self.breaker.record_failure()
+            raise DeadlineExceeded("Gemini did not respond before the deadline")
+        raise error
+
+    def stream(self, prompt, deadline=None):
+        """Yield response text chunks, holding a concurrency slot until done.
+
+        The upstream stream is read on a helper thread so the caller can stop
+        waiting at the deadline; DeadlineExceeded is raised at that point.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError("Gemini circuit breaker is open")
+
+        chunks = queue.Queue()
+        finished = object()
+        # Set once the caller gives up, so a late end is not counted again
+        timed_out = threading.Event()
+
+        def produce():
+            with self._semaphore:
+                self._enter()
+                try:
+                    for chunk in self.model.generate_content(prompt, stream=True, **self._request_options()):
+                        chunks.put(chunk.text)
+                    if not timed_out.is_set():
+                        self.breaker.record_success()
+                except Exception as e:
+                    if not timed_out.is_set():
+                        self.breaker.record_failure()
+                    chunks.put(e)
+                finally:
+                    self._exit()
+                    chunks.put(finished)
+
+        threading.Thread(target=produce, name='gemini-stream', daemon=True).start()
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = chunks.get(timeout=timeout)
+            except queue.Empty:
+                timed_out.set()
+                with self._lock:
+                    self.deadline_exceeded += 1
+                self.breaker.record_failure()
+                raise DeadlineExceeded("Gemini stream did not finish before the deadline")
+            if item is finished:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "max_concurrency": self.max_concurrency,
+                "active": self.active,
+                "queued": self.queued,
+                "in_flight_keys": len(self._inflight),
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "deadline_exceeded": self.deadline_exceeded,
+            }
+        stats["latency_p95"] = self.latency.percentile(95)
+        stats["breaker"] = self.breaker.stats()
+        return stats
+
+    def _generate(self, call, prompt, generation_config=None):
+        with self._lock:
+            self.queued -= 1
+        with self._semaphore:
+            self._enter()
+            started = time.monotonic()
+            try:
+                options = self._request_options()
+                if generation_config is not None:
+                    options["generation_config"] = generation_config
+                text = self.model.generate_content(prompt, **options).text
+            except Exception:
+                if not call.timed_out:
+                    self.breaker.record_failure()
+                raise
+            finally:
+                self._exit()
+        if not call.timed_out:
+            self.latency.add(time.monotonic() - started)
+            self.breaker.record_success()
+        return text
+
+    def _request_options(self):
+        if self.call_timeout:
+            return {"request_options": {"timeout": self.call_timeout}}
+        return {}
+
+    def _hedge_delay(self):
+        if self.hedge_after == 'auto':
+            return self.latency.percentile(95)
+        return self.hedge_after
+
+    def _enter(self):
+        with self._lock:
+            self.active += 1
+            self.calls += 1
+
+    def _exit(self):
+        with self._lock:
+            self.active -= 1
+
+    def _join(self, prompt, key, generation_config):
+        """Return the in-flight call for key, or start a new upstream call."""
+        with self._lock:
+            if key is not None and key in self._inflight:
+                self.coalesced += 1
+                return self._inflight[key]
+            self.queued += 1
+            call = SharedCall()
+            call.primary = self._executor.submit(self._generate, call, prompt, generation_config)
+            if key is not None:
+                self._inflight[key] = call
+        if key is not None:
+            call.primary.add_done_callback(lambda f: self._forget(key, call))
+        return call
+
+    def _hedge(self, call, prompt, generation_config):
+        """Send the call's hedged second request unless another caller already has."""
+        with self._lock:
+            if call.hedge is not None:
+                return
+            self.hedges += 1
+            self.queued += 1
+            call.hedge = self._executor.submit(self._generate, call, prompt, generation_config)
+        call.hedge.add_done_callback(lambda f: self._hedge_done(call, f))
+
+    def _hedge_done(self, call, hedge):
+        primary = call.primary
+        if hedge.exception() is None and not (primary.done() and primary.exception() is None):
+            with self._lock:
+                self.hedge_wins += 1
+
+    def _forget(self, key, call):
+        with self._lock:
+            if self._inflight.get(key) is call:
+                del self._inflight[key]
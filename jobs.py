@@ -0,0 +1,258 @@
+"""
+HireSense - Background analysis jobs.
+Accepted analyses wait on a local queue, in process memory or in a SQLite
+file that every gunicorn worker on the host shares, and a pool of worker
+threads runs them, so submissions are admitted faster than they execute.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+from gemini_client import LatencyTracker
+
+
+class QueueFull(Exception):
+    """The job queue is at its maximum depth."""
+
+
+class MemoryJobStore:
+    """Jobs held in this process only."""
+
+    def __init__(self):
+        self._jobs = OrderedDict()
+        self._pending = deque()
+        self._lock = threading.Lock()
+
+    def put(self, job, payload):
+        with self._lock:
+            self._jobs[job["id"]] = dict(job)
+            self._pending.append((job["id"], payload))
+
+    def claim(self, now, stale_after):
+        with self._lock:
+            if not self._pending:
+                return None
+            job_id, payload = self._pending.popleft()
+            job = self._jobs[job_id]
+            job.update(status="running", started=now)
+            return dict(job), payload
+
+    def finish(self, job_id, status, result, error, now):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(status=status, result=result, error=error, finished=now)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def depth(self):
+        with self._lock:
+            return len(self._pending)
+
+    def prune(self, before):
+        with self._lock:
+            expired = [k for k, job in self._jobs.items() if job["finished"] and job["finished"] < before]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+
+class SqliteJobStore:
+    """Jobs kept in a SQLite file, claimed atomically by any process."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS analysis_jobs ('
+                'id TEXT PRIMARY KEY, status TEXT NOT NULL, payload TEXT, result TEXT, error TEXT, '
+                'created REAL NOT NULL, started REAL, finished REAL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS analysis_jobs_status ON analysis_jobs (status, created)')
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def put(self, job, payload):
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT INTO analysis_jobs (id, status, payload, created) VALUES (?, ?, ?, ?)',
+                (job["id"], job["status"], json.dumps(payload), job["created"]),
+            )
+
+    def claim(self, now, stale_after):
+        with self._connect() as conn:
+            # Jobs whose worker process died mid-run go back on the queue
+            conn.execute(
+                "UPDATE analysis_jobs SET status = 'queued', started = NULL "
+                "WHERE status = 'running' AND started < ?",
+                (now - stale_after,),
+            )
+            row = conn.execute(
+                "UPDATE analysis_jobs SET status = 'running', started = ? "
+                "WHERE id = (SELECT id FROM analysis_jobs WHERE status = 'queued' ORDER BY created LIMIT 1) "
+                "AND status = 'queued' RETURNING id, created, payload",
+                (now,),
+            ).fetchone()
+        if row is None:
+            return None
+        job = {"id": row[0], "status": "running", "created": row[1], "started": now,
+               "finished": None, "result": None, "error": None}
+        return job, json.loads(row[2])
+
+    def finish(self, job_id, status, result, error, now):
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE analysis_jobs SET status = ?, result = ?, error = ?, finished = ?, payload = NULL '
+                'WHERE id = ?',
+                (status, json.dumps(result) if result is not None else None, error, now, job_id),
+            )
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT id, status, result, error, created, started, finished FROM analysis_jobs WHERE id = ?',
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"id": row[0], "status": row[1], "result": json.loads(row[2]) if row[2] else None,
+                "error": row[3], "created": row[4], "started": row[5], "finished": row[6]}
+
+    def depth(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM analysis_jobs WHERE status = 'queued'").fetchone()[0]
+
+    def prune(self, before):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM analysis_jobs WHERE finished < ?', (before,))
+
+
+class JobQueue:
+    """Queue analyses and run them on a pool of worker threads.
+
+    handler(payload) runs one job and returns its JSON-serialisable result.
+    Worker threads start with the first submission in each process, so the
+    pool is never started in a gunicorn master that later forks.
+    """
+
+    def __init__(self, handler, workers=4, max_depth=1000, ttl=3600, db_path='', stale_after=300, poll_interval=0.5):
+        self.handler = handler
+        self.workers = workers
+        self.max_depth = max_depth
+        self.ttl = ttl
+        self.stale_after = stale_after
+        self.poll_interval = poll_interval
+        self.store = SqliteJobStore(db_path) if db_path else MemoryJobStore()
+        self.wait_time = LatencyTracker()
+        self.run_time = LatencyTracker()
+        self._wakeup = threading.Condition()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._pid = None
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.running = 0
+
+    def submit(self, payload):
+        """Queue a job and return its id. Raises QueueFull at max_depth."""
+        self._ensure_workers()
+        now = time.time()
+        self.store.prune(now - self.ttl)
+        if self.store.depth() >= self.max_depth:
+            with self._lock:
+                self.rejected += 1
+            raise QueueFull(f"{self.max_depth} jobs already waiting")
+        job = {"id": uuid.uuid4().hex, "status": "queued", "created": now,
+               "started": None, "finished": None, "result": None, "error": None}
+        self.store.put(job, payload)
+        with self._lock:
+            self.submitted += 1
+        with self._wakeup:
+            self._wakeup.notify()
+        return job["id"]
+
+    def get(self, job_id):
+        """Return the job record, or None if it is unknown or expired."""
+        return self.store.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "workers": self.workers,
+                "max_depth": self.max_depth,
+                "running": self.running,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "failed": self.failed,
+            }
+        stats["depth"] = self.store.depth()
+        stats["wait_p50"] = self.wait_time.percentile(50, min_samples=1)
+        stats["wait_p95"] = self.wait_time.percentile(95, min_samples=1)
+        stats["run_p50"] = self.run_time.percentile(50, min_samples=1)
+        stats["run_p95"] = self.run_time.percentile(95, min_samples=1)
+        return stats
+
+    def _ensure_workers(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._threads = [
+                threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True)
+                for i in range(self.workers)
+            ]
+        for thread in self._threads:
+            thread.start()
+
+    def _work(self):
+        while True:
+            claimed = self.store.claim(time.time(), self.stale_after)
+            if claimed is None:
+                # Local submissions notify; jobs queued by other processes are polled
+                with self._wakeup:
+                    self._wakeup.wait(self.poll_interval)
+                continue
+            job, payload = claimed
+            self.wait_time.add(job["started"] - job["created"])
+            with self._lock:
+                self.running += 1
+            try:
+                result, error, status = self.handler(payload), None, "done"
+            except Exception as e:
+                print(f"Job {job['id']} failed: {e}")
+                result, error, status = None, str(e), "failed"
+            finished = time.time()
+            self.run_time.add(finished - job["started"])
+            self.store.finish(job["id"], status, result, error, finished)
+            with self._lock:
+                self.running -= 1
+                if status == "done":
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+
+def queue_from_env(handler):
+    """Build the job queue from JOB_* environment variables, or None if disabled."""
+    workers = int(os.getenv('JOB_WORKERS', '0'))
+    if workers <= 0:
+        return None
+    return JobQueue(
+        handler,
+        workers=workers,
+        max_depth=int(os.getenv('JOB_QUEUE_DEPTH', '1000')),
+        ttl=int(os.getenv('JOB_TTL', '3600')),
+        db_path=os.getenv('JOB_DB', ''),
+    )
@@ -0,0 +1,254 @@
+"""
+HireSense - Helpers for JSON produced by the language model.
+Incremental parsing of streamed responses, one top-level section at a time,
+plus repair and schema checks so usable output is never thrown away whole.
+"""
+
+import json
+import re
+
+
+class SectionStreamParser:
+    """Incrementally parse a streamed top-level JSON object.
+
+    Feed text chunks as they arrive; feed() returns the (key, value) pairs of
+    the top-level members completed by that chunk, so callers can act on each
+    section without waiting for the whole document. Anything before the first
+    '{' (such as a ```json fence) is ignored.
+    """
+
+    def __init__(self):
+        self.text = ''
+        self.complete = False
+        self.errors = []
+        self._pos = 0
+        self._state = 'start'
+        self._in_string = False
+        self._escape = False
+        self._depth = 0
+        self._start = 0
+        self._key = None
+
+    def feed(self, chunk):
+        """Consume a chunk of text and return newly completed sections."""
+        self.text += chunk
+        completed = []
+        text = self.text
+        pos = self._pos
+        while pos < len(text) and self._state != 'done':
+            char = text[pos]
+            state = self._state
+
+            if state == 'start':
+                if char == '{':
+                    self._state = 'key'
+            elif state == 'key':
+                if char == '"':
+                    self._start = pos
+                    self._state = 'key_string'
+                elif char == '}':
+                    self._state = 'done'
+                    self.complete = True
+            elif state == 'key_string':
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._key = json.loads(text[self._start:pos + 1])
+                    self._state = 'colon'
+            elif state == 'colon':
+                if char == ':':
+                    self._state = 'value_start'
+            elif state == 'value_start':
+                if not char.isspace():
+                    self._start = pos
+                    self._depth = 0
+                    self._state = 'value'
+                    continue
+            elif state == 'value':
+                if self._in_string:
+                    if self._escape:
+                        self._escape = False
+                    elif char == '\\':
+                        self._escape = True
+                    elif char == '"':
+                        self._in_string = False
+                elif char == '"':
+                    self._in_string = True
+                elif char in '{[':
+                    self._depth += 1
+                elif char in '}]':
+                    if self._depth == 0:
+                        self._emit(text[self._start:pos], completed)
+                        self._state = 'done'
+                        self.complete = True
+                    else:
+                        self._depth -= 1
+                        if self._depth == 0:
+                            self._emit(text[self._start:pos + 1], completed)
+                            self._state = 'key'
+                elif char == ',' and self._depth == 0:
+                    self._emit(text[self._start:pos], completed)
+                    self._state = 'key'
+            pos += 1
+        self._pos = pos
+        return completed
+
+    def _emit(self, raw, completed):
+        raw = raw.strip()
+        if not raw:
+            return
+        try:
+            completed.append((self._key, json.loads(raw)))
+        except json.JSONDecodeError as e:
+            self.errors.append((self._key, str(e)))
+
+
+_FENCE_START = re.compile(r'^\s*```(?:json)?\s*\n?')
+_FENCE_END = re.compile(r'\n?```\s*$')
+
+
+def strip_fences(text):
+    """Remove a surrounding ```json ... ``` fence, if any."""
+    text = text.strip()
+    if text.startswith('```'):
+        text = _FENCE_START.sub('', text)
+        text = _FENCE_END.sub('', text)
+    return text
+
+
+def repair_json(text):
+    """Fix the defects language models commonly produce in JSON.
+
+    Drops trailing commas and any text after the top-level value, and closes
+    a truncated document by cutting back to the last complete value and
+    appending the missing closing brackets.
+    """
+    start = min((i for i in (text.find('{'), text.find('[')) if i >= 0), default=-1)
+    if start < 0:
+        return text
+    out = []
+    stack = []
+    in_string = False
+    escape = False
+    # (length of out, open brackets) after the last complete value
+    safe = None
+    for char in text[start:]:
+        if in_string:
+            out.append(char)
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in '{[':
+            stack.append('}' if char == '{' else ']')
+        elif char in '}]':
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ',':
+                out.pop()
+            if not stack:
+                break
+            out.append(stack.pop())
+            safe = (len(out), list(stack))
+            if not stack:
+                break
+            continue
+        elif char == ',':
+            safe = (len(out), list(stack))
+        out.append(char)
+
+    if not stack and not in_string:
+        return ''.join(out)
+    if safe is None:
+        # Nothing complete yet: an empty container of the outer type
+        return out[0] + stack[0]
+    length, open_brackets = safe
+    return ''.join(out[:length]) + ''.join(reversed(open_brackets))
+
+
+_INVALID = object()
+
+
+def conform(value, schema):
+    """Coerce value to schema, dropping what does not fit.
+
+    Array items and optional object properties that do not match are
+    dropped; a mismatched required property or root type makes the whole
+    value invalid, in which case None is returned.
+    """
+    result = _conform(value, schema)
+    return None if result is _INVALID else result
+
+
+def _conform(value, schema):
+    kind = schema.get('type')
+    if kind == 'object':
+        if not isinstance(value, dict):
+            return _INVALID
+        required = set(schema.get('required', ()))
+        result = {}
+        for key, sub_schema in schema.get('properties', {}).items():
+            if key not in value:
+                if key in required:
+                    return _INVALID
+                continue
+            item = _conform(value[key], sub_schema)
+            if item is _INVALID:
+                if key in required:
+                    return _INVALID
+                continue
+            result[key] = item
+        return result
+    if kind == 'array':
+        if not isinstance(value, list):
+            return _INVALID
+        items = (_conform(item, schema.get('items', {})) for item in value)
+        return [item for item in items if item is not _INVALID]
+    if kind == 'integer':
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return _INVALID
+        return int(value)
+    if kind == 'string':
+        return value if isinstance(value, str) else _INVALID
+    return value
+
+
+def parse_analysis(text, schema):
+    """Parse an LLM analysis, repairing and validating it section by section.
+
+    Returns (sections, outcome) where sections holds every top-level
+    section that conforms to schema and outcome is "ok" (valid as sent),
+    "repaired" (complete after repair), "partial" (some sections unusable)
+    or "discarded" (nothing usable).
+    """
+    text = strip_fences(text)
+    repaired = False
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        repaired = True
+        try:
+            data = json.loads(repair_json(text))
+        except json.JSONDecodeError:
+            data = None
+    if not isinstance(data, dict):
+        return {}, "discarded"
+
+    sections = {}
+    for name, section_schema in schema['properties'].items():
+        if name in data:
+            value = conform(data[name], section_schema)
+            if value is not None:
+                sections[name] = value
+    if not sections:
+        return {}, "discarded"
+    if len(sections) < len(schema['properties']):
+        return sections, "partial"
+    return sections, "repaired" if repaired else "ok"
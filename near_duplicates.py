@@ -0,0 +1,195 @@
+"""
+HireSense - Near-duplicate resume detection.
+MinHash signatures over word shingles, indexed with LSH banding, so resumes
+that differ only in a name or a few edited lines can reuse a stored
+analysis. Only signatures and cache keys are kept; results stay in the
+analysis cache.
+"""
+
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+
+from prompting import split_sections
+
+# Mersenne prime for the (a * x + b) mod p permutations
+_PRIME = np.uint64((1 << 61) - 1)
+_WORD = re.compile(r'[a-z0-9+#]+')
+
+
+def shingles(text, size=3):
+    """Return the set of hashed `size`-word shingles of normalised text."""
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        return set()
+    return {zlib.crc32(' '.join(words[i:i + size]).encode()) for i in range(len(words) - size + 1)}
+
+
+class NearDuplicateIndex:
+    """LSH index of MinHash signatures with LRU eviction.
+
+    A stored entry matches when it was made for the same role and its
+    estimated Jaccard similarity is at least threshold. num_perm must be a
+    multiple of bands; more rows per band means fewer, closer candidates.
+    """
+
+    def __init__(self, threshold=0.9, num_perm=64, bands=16, max_entries=5000, min_shingles=20, seed=1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_entries = max_entries
+        self.min_shingles = min_shingles
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+        self._entries = OrderedDict()
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def signature(self, text):
+        """Return the MinHash signature of text, or None if it is too short to compare."""
+        hashes = shingles(text)
+        if len(hashes) < self.min_shingles:
+            return None
+        values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+        # Wrapping uint64 arithmetic is fine here: it is still a fixed
+        # pseudo-random permutation per row, which is all MinHash needs.
+        permuted = (values[:, None] * self._a + self._b) % _PRIME
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def find(self, signature, role):
+        """Return the key of the most similar entry for role above threshold, or None."""
+        if signature is None:
+            return None
+        with self._lock:
+            self.lookups += 1
+            candidates = set()
+            for band in self._bands(signature):
+                candidates |= self._buckets.get(band, set())
+            best_key, best_score = None, self.threshold
+            for key in candidates:
+                entry_role, entry_signature = self._entries[key]
+                if entry_role != role:
+                    continue
+                score = float(np.count_nonzero(entry_signature == signature)) / self.num_perm
+                if score >= best_score:
+                    best_key, best_score = key, score
+            if best_key is None:
+                return None
+            self._entries.move_to_end(best_key)
+            self.hits += 1
+            return best_key
+
+    def add(self, key, signature, role):
+        """Index signature under key, evicting the least recently used entry when full."""
+        if signature is None:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (role, signature)
+            for band in self._bands(signature):
+                self._buckets.setdefault(band, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def discard(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+    def _bands(self, signature):
+        for i in range(self.bands):
+            yield i, signature[i * self.rows:(i + 1) * self.rows].tobytes()
+
+    def _remove(self, key):
+        _, signature = self._entries.pop(key)
+        for band in self._bands(signature):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+
+
+_NAME_LINE = re.compile(r"^[A-Za-z][A-Za-z.'-]*(?: [A-Za-z][A-Za-z.'-]*){1,3}$")
+
+
+def guess_name(resume_text):
+    """Return the first line of the resume if it looks like a person's name."""
+    for line in resume_text.splitlines():
+        line = line.strip()
+        if line:
+            return line if _NAME_LINE.match(line) and len(line) <= 40 else None
+    return None
+
+
+_YEARS_STATED = re.compile(r'\b(\d{1,2})\+?\s*(?:years|yrs)\b', re.IGNORECASE)
+_YEAR_RANGE = re.compile(r'\b((?:19|20)\d\d)\s*(?:-|–|to)\s*((?:19|20)\d\d|present|current|now)\b', re.IGNORECASE)
+
+
+def guess_education(sections):
+    """Return the first line of the resume's education section, if it has one."""
+    lines = sections.get("education")
+    return lines[0][:120] if lines else None
+
+
+def guess_experience_years(sections):
+    """Years of experience stated in the resume, else spanned by the experience section's date ranges."""
+    text = "\n".join(sections.get("summary", []) + sections.get("other", []) + sections.get("experience", []))
+    stated = [int(n) for n in _YEARS_STATED.findall(text)]
+    if stated:
+        return max(stated)
+    this_year = datetime.now().year
+    spans = [(int(start), int(end) if end.isdigit() else this_year)
+             for start, end in _YEAR_RANGE.findall("\n".join(sections.get("experience", [])))]
+    if not spans:
+        return 0
+    return max(0, min(50, max(end for _, end in spans) - min(start for start, _ in spans)))
+
+
+def patch_profile(data, resume_text):
+    """Return a copy of a stored analysis with the learner's own name, education and experience.
+
+    These are read from resume_text, as the fallback engine would; the
+    rest of the profile (level and domain) is kept, as near-duplicate
+    resumes for the same role share it.
+    """
+    sections = split_sections(resume_text)
+    data = dict(data)
+    profile = dict(data.get("profile_summary", {}))
+    profile["name"] = guess_name(resume_text) or "Learner"
+    profile["education"] = guess_education(sections) or "Not specified"
+    profile["experience_years"] = guess_experience_years(sections)
+    data["profile_summary"] = profile
+    return data
+
+
+def index_from_env():
+    """Build the index from NEAR_DUP_* environment variables, or None if disabled."""
+    size = int(os.getenv('NEAR_DUP_INDEX_SIZE', '5000'))
+    if size <= 0:
+        return None
+    return NearDuplicateIndex(threshold=float(os.getenv('NEAR_DUP_THRESHOLD', '0.9')), max_entries=size)
@@ -0,0 +1,247 @@
+"""
+HireSense - Sandboxed document parsing.
+Runs PDF/DOCX/TXT extraction in a bounded pool of worker processes with a
+wall-clock timeout, an address-space cap and recycling after a number of
+jobs, so one hostile upload cannot pin a web worker.
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from io import BytesIO
+
+from extraction import collect_text, iter_text
+
+# Worker processes send text back in batches of roughly this many characters,
+# so a timed-out parse can still return what it has read so far.
+_BATCH_CHARS = 2000
+
+_forkserver_preload = set()
+_forkserver_lock = threading.Lock()
+
+
+def forkserver_context(preload=()):
+    """Return the forkserver context (spawn where there is none), asking its server to import preload.
+
+    Workers forked by the server start with those modules loaded but never
+    inherit locks held by threads of the calling process. There is one
+    server per process, started on first use, so modules asked for after
+    that are imported by each worker instead.
+    """
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+    ctx = multiprocessing.get_context('forkserver')
+    with _forkserver_lock:
+        _forkserver_preload.update(preload)
+        ctx.set_forkserver_preload(sorted(_forkserver_preload))
+    return ctx
+
+
+def _current_address_space():
+    """Bytes of address space already mapped by this process (Linux only)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return 0
+
+
+def _limit_memory(memory_limit):
+    """Cap how much more memory this process may map for parsing."""
+    if not memory_limit:
+        return
+    try:
+        import resource
+        # The worker already maps the interpreter and preloaded parsers, so
+        # the cap is headroom on top of what is already mapped.
+        limit = _current_address_space() + memory_limit
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        print(f"Parser memory limit not applied: {e}")
+
+
+def _worker_main(conn, memory_limit):
+    """Parse documents received on conn until the pipe closes."""
+    _limit_memory(memory_limit)
+    while True:
+        try:
+            data, filename, max_chars = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            batch = []
+            batch_chars = 0
+            total = 0
+            for piece in iter_text(BytesIO(data), filename, max_chars):
+                if not piece:
+                    continue
+                batch.append(piece)
+                batch_chars += len(piece) + 1
+                total += len(piece) + 1
+                if batch_chars >= _BATCH_CHARS or total >= max_chars:
+                    conn.send(('chunk', "\n".join(batch)))
+                    batch, batch_chars = [], 0
+                if total >= max_chars:
+                    break
+            if batch:
+                conn.send(('chunk', "\n".join(batch)))
+            conn.send(('done', None))
+        except MemoryError:
+            conn.send(('error', "memory limit exceeded"))
+        except Exception as e:
+            conn.send(('error', str(e)))
+
+
+class _Worker:
+    def __init__(self, ctx, memory_limit):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, memory_limit), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def stop(self):
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+
+
+class ParserPool:
+    """Bounded pool of parser processes.
+
+    extract() returns (text, status) where status is one of "ok", "partial"
+    (timed out after some text was read), "timeout", "error" or "busy" (the
+    wait queue is full).
+    """
+
+    def __init__(self, size=2, timeout=10.0, memory_mb=256, max_jobs=50, max_queue=16):
+        self.size = size
+        self.timeout = timeout
+        self.memory_limit = memory_mb * 1024 * 1024 if memory_mb else 0
+        self.max_jobs = max_jobs
+        self.max_queue = max_queue
+        # Workers are replaced from request threads, so they come from a
+        # forkserver that has the parsers imported rather than being forked
+        # from the threaded web worker.
+        self._ctx = forkserver_context([__name__, 'PyPDF2', 'docx'])
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+        self.waiting = 0
+        self.busy = 0
+        self.jobs = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.rejected = 0
+        self.recycled = 0
+
+    def _start(self):
+        with self._lock:
+            if self._started:
+                return
+            for _ in range(self.size):
+                self._idle.put(_Worker(self._ctx, self.memory_limit))
+            self._started = True
+
+    def extract(self, data, filename, max_chars):
+        """Parse data in a worker process within the pool's timeout."""
+        self._start()
+        deadline = time.monotonic() + self.timeout
+        with self._lock:
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                return "", "busy"
+            self.waiting += 1
+        try:
+            worker = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            with self._lock:
+                self.waiting -= 1
+                self.timeouts += 1
+            return "", "timeout"
+        with self._lock:
+            self.waiting -= 1
+            self.busy += 1
+
+        chunks = []
+        status = "timeout"
+        try:
+            worker.conn.send((data, filename, max_chars))
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not worker.conn.poll(remaining):
+                    break
+                kind, payload = worker.conn.recv()
+                if kind == 'chunk':
+                    chunks.append(payload)
+                elif kind == 'done':
+                    status = "ok"
+                    break
+                else:
+                    print(f"Parser worker error: {payload}")
+                    status = "error"
+                    break
+        except (EOFError, OSError) as e:
+            print(f"Parser worker crashed: {e}")
+            status = "error"
+
+        worker.jobs += 1
+        with self._lock:
+            self.busy -= 1
+            self.jobs += 1
+            if status == "timeout":
+                self.timeouts += 1
+            elif status == "error":
+                self.errors += 1
+        if status in ("ok", "error") and worker.process.is_alive() and worker.jobs < self.max_jobs:
+            self._idle.put(worker)
+        else:
+            # Hung, crashed or worn out: replace it with a fresh process
+            worker.stop()
+            with self._lock:
+                self.recycled += 1
+            self._idle.put(_Worker(self._ctx, self.memory_limit))
+
+        text = collect_text(chunks, max_chars)
+        if status == "timeout" and text:
+            status = "partial"
+        return text, status
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "busy": self.busy,
+                "queue_depth": self.waiting,
+                "jobs": self.jobs,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "rejected": self.rejected,
+                "recycled": self.recycled,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            while not self._idle.empty():
+                self._idle.get_nowait().stop()
+            self._started = False
+
+
+def pool_from_env():
+    """Build the parser pool from PARSER_* environment variables, or None when disabled."""
+    size = int(os.getenv('PARSER_POOL_SIZE', '2'))
+    if size <= 0:
+        return None
+    return ParserPool(
+        size=size,
+        timeout=float(os.getenv('PARSER_TIMEOUT', '10')),
+        memory_mb=int(os.getenv('PARSER_MEMORY_MB', '256')),
+        max_jobs=int(os.getenv('PARSER_MAX_JOBS', '50')),
+        max_queue=int(os.getenv('PARSER_QUEUE_DEPTH', '16')),
+    )
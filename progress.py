@@ -0,0 +1,383 @@
+"""
+HireSense - Learner progress tracking.
+Keeps each learner's latest analysis, diffs a resubmitted profile against
+it by resume section and detected skill, updates skill levels, categories
+and readiness locally, and reports what changed between versions, so a
+returning learner only needs a narrow roadmap update from Gemini.
+"""
+
+import copy
+import hashlib
+import hmac
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from prompting import split_sections
+
+SKILL_LISTS = ("strong_skills", "moderate_skills", "weak_skills")
+# Level bands used to place updated skills, as in the fallback engine
+STRONG_LEVEL = 70
+MODERATE_LEVEL = 50
+DEFAULT_REQUIRED_SCORE = 85
+
+
+class MemoryLearnerStore:
+    """Latest analysis per learner, in this process only, LRU-bounded."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._records = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, learner_id):
+        with self._lock:
+            record = self._records.get(learner_id)
+            if record is None:
+                return None
+            self._records.move_to_end(learner_id)
+            return dict(record)
+
+    def put(self, learner_id, record):
+        """Store record as the learner's next version and return its version number."""
+        with self._lock:
+            previous = self._records.pop(learner_id, None)
+            version = previous["version"] + 1 if previous else 1
+            self._records[learner_id] = dict(record, learner_id=learner_id, version=version, updated=time.time())
+            while len(self._records) > self.max_entries:
+                self._records.popitem(last=False)
+            return version
+
+    def count(self):
+        with self._lock:
+            return len(self._records)
+
+
+class SqliteLearnerStore:
+    """Every analysed version of each learner's profile, in a SQLite file shared by all workers."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS learner_analyses ('
+                'learner_id TEXT NOT NULL, version INTEGER NOT NULL, career_goal TEXT NOT NULL, '
+                'resume_text TEXT NOT NULL, skills_text TEXT NOT NULL, source TEXT, analysis TEXT NOT NULL, '
+                'updated REAL NOT NULL, PRIMARY KEY (learner_id, version))'
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def get(self, learner_id):
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT version, career_goal, resume_text, skills_text, source, analysis, updated '
+                'FROM learner_analyses WHERE learner_id = ? ORDER BY version DESC LIMIT 1',
+                (learner_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"learner_id": learner_id, "version": row[0], "career_goal": row[1], "resume_text": row[2],
+                "skills_text": row[3], "source": row[4], "data": json.loads(row[5]), "updated": row[6]}
+
+    def put(self, learner_id, record):
+        # The next version is allocated by the INSERT itself, which holds the
+        # write lock, so concurrent resubmissions of one learner queue up
+        # instead of racing for the same version number
+        with self._connect() as conn:
+            return conn.execute(
+                'INSERT INTO learner_analyses '
+                'SELECT ?, COALESCE(MAX(version), 0) + 1, ?, ?, ?, ?, ?, ? FROM learner_analyses WHERE learner_id = ? '
+                'RETURNING version',
+                (learner_id, record["career_goal"], record["resume_text"], record["skills_text"],
+                 record.get("source"), json.dumps(record["data"]), time.time(), learner_id),
+            ).fetchone()[0]
+
+    def count(self):
+        with self._connect() as conn:
+            return conn.execute('SELECT COUNT(DISTINCT learner_id) FROM learner_analyses').fetchone()[0]
+
+
+class LearnerStore:
+    """Counts lookups and saves around a memory or SQLite learner store."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.returning = 0
+        self.saves = 0
+        self.save_errors = 0
+
+    def get(self, learner_id):
+        record = self.backend.get(learner_id)
+        with self._lock:
+            self.lookups += 1
+            if record is not None:
+                self.returning += 1
+        return record
+
+    def exists(self, learner_id):
+        """True when learner_id has a stored analysis (not counted as a lookup)."""
+        return self.backend.get(learner_id) is not None
+
+    def put(self, learner_id, record):
+        """Save record as the learner's next version; returns the version, or None if it could not be saved."""
+        try:
+            version = self.backend.put(learner_id, record)
+        except sqlite3.Error as e:
+            print(f"Learner DB error: {e}")
+            with self._lock:
+                self.save_errors += 1
+            return None
+        with self._lock:
+            self.saves += 1
+        return version
+
+    def stats(self):
+        with self._lock:
+            stats = {"lookups": self.lookups, "returning": self.returning, "saves": self.saves,
+                     "save_errors": self.save_errors}
+        stats["learners"] = self.backend.count()
+        return stats
+
+
+def learner_token(secret, learner_id):
+    """Token the server issues for learner_id; an HMAC, so nothing extra is stored."""
+    return hmac.new(secret.encode(), b"learner:" + learner_id.encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def valid_learner_token(secret, learner_id, token):
+    return bool(token) and hmac.compare_digest(learner_token(secret, learner_id), token)
+
+
+def skill_level(count):
+    """Level for a skill mentioned count times, as the fallback engine scores it."""
+    if count >= 3:
+        return min(90, 70 + count * 5)
+    if count >= 2:
+        return min(70, 50 + count * 5)
+    return 35
+
+
+def diff_profiles(old_resume, old_skills_text, new_resume, new_skills_text, match_skills):
+    """Compare two versions of a learner profile.
+
+    Returns {"sections": {section: {"added": [lines], "removed": [lines]}},
+    "skills_added", "skills_removed", "skills_changed" ({skill: [before,
+    after]} mention counts) and "change_ratio" (changed lines over all
+    lines of both versions). match_skills(text) returns {skill: (count,
+    category)}.
+    """
+    old_sections = split_sections(old_resume)
+    new_sections = split_sections(new_resume)
+    old_sections["listed_skills"] = [s.strip() for s in old_skills_text.split(',') if s.strip()]
+    new_sections["listed_skills"] = [s.strip() for s in new_skills_text.split(',') if s.strip()]
+
+    sections = {}
+    changed = 0
+    total = 0
+    for name in dict.fromkeys(list(old_sections) + list(new_sections)):
+        old_lines = old_sections.get(name, [])
+        new_lines = new_sections.get(name, [])
+        old_keys = {line.lower() for line in old_lines}
+        new_keys = {line.lower() for line in new_lines}
+        added = [line for line in new_lines if line.lower() not in old_keys]
+        removed = [line for line in old_lines if line.lower() not in new_keys]
+        total += len(old_lines) + len(new_lines)
+        if added or removed:
+            sections[name] = {"added": added, "removed": removed}
+            changed += len(added) + len(removed)
+
+    old_found = match_skills(old_resume + " " + old_skills_text)
+    new_found = match_skills(new_resume + " " + new_skills_text)
+    return {
+        "sections": sections,
+        "skills_added": {name: category for name, (_, category) in new_found.items() if name not in old_found},
+        "skills_removed": [name for name in old_found if name not in new_found],
+        "skills_changed": {
+            name: [old_found[name][0], count] for name, (count, _) in new_found.items()
+            if name in old_found and old_found[name][0] != count
+        },
+        "change_ratio": round(changed / total, 4) if total else 0.0,
+    }
+
+
+def _known_levels(analysis):
+    return {
+        skill["name"].lower(): skill.get("level", 0)
+        for group in SKILL_LISTS for skill in analysis.get(group, []) if skill.get("name")
+    }
+
+
+def canonical_skill(name, match_skills):
+    """Taxonomy name for a displayed skill name ("React.js" -> "react"), else the name lowercased."""
+    found = list(match_skills(name))
+    return found[0] if len(found) == 1 else name.lower()
+
+
+def update_skills(data, diff, new_counts, requirements, match_skills):
+    """Return a copy of an analysis with skill levels, categories and readiness updated for diff.
+
+    Skills the learner gained or mentions more often are (re)levelled and
+    moved between strong/moderate/weak; dropped skills are removed and, when
+    the role needs them, listed as missing again. Only categories holding a
+    touched skill are rescored, and readiness moves with the mean category
+    gap. new_counts maps skill names to mention counts in the new profile.
+    Skills already listed under another spelling ("JavaScript (ES6)") are
+    matched to their taxonomy names with match_skills, so a gained skill
+    updates the existing entry instead of being counted twice.
+    """
+    data = copy.deepcopy(data)
+    analysis = data.setdefault("skill_analysis", {})
+    entries = {}
+    for group in SKILL_LISTS:
+        for skill in analysis.get(group, []):
+            if skill.get("name"):
+                key = canonical_skill(skill["name"], match_skills)
+                if key not in entries or skill.get("level", 0) > entries[key].get("level", 0):
+                    entries[key] = skill
+    touched_categories = set()
+
+    raised = dict(diff["skills_added"])
+    for name, (before, after) in diff["skills_changed"].items():
+        if after > before:
+            raised[name] = None
+    for name, category in raised.items():
+        level = skill_level(new_counts.get(name, 1))
+        entry = entries.get(name)
+        if entry is None:
+            entry = entries[name] = {"name": name.title(), "level": level, "category": category or "Other"}
+        else:
+            entry["level"] = max(entry.get("level", 0), level)
+        touched_categories.add(entry["category"])
+
+    required = set(requirements.get("required", []))
+    nice_to_have = set(requirements.get("nice_to_have", []))
+    missing = [s for s in analysis.get("missing_skills", [])
+               if s.get("name") and canonical_skill(s["name"], match_skills) not in entries]
+    missing_names = {canonical_skill(s["name"], match_skills) for s in missing}
+    for name in diff["skills_removed"]:
+        entry = entries.pop(name, None)
+        if entry is not None:
+            touched_categories.add(entry.get("category"))
+        if name not in missing_names and (name in required or name in nice_to_have):
+            missing.append({"name": name.title(), "importance": "Critical" if name in required else "High",
+                            "category": "Core" if name in required else "Advanced"})
+
+    ordered = sorted(entries.values(), key=lambda skill: -skill.get("level", 0))
+    analysis["strong_skills"] = [s for s in ordered if s.get("level", 0) >= STRONG_LEVEL]
+    analysis["moderate_skills"] = [s for s in ordered if MODERATE_LEVEL <= s.get("level", 0) < STRONG_LEVEL]
+    analysis["weak_skills"] = [s for s in ordered if s.get("level", 0) < MODERATE_LEVEL]
+    analysis["missing_skills"] = missing
+
+    categories = data.setdefault("skill_categories", [])
+    old_gaps = [c.get("gap", 0) for c in categories]
+    by_name = {c.get("name"): c for c in categories}
+    for name in touched_categories:
+        levels = [s.get("level", 0) for s in entries.values() if s.get("category") == name]
+        if not levels:
+            continue
+        category = by_name.get(name)
+        if category is None:
+            category = {"name": name, "required_score": DEFAULT_REQUIRED_SCORE}
+            categories.append(category)
+        category["current_score"] = int(sum(levels) / len(levels))
+        category["gap"] = max(0, category.get("required_score", DEFAULT_REQUIRED_SCORE) - category["current_score"])
+
+    readiness = data.setdefault("career_readiness", {})
+    if categories and old_gaps:
+        old_mean = sum(old_gaps) / len(old_gaps)
+        new_mean = sum(c.get("gap", 0) for c in categories) / len(categories)
+        readiness["overall_score"] = max(0, min(100, round(readiness.get("overall_score", 0) + old_mean - new_mean)))
+    readiness["strengths"] = [s["name"] for s in analysis["strong_skills"][:3]]
+    readiness["areas_to_improve"] = [s["name"] for s in missing[:3]] or ["General Skills"]
+    return data
+
+
+def prune_roadmap(data):
+    """Drop skills the learner now has from the roadmap and priorities, in place.
+
+    Used when the roadmap could not be regenerated; phases left with nothing
+    to learn are removed and the rest renumbered.
+    """
+    known = set(_known_levels(data.get("skill_analysis", {})))
+    roadmap = data.get("learning_roadmap", {})
+    phases = []
+    for phase in roadmap.get("phases", []):
+        skills = [s for s in phase.get("skills_to_learn", []) if s.lower() not in known]
+        if phase.get("skills_to_learn") and not skills:
+            continue
+        phase["skills_to_learn"] = skills
+        phase["phase_number"] = len(phases) + 1
+        phases.append(phase)
+    if "phases" in roadmap:
+        roadmap["phases"] = phases
+    recommendations = [r for r in data.get("priority_recommendations", []) if r.get("skill", "").lower() not in known]
+    for rank, recommendation in enumerate(recommendations, 1):
+        recommendation["rank"] = rank
+    if "priority_recommendations" in data:
+        data["priority_recommendations"] = recommendations
+    return data
+
+
+def progress_delta(old, new):
+    """Summarise how a learner's analysis changed between two versions."""
+    old_analysis = old.get("skill_analysis", {})
+    new_analysis = new.get("skill_analysis", {})
+    old_levels = _known_levels(old_analysis)
+    new_levels = _known_levels(new_analysis)
+    names = {skill["name"].lower(): skill["name"] for group in SKILL_LISTS
+             for skill in new_analysis.get(group, []) if skill.get("name")}
+    old_missing = [s["name"] for s in old_analysis.get("missing_skills", []) if s.get("name")]
+    new_missing = {s["name"].lower() for s in new_analysis.get("missing_skills", []) if s.get("name")}
+    old_score = old.get("career_readiness", {}).get("overall_score")
+    new_score = new.get("career_readiness", {}).get("overall_score")
+    old_gaps = {c.get("name"): c.get("gap") for c in old.get("skill_categories", [])}
+
+    category_gaps = []
+    for category in new.get("skill_categories", []):
+        before = old_gaps.get(category.get("name"))
+        after = category.get("gap")
+        if isinstance(before, (int, float)) and isinstance(after, (int, float)) and before != after:
+            category_gaps.append({"category": category["name"], "before": before, "after": after,
+                                  "change": after - before})
+    return {
+        "readiness": {
+            "before": old_score,
+            "after": new_score,
+            "change": new_score - old_score
+            if isinstance(old_score, (int, float)) and isinstance(new_score, (int, float)) else None,
+        },
+        "skills_gained": [names[name] for name in new_levels if name not in old_levels],
+        "skills_improved": [
+            {"skill": names[name], "before": old_levels[name], "after": level}
+            for name, level in new_levels.items() if name in old_levels and level > old_levels[name]
+        ],
+        "skills_dropped": [name.title() for name in old_levels if name not in new_levels],
+        "no_longer_missing": [name for name in old_missing if name.lower() not in new_missing],
+        "category_gaps": category_gaps,
+    }
+
+
+def store_from_env():
+    """Build the learner store from LEARNER_* environment variables, or None if not enabled.
+
+    Tracking is opt-in: LEARNER_DB keeps every version in a SQLite file
+    shared by all workers, LEARNER_STORE_SIZE keeps that many learners in
+    each worker's memory (about 30 KB per learner for a typical resume and
+    analysis, and a learner whose requests land on another worker is not
+    recognised).
+    """
+    db_path = os.getenv('LEARNER_DB', '')
+    if db_path:
+        return LearnerStore(SqliteLearnerStore(db_path))
+    size = int(os.getenv('LEARNER_STORE_SIZE', '0'))
+    if size <= 0:
+        return None
+    return LearnerStore(MemoryLearnerStore(size))
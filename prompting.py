@@ -0,0 +1,215 @@
+"""
+HireSense - Gemini prompt construction.
+The static instructions and the result schema live in the model's system
+instruction and JSON-mode config, so each request only sends a compacted
+learner profile sized to a token budget.
+"""
+
+import re
+
+# Rough size of a Gemini token for English text, used for budgeting.
+CHARS_PER_TOKEN = 4
+
+SYSTEM_INSTRUCTION = """You are an expert career counselor and educational AI mentor. Given a learner profile and a target role, produce a skill gap analysis with a personalized learning roadmap, following the response schema.
+- Be specific and actionable; make all scores (0-100) realistic for the profile.
+- Give 4-6 strong, 3-5 moderate, 3-5 weak and 4-8 missing skills.
+- Give 5-6 skill categories, 3-4 roadmap phases, at least 5 priority recommendations and 3-4 projects.
+- Treat "Detected skills" as evidence from the full resume even if the resume excerpt is truncated."""
+
+
+def _obj(properties, required=None):
+    return {"type": "object", "properties": properties, "required": required or list(properties)}
+
+
+def _arr(items):
+    return {"type": "array", "items": items}
+
+
+_STR = {"type": "string"}
+_INT = {"type": "integer"}
+_STRS = _arr(_STR)
+
+ANALYSIS_SCHEMA = _obj({
+    "profile_summary": _obj({
+        "name": _STR,
+        "current_level": {"type": "string", "enum": ["Beginner", "Intermediate", "Advanced"]},
+        "education": _STR,
+        "experience_years": _INT,
+        "domain": _STR,
+    }),
+    "skill_analysis": _obj({
+        "strong_skills": _arr(_obj({"name": _STR, "level": _INT, "category": _STR})),
+        "moderate_skills": _arr(_obj({"name": _STR, "level": _INT, "category": _STR})),
+        "weak_skills": _arr(_obj({"name": _STR, "level": _INT, "category": _STR})),
+        "missing_skills": _arr(_obj({
+            "name": _STR,
+            "importance": {"type": "string", "enum": ["Critical", "High", "Medium"]},
+            "category": _STR,
+        })),
+    }),
+    "skill_categories": _arr(_obj({
+        "name": _STR, "current_score": _INT, "required_score": _INT, "gap": _INT,
+    })),
+    "learning_roadmap": _obj({
+        "phases": _arr(_obj({
+            "phase_number": _INT,
+            "title": _STR,
+            "duration": _STR,
+            "description": _STR,
+            "skills_to_learn": _STRS,
+            "resources": _arr(_obj(
+                {"type": _STR, "name": _STR, "platform": _STR, "url": _STR, "description": _STR},
+                required=["type", "name"],
+            )),
+            "milestones": _STRS,
+        })),
+    }),
+    "priority_recommendations": _arr(_obj({
+        "rank": _INT,
+        "skill": _STR,
+        "reason": _STR,
+        "time_estimate": _STR,
+        "difficulty": {"type": "string", "enum": ["Easy", "Medium", "Hard"]},
+    })),
+    "career_readiness": _obj({
+        "overall_score": _INT,
+        "strengths": _STRS,
+        "areas_to_improve": _STRS,
+        "estimated_time_to_ready": _STR,
+        "market_demand": {"type": "string", "enum": ["High", "Medium", "Low"]},
+    }),
+    "recommended_projects": _arr(_obj({
+        "name": _STR,
+        "description": _STR,
+        "skills_practiced": _STRS,
+        "difficulty": {"type": "string", "enum": ["Beginner", "Intermediate", "Advanced"]},
+        "estimated_time": _STR,
+    })),
+})
+
+# Narrow follow-up for a learner whose profile changed: only the roadmap and
+# priorities are regenerated, everything else is updated locally.
+ROADMAP_SECTIONS = ("learning_roadmap", "priority_recommendations")
+ROADMAP_SCHEMA = _obj({name: ANALYSIS_SCHEMA['properties'][name] for name in ROADMAP_SECTIONS})
+
+# Sent with the request, since the model's system instruction asks for a full analysis
+ROADMAP_INSTRUCTION = """Update this learner's existing learning plan after they improved their profile. Return only an updated learning roadmap and priority recommendations, following the response schema.
+- Drop or shorten phases for skills the learner now has; keep phases that are still relevant.
+- Give 3-4 roadmap phases and at least 5 priority recommendations focused on the remaining gaps."""
+
+# Resume section headings, in the order sections are kept when the budget
+# cannot fit everything.
+SECTION_PRIORITY = (
+    ("skills", r"(technical\s+)?skills|technologies|tech\s+stack|competencies|tools"),
+    ("experience", r"(work\s+|professional\s+)?experience|employment|work\s+history|internships?"),
+    ("projects", r"(academic\s+|personal\s+)?projects"),
+    ("education", r"education|academics?|qualifications"),
+    ("certifications", r"certifications?|courses|training|achievements|awards"),
+    ("summary", r"(professional\s+)?summary|profile|objective|about\s+me"),
+)
+_HEADING = re.compile(
+    r'^\s*(?:' + '|'.join(f'(?P<{name}>{pattern})' for name, pattern in SECTION_PRIORITY) + r')\s*:?\s*$',
+    re.IGNORECASE,
+)
+
+_CONTACT = re.compile(
+    r'[\w.+-]+@[\w-]+\.[\w.]+'                      # email
+    r'|(?:https?://|www\.)\S+'                      # url
+    r'|\b(?:linkedin|github)\.com/\S*',             # profile links
+    re.IGNORECASE,
+)
+_PHONE = re.compile(r'\+?\(?\d[\d\s().-]{8,}\d')
+_BOILERPLATE = re.compile(
+    r'^(?:curriculum vitae|resume|page \d+( of \d+)?|references( available)?( upon request)?'
+    r'|declaration|i hereby declare.*)$',
+    re.IGNORECASE,
+)
+
+
+def _clean_lines(text):
+    seen = set()
+    for line in text.splitlines():
+        line = _CONTACT.sub('', line)
+        # Only digit runs long enough to be phone numbers, not "2019 - 2021"
+        line = _PHONE.sub(lambda m: '' if sum(c.isdigit() for c in m.group(0)) >= 10 else m.group(0), line)
+        line = re.sub(r'\s+', ' ', line).strip(' |,;-•·')
+        if len(line) < 2 or _BOILERPLATE.match(line):
+            continue
+        key = line.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        yield line
+
+
+def split_sections(text):
+    """Split resume text into {section: [lines]} using common headings.
+
+    Lines before the first recognised heading go to "other".
+    """
+    sections = {"other": []}
+    current = "other"
+    for line in _clean_lines(text):
+        match = _HEADING.match(line)
+        if match:
+            current = match.lastgroup
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line)
+    return sections
+
+
+def compact_resume(text, max_tokens):
+    """Return the resume reduced to its most useful sections within max_tokens."""
+    budget = max_tokens * CHARS_PER_TOKEN
+    sections = split_sections(text)
+    parts = []
+    # The opening lines usually carry the learner's name and headline
+    intro = sections["other"][:2]
+    if intro:
+        header = "\n".join(intro)[:160]
+        parts.append(header)
+        budget -= len(header) + 2
+        sections["other"] = sections["other"][2:]
+    order = [name for name, _ in SECTION_PRIORITY] + ["other"]
+    for name in order:
+        lines = sections.get(name)
+        if not lines or budget <= 0:
+            continue
+        heading = name.upper() + ":"
+        body = "\n".join(lines)
+        room = budget - len(heading) - 1
+        if room <= 0:
+            break
+        if len(body) > room:
+            body = body[:room].rsplit("\n", 1)[0] if "\n" in body[:room] else body[:room]
+        parts.append(heading + "\n" + body)
+        budget -= len(heading) + len(body) + 2
+    return "\n\n".join(parts)
+
+
+def build_prompt(resume_text, career_goal, skills_text, detected_skills, max_tokens):
+    """Build the per-request part of the prompt."""
+    return (
+        f"Target role: {career_goal}\n"
+        f"Detected skills: {', '.join(detected_skills) if detected_skills else 'None'}\n"
+        f"Additional skills listed: {skills_text or 'Not provided'}\n\n"
+        f"Resume:\n{compact_resume(resume_text, max_tokens) or 'Not provided'}"
+    )
+
+
+def build_roadmap_prompt(career_goal, current_skills, gained_skills, missing_skills, previous_roadmap):
+    """Build the prompt for a roadmap update after the learner's profile changed."""
+    phases = previous_roadmap.get("phases", []) if isinstance(previous_roadmap, dict) else []
+    outline = "\n".join(
+        f"{phase.get('phase_number', i + 1)}. {phase.get('title', '')}: {', '.join(phase.get('skills_to_learn', []))}"
+        for i, phase in enumerate(phases)
+    )
+    return (
+        f"{ROADMAP_INSTRUCTION}\n\n"
+        f"Target role: {career_goal}\n"
+        f"Current skills: {', '.join(current_skills) or 'None'}\n"
+        f"Newly acquired skills: {', '.join(gained_skills) or 'None'}\n"
+        f"Still missing: {', '.join(missing_skills) or 'None'}\n\n"
+        f"Previous roadmap:\n{outline or 'None'}"
+    )
@@ -0,0 +1,174 @@
+"""
+HireSense - Career goal to role resolution.
+Role titles are indexed as TF-IDF vectors of character n-grams in a sparse
+inverted index, and free-text career goals are scored against every title
+at once with NumPy, so "Senior Data Engineer" or "ML engineer" find the
+closest catalogued role instead of falling through to the default.
+"""
+
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+_NON_ALNUM = re.compile(r'[^a-z0-9+#]+')
+
+
+def char_ngrams(text, sizes=(3, 4)):
+    """Return Counter of character n-grams of normalised, space-padded text."""
+    text = ' ' + _NON_ALNUM.sub(' ', text.lower()).strip() + ' '
+    grams = Counter()
+    for n in sizes:
+        for i in range(len(text) - n + 1):
+            grams[text[i:i + n]] += 1
+    return grams
+
+
+class RoleResolver:
+    """Resolve career goals to the closest roles of a title catalog.
+
+    titles is a list of title strings and title_roles the role name each
+    belongs to; a role scores as its best-matching title. Scores are cosine
+    similarities in [0, 1]; roles below min_score are not returned.
+    Results of resolve() are memoised per normalised goal.
+
+    N-grams shared by more than max_postings titles (by default 50 or 2% of
+    the titles, whichever is larger) still count towards vector norms but
+    are left out of the index: they carry little weight, and skipping them
+    keeps the cost of a lookup flat as the catalog grows.
+    """
+
+    def __init__(self, titles, title_roles, top_k=3, min_score=0.3, memo_size=4096, max_postings=None):
+        self.top_k = top_k
+        self.min_score = min_score
+        self.memo_size = memo_size
+        self.roles = list(dict.fromkeys(title_roles))
+        role_index = {role: i for i, role in enumerate(self.roles)}
+        # Group titles by role so each role's titles are contiguous
+        order = sorted(range(len(titles)), key=lambda i: role_index[title_roles[i]])
+        titles = [titles[i] for i in order]
+        self._title_roles = np.array([role_index[title_roles[i]] for i in order], dtype=np.int32)
+        if max_postings is None:
+            max_postings = max(50, int(len(titles) * 0.02))
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+        self.memo_hits = 0
+        self.memo_misses = 0
+
+        # Vocabulary and document frequencies over all titles
+        docs = [char_ngrams(title) for title in titles]
+        vocab = {}
+        df = []
+        for grams in docs:
+            for gram in grams:
+                col = vocab.setdefault(gram, len(vocab))
+                if col == len(df):
+                    df.append(0)
+                df[col] += 1
+        self._vocab = vocab
+        self._idf = np.log((1 + len(docs)) / (1 + np.array(df, dtype=np.float64))).astype(np.float32) + 1
+        # Unknown n-grams still count towards a goal's norm, so extra words
+        # lower every score alike
+        self._unknown_idf = math.log(1 + len(docs)) + 1
+
+        # Column-major (CSC) sparse title x n-gram matrix of L2-normalised
+        # sublinear TF-IDF weights: the postings list of each n-gram
+        cols, rows, values = [], [], []
+        for row, grams in enumerate(docs):
+            ids = np.fromiter((vocab[gram] for gram in grams), dtype=np.int32, count=len(grams))
+            weights = (1 + np.log(np.fromiter(grams.values(), dtype=np.float32, count=len(grams)))) * self._idf[ids]
+            weights /= np.linalg.norm(weights) or 1.0
+            cols.append(ids)
+            rows.append(np.full(len(ids), row, dtype=np.int32))
+            values.append(weights)
+        cols = np.concatenate(cols) if cols else np.zeros(0, dtype=np.int32)
+        rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int32)
+        values = np.concatenate(values) if values else np.zeros(0, dtype=np.float32)
+        keep = np.array(df, dtype=np.int64)[cols] <= max_postings
+        cols, rows, values = cols[keep], rows[keep], values[keep]
+        order = np.argsort(cols, kind='stable')
+        self._rows = rows[order]
+        self._values = values[order]
+        self._col_ptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cols, minlength=len(vocab)), out=self._col_ptr[1:])
+
+    @classmethod
+    def from_taxonomy(cls, taxonomy, exclude=("default",), **kwargs):
+        titles, title_roles = [], []
+        for text, r in zip(taxonomy.title_texts, taxonomy.title_roles.tolist()):
+            if taxonomy.roles[r] not in exclude:
+                titles.append(text)
+                title_roles.append(taxonomy.roles[r])
+        return cls(titles, title_roles, **kwargs)
+
+    def resolve(self, goal):
+        """Return up to top_k (role, score) pairs for goal, best first (memoised)."""
+        key = _NON_ALNUM.sub(' ', goal.lower()).strip()
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                self.memo_hits += 1
+                return self._memo[key]
+            self.memo_misses += 1
+        result = self.resolve_many([key])[0]
+        with self._lock:
+            self._memo[key] = result
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return result
+
+    def resolve_many(self, goals):
+        """Score a batch of goals in one pass; returns one resolve() result per goal."""
+        n_titles = len(self._title_roles)
+        n_roles = len(self.roles)
+        postings, weights, offsets = [], [], []
+        for i, goal in enumerate(goals):
+            grams = char_ngrams(goal)
+            known = [(self._vocab[gram], count) for gram, count in grams.items() if gram in self._vocab]
+            unknown = [count for gram, count in grams.items() if gram not in self._vocab]
+            if not known:
+                continue
+            ids = np.array([col for col, _ in known], dtype=np.int64)
+            query = (1 + np.log(np.array([count for _, count in known], dtype=np.float32))) * self._idf[ids]
+            unknown_weights = (1 + np.log(np.array(unknown, dtype=np.float32))) * self._unknown_idf
+            query /= math.sqrt(float(query @ query) + float(unknown_weights @ unknown_weights))
+            starts, ends = self._col_ptr[ids], self._col_ptr[ids + 1]
+            lengths = ends - starts
+            # Gather every posting of the goal's n-grams without a Python loop
+            index = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            postings.append(self._rows[index])
+            weights.append(self._values[index] * np.repeat(query, lengths))
+            offsets.append(np.full(len(index), i * n_titles, dtype=np.int64))
+
+        results = [() for _ in goals]
+        if not postings:
+            return results
+        # Sum weights per touched (goal, title), then take each role's best
+        # title. Only titles sharing an n-gram with a goal are visited.
+        keys, inverse = np.unique(np.concatenate(offsets) + np.concatenate(postings), return_inverse=True)
+        title_scores = np.bincount(inverse, weights=np.concatenate(weights))
+        groups = (keys // n_titles) * n_roles + self._title_roles[keys % n_titles]
+        starts = np.flatnonzero(np.concatenate(([True], groups[1:] != groups[:-1])))
+        role_scores = np.maximum.reduceat(title_scores, starts)
+        groups = groups[starts]
+        bounds = np.searchsorted(groups // n_roles, np.arange(len(goals) + 1))
+        for i in range(len(goals)):
+            scores = role_scores[bounds[i]:bounds[i + 1]]
+            roles = groups[bounds[i]:bounds[i + 1]] % n_roles
+            top = np.argsort(-scores, kind='stable')[:self.top_k]
+            results[i] = tuple(
+                (self.roles[roles[j]], round(float(scores[j]), 4)) for j in top if scores[j] >= self.min_score
+            )
+        return results
+
+    def stats(self):
+        with self._lock:
+            return {
+                "roles": len(self.roles),
+                "titles": len(self._title_roles),
+                "memo_entries": len(self._memo),
+                "memo_hits": self.memo_hits,
+                "memo_misses": self.memo_misses,
+            }
@@ -209,20 +209,52 @@ function initForm() {
         const formData = new FormData(form);
         
         try {
-            const response = await fetch('/analyze', {
+            const response = await fetch('/analyze/stream', {
                 method: 'POST',
                 body: formData
             });
             
-            const result = await response.json();
+            const contentType = response.headers.get('Content-Type') || '';
+            if (!contentType.includes('application/x-ndjson')) {
+                // Validation errors come back as a plain JSON document
+                const result = await response.json();
+                hideLoadingOverlay();
+                showToast(result.error || 'Analysis failed. Please try again.', 'error');
+                return;
+            }
+            
+            const data = {};
+            let started = false;
+            let finished = false;
+            let degraded = false;
             
-            if (result.success) {
-                await completeLoading();
-                renderResults(result.data);
-                showToast('Analysis complete! Scroll down to view your results.', 'success');
+            await readEventStream(response, async (event) => {
+                if (event.event === 'section') {
+                    if (!started) {
+                        started = true;
+                        await completeLoading();
+                        startResults();
+                    }
+                    data[event.name] = event.data;
+                    renderSection(event.name, data);
+                } else if (event.event === 'done') {
+                    finished = true;
+                    degraded = Boolean(event.degraded);
+                } else if (event.event === 'error') {
+                    throw new Error(event.error);
+                }
+            });
+            
+            if (started && finished) {
+                lucide.createIcons();
+                if (degraded) {
+                    showToast('We are busy right now, so this is a quick standard analysis. Try again later for a full AI analysis.', 'info');
+                } else {
+                    showToast('Analysis complete! Scroll down to view your results.', 'success');
+                }
             } else {
                 hideLoadingOverlay();
-                showToast(result.error || 'Analysis failed. Please try again.', 'error');
+                showToast('Analysis failed. Please try again.', 'error');
             }
         } catch (error) {
             hideLoadingOverlay();
@@ -319,23 +351,41 @@ function showToast(message, type = 'info') {
     }, 5000);
 }
 
+// ─── Streamed Responses ──────────────────────────────────────
+async function readEventStream(response, onEvent) {
+    // Parse an NDJSON body line by line as chunks arrive
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+        const { value, done } = await reader.read();
+        buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+        
+        let newline;
+        while ((newline = buffer.indexOf('\n')) >= 0) {
+            const line = buffer.slice(0, newline).trim();
+            buffer = buffer.slice(newline + 1);
+            if (line) await onEvent(JSON.parse(line));
+        }
+        
+        if (done) break;
+    }
+    
+    if (buffer.trim()) await onEvent(JSON.parse(buffer));
+}
+
 // ─── Render Results ──────────────────────────────────────────
-function renderResults(data) {
+function startResults() {
     const resultsSection = document.getElementById('results');
     
-    // Update subtitle
-    const profile = data.profile_summary || {};
-    document.getElementById('resultsSubtitle').textContent = 
-        `Analysis for ${profile.name || 'Learner'} — Targeting: ${profile.domain || 'Career Goal'}`;
-    
-    // Render all sections
-    renderReadinessScore(data);
-    renderSkillRadar(data);
-    renderSkillGapChart(data);
-    renderSkillBreakdown(data);
-    renderRoadmap(data);
-    renderPriorityList(data);
-    renderProjects(data);
+    // Clear anything left over from a previous analysis
+    document.getElementById('resultsSubtitle').textContent = 'Analyzing your profile…';
+    document.getElementById('currentLevel').textContent = '-';
+    ['strengthTags', 'improveTags', 'strongSkills', 'moderateSkills', 'weakSkills',
+     'missingSkills', 'roadmapTimeline', 'priorityList', 'projectsGrid'].forEach(id => {
+        document.getElementById(id).innerHTML = '';
+    });
     
     // Show results
     resultsSection.style.display = 'block';
@@ -343,9 +393,39 @@ function renderResults(data) {
     setTimeout(() => {
         resultsSection.scrollIntoView({ behavior: 'smooth', block: 'start' });
     }, 100);
-    
-    // Refresh icons
-    lucide.createIcons();
+}
+
+function renderSection(name, data) {
+    // Render one top-level section of the analysis into its own part of the
+    // page as soon as it arrives; Gemini does not send them in a fixed order
+    switch (name) {
+        case 'profile_summary': {
+            const profile = data.profile_summary || {};
+            document.getElementById('resultsSubtitle').textContent = 
+                `Analysis for ${profile.name || 'Learner'} — Targeting: ${profile.domain || 'Career Goal'}`;
+            document.getElementById('currentLevel').textContent = profile.current_level || 'Intermediate';
+            break;
+        }
+        case 'career_readiness':
+            renderReadinessScore(data);
+            break;
+        case 'skill_categories':
+            renderSkillRadar(data);
+            renderSkillGapChart(data);
+            break;
+        case 'skill_analysis':
+            renderSkillBreakdown(data);
+            break;
+        case 'learning_roadmap':
+            renderRoadmap(data);
+            break;
+        case 'priority_recommendations':
+            renderPriorityList(data);
+            break;
+        case 'recommended_projects':
+            renderProjects(data);
+            break;
+    }
 }
 
 // ─── Readiness Score Gauge ───────────────────────────────────
@@ -447,7 +527,6 @@ function renderReadinessScore(data) {
     // Meta info
     document.getElementById('timeToReady').textContent = readiness.estimated_time_to_ready || '3-6 months';
     document.getElementById('marketDemand').textContent = readiness.market_demand || 'High';
-    document.getElementById('currentLevel').textContent = (data.profile_summary || {}).current_level || 'Intermediate';
     
     // Strength tags
     const strengthTags = document.getElementById('strengthTags');
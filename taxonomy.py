@@ -0,0 +1,264 @@
+"""
+HireSense - Skill taxonomy.
+Skills, categories, aliases and role requirements are maintained in a JSON
+data file and compiled into an indexed snapshot: interned skill and role
+ids, array-backed role requirement vectors and a phrase map that includes
+aliases. Compiled snapshots are cached on disk as .npz files keyed by the
+data file's hash, so workers start without recompiling.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+import numpy as np
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'taxonomy.json')
+# Bump when the compiled layout changes so stale snapshots are ignored
+SNAPSHOT_VERSION = 2
+
+REQUIRED = 2
+NICE_TO_HAVE = 1
+
+# A token is a run of word characters, "+" and "#", optionally joined by
+# ".", "/" or "-" ("c++", "node.js", "ci/cd", "scikit-learn").
+_TOKEN = re.compile(r'[\w+#]+(?:[./-][\w+#]+)*')
+_TOKEN_GAP = re.compile(r'([\w+#]+(?:[./-][\w+#]+)*)(\s+(?=[\w+#]))?')
+_JOINERS = re.compile(r'[./-]')
+
+
+def _tokens(phrase):
+    return _TOKEN.findall(phrase.lower())
+
+
+def _csr(groups):
+    """Flatten lists of ids into (values, offsets) arrays."""
+    offsets = np.zeros(len(groups) + 1, dtype=np.int32)
+    offsets[1:] = np.cumsum([len(group) for group in groups])
+    values = np.fromiter((i for group in groups for i in group), dtype=np.int32, count=int(offsets[-1]))
+    return values, offsets
+
+
+class Taxonomy:
+    """Compiled taxonomy. Build with compile_taxonomy() or load_taxonomy()."""
+
+    def __init__(self, arrays):
+        self.skills = arrays['skills'].tolist()
+        self.categories = arrays['categories'].tolist()
+        self.roles = arrays['roles'].tolist()
+        self.skill_category = arrays['skill_category']
+        self.role_matrix = arrays['role_matrix']
+        # Every name a role is known by (its own name first) and its role id
+        self.title_texts = arrays['title_texts'].tolist()
+        self.title_roles = arrays['title_roles']
+        self.skill_ids = {name: i for i, name in enumerate(self.skills)}
+        self.role_ids = {name: i for i, name in enumerate(self.roles)}
+        self.phrases = dict(zip(arrays['phrase_keys'].tolist(), arrays['phrase_ids'].tolist()))
+        self.max_words = max((key.count(' ') + 1 for key in self.phrases), default=1)
+        # First tokens of multi-word phrases, so most tokens need one lookup
+        self._prefixes = {key.split(' ', 1)[0] for key in self.phrases if ' ' in key}
+        self._arrays = arrays
+
+        def unpack(values, offsets):
+            return [values[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+        self.role_required = unpack(arrays['required_ids'], arrays['required_offsets'])
+        self.role_nice_to_have = unpack(arrays['nice_ids'], arrays['nice_offsets'])
+        members = unpack(arrays['category_ids'], arrays['category_offsets'])
+
+        # Name-based views for code that works with skill names
+        self.skill_db = {cat: [self.skills[i] for i in ids] for cat, ids in zip(self.categories, members)}
+        self.role_requirements = {
+            role: {
+                "required": [self.skills[i] for i in self.role_required[r]],
+                "nice_to_have": [self.skills[i] for i in self.role_nice_to_have[r]],
+            }
+            for r, role in enumerate(self.roles)
+        }
+
+    def category_of(self, skill_id):
+        """Category name of a skill, or None for skills only named by roles."""
+        index = self.skill_category[skill_id]
+        return self.categories[index] if index >= 0 else None
+
+    def blend_requirements(self, weighted_roles):
+        """Merge the requirements of several (role, weight) pairs.
+
+        A skill is required when roles holding at least half of the total
+        weight require it, and nice to have when any of the roles lists it.
+        Skills keep the order of the first role that lists them.
+        """
+        ids = [self.role_ids[role] for role, _ in weighted_roles]
+        weights = np.array([weight for _, weight in weighted_roles], dtype=np.float32)
+        weights /= weights.sum()
+        rows = self.role_matrix[ids]
+        required_share = weights @ (rows == REQUIRED)
+
+        required, nice_to_have, seen = [], [], set()
+        for r in ids:
+            for skill_id in self.role_required[r].tolist() + self.role_nice_to_have[r].tolist():
+                if skill_id in seen:
+                    continue
+                seen.add(skill_id)
+                if required_share[skill_id] >= 0.5:
+                    required.append(self.skills[skill_id])
+                else:
+                    nice_to_have.append(self.skills[skill_id])
+        return {"required": required, "nice_to_have": nice_to_have}
+
+    def match(self, text):
+        """Count known skills (and aliases) in text.
+
+        Returns {skill_id: count} in order of first appearance. The cost
+        depends on the length of text, not on the size of the taxonomy.
+        """
+        phrases = self.phrases
+        prefixes = self._prefixes
+        # (token, gap) pairs; gap is set only when plain whitespace separates
+        # the token from the next one, so phrases never span punctuation
+        pairs = _TOKEN_GAP.findall(text.lower())
+        counts = {}
+        skip = 0
+        for i, (token, gap) in enumerate(pairs):
+            if skip:
+                skip -= 1
+                continue
+            skill_id = phrases.get(token)
+            if gap and token in prefixes:
+                # Longest phrase starting here
+                phrase = token
+                for j in range(i + 1, min(len(pairs), i + self.max_words)):
+                    phrase += ' ' + pairs[j][0]
+                    if phrase in phrases:
+                        skill_id, skip = phrases[phrase], j - i
+                    if not pairs[j][1]:
+                        break
+            if skill_id is not None:
+                counts[skill_id] = counts.get(skill_id, 0) + 1
+            elif '.' in token or '/' in token or '-' in token:
+                # "react/redux" or "python-based": look at the parts
+                for part in _JOINERS.split(token):
+                    part_id = phrases.get(part)
+                    if part_id is not None:
+                        counts[part_id] = counts.get(part_id, 0) + 1
+        return counts
+
+    def save(self, path):
+        """Write the compiled snapshot to path (.npz), atomically."""
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.npz')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **self._arrays)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def compile_taxonomy(doc):
+    """Compile a taxonomy document into a Taxonomy.
+
+    doc has "categories" ({category: [skill]}), "aliases" ({alias: skill})
+    and "roles" ({role: {"titles": [title], "required": [skill],
+    "nice_to_have": [skill]}}), where titles are other names for the role.
+    Skills listed under several categories keep the first one.
+    """
+    skills = []
+    skill_ids = {}
+
+    def intern(name):
+        name = name.strip().lower()
+        if name not in skill_ids:
+            skill_ids[name] = len(skills)
+            skills.append(name)
+        return skill_ids[name]
+
+    categories = list(doc.get('categories', {}))
+    category_members = [[intern(s) for s in doc['categories'][cat]] for cat in categories]
+    categorised = len(skills)
+    roles = list(doc.get('roles', {}))
+    titles = [(r, title) for r, role in enumerate(roles) for title in [role] + doc['roles'][role].get('titles', [])]
+    required = [[intern(s) for s in doc['roles'][role].get('required', [])] for role in roles]
+    nice = [[intern(s) for s in doc['roles'][role].get('nice_to_have', [])] for role in roles]
+
+    skill_category = np.full(len(skills), -1, dtype=np.int16)
+    for index, members in enumerate(category_members):
+        for skill_id in members:
+            if skill_category[skill_id] < 0:
+                skill_category[skill_id] = index
+
+    role_matrix = np.zeros((len(roles), len(skills)), dtype=np.uint8)
+    for r in range(len(roles)):
+        role_matrix[r, nice[r]] = NICE_TO_HAVE
+        role_matrix[r, required[r]] = REQUIRED
+
+    # Only categorised skills are detected in text; role-only skills such as
+    # "data structures" are reported as missing but never matched.
+    phrases = {' '.join(_tokens(name)): skill_id for skill_id, name in enumerate(skills[:categorised])}
+    for alias, target in doc.get('aliases', {}).items():
+        target_id = skill_ids.get(target.strip().lower())
+        if target_id is None or target_id >= categorised:
+            raise ValueError(f"Alias {alias!r} points to unknown skill {target!r}")
+        phrases.setdefault(' '.join(_tokens(alias)), target_id)
+
+    required_ids, required_offsets = _csr(required)
+    nice_ids, nice_offsets = _csr(nice)
+    category_ids, category_offsets = _csr(category_members)
+    return Taxonomy({
+        'skills': np.array(skills, dtype=str),
+        'categories': np.array(categories, dtype=str),
+        'roles': np.array(roles, dtype=str),
+        'skill_category': skill_category,
+        'role_matrix': role_matrix,
+        'title_texts': np.array([title for _, title in titles], dtype=str),
+        'title_roles': np.array([r for r, _ in titles], dtype=np.int32),
+        'phrase_keys': np.array(list(phrases), dtype=str),
+        'phrase_ids': np.array(list(phrases.values()), dtype=np.int32),
+        'required_ids': required_ids,
+        'required_offsets': required_offsets,
+        'nice_ids': nice_ids,
+        'nice_offsets': nice_offsets,
+        'category_ids': category_ids,
+        'category_offsets': category_offsets,
+    })
+
+
+def load_taxonomy(path=DEFAULT_PATH, cache_dir=None):
+    """Load the taxonomy at path, compiling it only when no cached snapshot matches.
+
+    Snapshots are written to cache_dir (default: a "hiresense" directory in
+    the system temp dir). Pass cache_dir='' to always compile.
+    """
+    with open(path, 'rb') as f:
+        source = f.read()
+    if cache_dir is None:
+        cache_dir = os.path.join(tempfile.gettempdir(), 'hiresense')
+    digest = hashlib.sha256(source + b'\0%d' % SNAPSHOT_VERSION).hexdigest()[:16]
+    snapshot = os.path.join(cache_dir, f'taxonomy-{digest}.npz') if cache_dir else ''
+
+    if snapshot and os.path.exists(snapshot):
+        try:
+            with np.load(snapshot, allow_pickle=False) as data:
+                return Taxonomy({key: data[key] for key in data.files})
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable taxonomy snapshot {snapshot}: {e}")
+
+    taxonomy = compile_taxonomy(json.loads(source))
+    if snapshot:
+        try:
+            taxonomy.save(snapshot)
+        except OSError as e:
+            print(f"Could not cache taxonomy snapshot: {e}")
+    return taxonomy
+
+
+def taxonomy_from_env():
+    """Load the taxonomy named by TAXONOMY_PATH and TAXONOMY_CACHE_DIR."""
+    return load_taxonomy(
+        os.getenv('TAXONOMY_PATH', DEFAULT_PATH),
+        os.getenv('TAXONOMY_CACHE_DIR'),
+    )